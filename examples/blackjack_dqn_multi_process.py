@@ -1,13 +1,12 @@
 ''' A toy example of learning a Deep-Q Agent on Blackjack with multiple processes
 '''
-import numpy as np
 import tensorflow as tf
 import multiprocessing
-from multiprocessing import Process, JoinableQueue, Queue
 
 import rlcard
 from rlcard.agents.dqn_agent import DQNAgent
-from rlcard.utils.utils import set_global_seed, assign_task
+from rlcard.utils.utils import set_global_seed
+from rlcard.utils.rollout import ParallelRunner
 from rlcard.utils.logger import Logger
 
 # Set the the number of steps for collecting normalization statistics
@@ -28,63 +27,33 @@ csv_path = root_path + 'performance.csv'
 figure_path = root_path + 'figures/'
 
 
-# Set the process class to generate trajectories for training and evaluation
-class BlackjackProcess(Process):
-
-    def __init__(self, index, input_queue, output_queue, seed=None):
-        Process.__init__(self)
-        if seed is not None:
-            np.random.seed(seed)
-        self.index = index
-        self.input_queue = input_queue
-        self.output_queue = output_queue
-
-    def run(self):
-        #import tensorflow as tf
-        self.env = rlcard.make('blackjack')
-        self.sess = tf.Session()
-        agent = DQNAgent(self.sess,
-                         scope='sub-dqn' + str(self.index),
-                         action_num=self.env.action_num,
-                         replay_memory_init_size=memory_init_size,
-                         norm_step=norm_step,
-                         state_shape=self.env.state_shape,
-                         mlp_layers=[10, 10])
-        self.env.set_agents([agent])
-        self.sess.run(tf.global_variables_initializer())
-
-        # normalize
-        for _ in range(norm_step):
-            trajectories, _ = self.env.run()
-            for ts in trajectories[0]:
-                agent.feed(ts)
-
-        # Receive instruction to run game and generate trajectories
-        while True:
-            instruction = self.input_queue.get()
-            if instruction is not None:
-                tasks, train_flag, variables, total_t = instruction
-
-                # For evaluation
-                if not train_flag:
-                    agent.total_t = total_t
-                    global_vars = [tf.convert_to_tensor(var) for var in variables]
-                    agent.copy_params_op(global_vars)
-                    for _ in range(tasks):
-                        _, payoffs = self.env.run(is_training=train_flag)
-                        self.output_queue.put(payoffs)
-
-                # For training
-                else:
-                    for _ in range(tasks):
-                        trajectories, _ = self.env.run(is_training=train_flag)
-                        self.output_queue.put(trajectories)
-                self.input_queue.task_done()
-            else:
-                self.input_queue.task_done()
-                break
-        self.sess.close()
-        return
+def make_agents(env):
+    ''' Create the DQN agent of a worker process with its own session
+    '''
+    sess = tf.Session()
+    agent = DQNAgent(sess,
+                     scope='sub-dqn',
+                     action_num=env.action_num,
+                     replay_memory_init_size=memory_init_size,
+                     norm_step=norm_step,
+                     state_shape=env.state_shape,
+                     mlp_layers=[10, 10])
+    sess.run(tf.global_variables_initializer())
+
+    # normalize
+    env.set_agents([agent])
+    for _ in range(norm_step):
+        trajectories, _ = env.run()
+        for ts in trajectories[0]:
+            agent.feed(ts)
+    return [agent]
+
+def load_weights(agents, weights):
+    ''' Load the weights of the global agent into the agent of a worker process
+    '''
+    variables, total_t = weights
+    agents[0].total_t = total_t
+    agents[0].copy_params_op([tf.convert_to_tensor(var) for var in variables])
 
 if __name__ == '__main__':
 	# Avoid RuntimeError
@@ -95,16 +64,10 @@ if __name__ == '__main__':
 
 	# Initialize processes
 	PROCESS_NUM = 16
-	INPUT_QUEUE = JoinableQueue()
-	OUTPUT_QUEUE = Queue()
-	PROCESSES = [BlackjackProcess(index, INPUT_QUEUE, OUTPUT_QUEUE, np.random.randint(1000000))
-				 for index in range(PROCESS_NUM)]
-	for p in PROCESSES:
-		p.start()
+	RUNNER = ParallelRunner('blackjack', make_agents, PROCESS_NUM, weights_fn=load_weights, seed=0)
 
 	# Make environment
 	env = rlcard.make('blackjack')
-	eval_env = rlcard.make('blackjack')
 
 	with tf.Session() as sess:
 
@@ -118,7 +81,6 @@ if __name__ == '__main__':
 						 state_shape=env.state_shape,
 						 mlp_layers=[10, 10])
 		env.set_agents([agent])
-		eval_env.set_agents([agent])
 		sess.run(tf.global_variables_initializer())
 
 		# Count the number of steps
@@ -131,11 +93,7 @@ if __name__ == '__main__':
 		for episode in range(episode_num // evaluate_every):
 
 			# Generate data from the environment
-			tasks = assign_task(evaluate_every, PROCESS_NUM)
-			for task in tasks:
-				INPUT_QUEUE.put((task, True, None, None))
-			for _ in range(evaluate_every):
-				trajectories = OUTPUT_QUEUE.get()
+			for _, trajectories, _ in RUNNER.iter_run(evaluate_every, is_training=True):
 
 				# Feed transitions into agent memory, and train
 				for ts in trajectories[0]:
@@ -146,21 +104,22 @@ if __name__ == '__main__':
 					if step_counter > memory_init_size + norm_step:
 						loss = agent.train()
 						print('\rINFO - Step {}, loss: {}'.format(step_counter, loss), end='')
-			# Evaluate the performance
-			reward = 0
-			tasks = assign_task(evaluate_num, PROCESS_NUM)
+
+			# Broadcast the new weights to the workers
 			variables = tf.contrib.slim.get_variables(scope="dqn", collection=tf.GraphKeys.TRAINABLE_VARIABLES)
 			variables = [var.eval() for var in variables]
-			for task in tasks:
-				INPUT_QUEUE.put((task, False, variables, agent.total_t))
-			for _ in range(evaluate_num):
-				payoffs = OUTPUT_QUEUE.get()
-				reward += payoffs[0]
+			RUNNER.set_weights((variables, agent.total_t))
+
+			# Evaluate the performance
+			reward = 0
+			_, payoffs = RUNNER.run(evaluate_num, is_training=False)
+			for payoff in payoffs:
+				reward += payoff[0]
 			logger.log('\n########## Evaluation ##########')
 			logger.log('Average reward is {}'.format(float(reward)/evaluate_num))
 
 			# Add point to logger
-			logger.add_point(x=env.timestep, y=float(reward)/evaluate_num)
+			logger.add_point(x=step_counter, y=float(reward)/evaluate_num)
 
 			# Make plot
 			if (episode*evaluate_every) % save_plot_every == 0 and episode > 0:
@@ -170,10 +129,4 @@ if __name__ == '__main__':
 		logger.make_plot(save_path=figure_path+'final_'+str(episode)+'.png')
 
 		# Close multi-processes
-		for _ in range(PROCESS_NUM):
-			INPUT_QUEUE.put(None)
-
-		INPUT_QUEUE.join()
-
-		for p in PROCESSES:
-			p.join()
+		RUNNER.close()
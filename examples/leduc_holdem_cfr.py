@@ -7,15 +7,19 @@ from rlcard.agents.cfr_agent import CFRAgent
 from rlcard import models
 from rlcard.utils.utils import set_global_seed
 from rlcard.utils.logger import Logger
+from rlcard.utils.public_tree import build_leduc_tree
+from rlcard.utils.exploitability import exploitability, expected_payoffs
 
 # Make environment and enable human mode
 env = rlcard.make('leduc-holdem', allow_step_back=True)
 eval_env = rlcard.make('leduc-holdem')
 
+# The public tree to evaluate the agent exactly
+tree = build_leduc_tree(eval_env)
+
 # Set the iterations numbers and how frequently we evaluate/save plot
 evaluate_every = 100
 save_plot_every = 1000
-evaluate_num = 10000
 episode_num = 10000000
 
 # The paths for saving the logs and learning curves
@@ -32,7 +36,7 @@ agent = CFRAgent(env)
 agent.load()  # If we have saved model, we first load the model
 
 # Evaluate CFR against pre-trained NFSP
-eval_env.set_agents([agent, models.load('leduc-holdem-nfsp').agents[0]])
+eval_agents = [agent, models.load('leduc-holdem-nfsp').agents[0]]
 
 # Init a Logger to plot the learning curve
 logger = Logger(xlabel='iteration', ylabel='reward', legend='CFR on Leduc Holdem', log_path=log_path, csv_path=csv_path)
@@ -44,17 +48,15 @@ for episode in range(episode_num):
     if episode % evaluate_every == 0:
         agent.save() # Save model
 
-        reward = 0
-        for eval_episode in range(evaluate_num):
-            _, payoffs = eval_env.run(is_training=False)
-
-            reward += payoffs[0]
+        # The exact expected payoff instead of the average of sampled games
+        reward = expected_payoffs(tree, eval_agents)[0]
 
         logger.log('\n########## Evaluation ##########')
-        logger.log('Iteration: {} Average reward is {}'.format(episode, float(reward)/evaluate_num))
+        logger.log('Iteration: {} Average reward is {}'.format(episode, reward))
+        logger.log('Iteration: {} Exploitability is {}'.format(episode, exploitability(tree, agent)))
 
         # Add point to logger
-        logger.add_point(x=env.timestep, y=float(reward)/evaluate_num)
+        logger.add_point(x=env.timestep, y=reward)
 
     # Make plot
     if episode % save_plot_every == 0 and episode > 0:
@@ -1,53 +1,378 @@
 import numpy as np
-import collections
 
+import hashlib
 import os
 import pickle
 
 from rlcard.utils.utils import *
 
+class InfosetTable(object):
+    ''' Store the regrets and the strategies of the information sets in
+    contiguous arrays with shape [num_infosets, action_num]. An information
+    set gets a dense integer ID the first time it is visited.
+    '''
+
+    def __init__(self, action_num, capacity=1024):
+        ''' Initialize the table
+
+        Args:
+            action_num (int): The size of the action space
+            capacity (int): The number of information sets to allocate first.
+                            The arrays grow automatically.
+        '''
+        self.action_num = action_num
+        self.index = {}
+        self._regrets = np.zeros((capacity, action_num))
+        self._average_policy = np.zeros((capacity, action_num))
+        self._policy = np.full((capacity, action_num), 1.0 / action_num)
+        self._owners = np.full(capacity, -1, dtype=np.int8)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def regrets(self):
+        ''' The cumulative regrets with shape [num_infosets, action_num]
+        '''
+        return self._regrets[:len(self.index)]
+
+    @property
+    def average_policy(self):
+        ''' The unnormalized strategy sums with shape [num_infosets, action_num]
+        '''
+        return self._average_policy[:len(self.index)]
+
+    @property
+    def policy(self):
+        ''' The current strategies with shape [num_infosets, action_num]
+        '''
+        return self._policy[:len(self.index)]
+
+    @property
+    def owners(self):
+        ''' The player acting in each information set, -1 if unknown
+        '''
+        return self._owners[:len(self.index)]
+
+    def get_id(self, key):
+        ''' Get the ID of an information set, assign a new one if it is not
+        in the table. The strategy of a new information set is uniform.
+
+        Args:
+            key (bytes): The key of the information set
+
+        Returns:
+            (int): The ID of the information set
+        '''
+        infoset_id = self.index.get(key)
+        if infoset_id is None:
+            infoset_id = len(self.index)
+            if infoset_id == self._regrets.shape[0]:
+                self._grow()
+            self.index[key] = infoset_id
+        return infoset_id
+
+    def regret_matching(self):
+        ''' Update the current strategies of all the information sets from
+        the positive regrets. The strategy is uniform if no regret is positive.
+        '''
+        positive_regrets = np.maximum(self.regrets, 0)
+        positive_regret_sums = positive_regrets.sum(axis=1, keepdims=True)
+        policy = self.policy
+        policy.fill(1.0 / self.action_num)
+        np.divide(positive_regrets, positive_regret_sums, out=policy, where=positive_regret_sums > 0)
+
+    def discount(self, positive_scale=1.0, negative_scale=1.0, strategy_scale=1.0, rows=None):
+        ''' Scale the regrets and the strategy sums
+
+        Args:
+            positive_scale (float): The scale of the positive regrets
+            negative_scale (float): The scale of the negative regrets
+            strategy_scale (float): The scale of the strategy sums
+            rows (numpy.array): Optional, a boolean mask of the information sets to scale
+        '''
+        if rows is None:
+            rows = slice(None)
+        regrets = self.regrets[rows]
+        regrets *= np.where(regrets > 0, positive_scale, negative_scale)
+        self.regrets[rows] = regrets
+        if strategy_scale != 1.0:
+            self.average_policy[rows] *= strategy_scale
+
+    def _grow(self):
+        ''' Double the capacity of the arrays
+        '''
+        capacity = max(2 * self._regrets.shape[0], 1)
+        for name, value in (('_regrets', 0.0), ('_average_policy', 0.0), ('_policy', 1.0 / self.action_num)):
+            old = getattr(self, name)
+            new = np.full((capacity, self.action_num), value)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+        owners = np.full(capacity, -1, dtype=np.int8)
+        owners[:self._owners.shape[0]] = self._owners
+        self._owners = owners
+
+    def __getstate__(self):
+        # Do not pickle the unused capacity
+        state = dict(self.__dict__)
+        for name in ('_regrets', '_average_policy', '_policy', '_owners'):
+            state[name] = state[name][:len(self.index)].copy()
+        return state
+
+    def save_compact(self, path):
+        ''' Save the table as a compact checkpoint: the 64-bit hashes of the
+        keys in sorted order and the float32 arrays in the same order, in
+        .npy files that can be memory-mapped by CompactInfosetTable
+
+        Args:
+            path (str): The directory of the checkpoint
+        '''
+        hashes = np.array([hash_infoset_key(key) for key in self.index], dtype=np.uint64)
+        order = np.argsort(hashes)
+        hashes = hashes[order]
+        if np.any(hashes[1:] == hashes[:-1]):
+            raise ValueError('Two information sets have the same hash')
+        if not os.path.exists(path):
+            os.makedirs(path)
+        np.save(os.path.join(path, 'infoset_keys.npy'), hashes)
+        for name in ('regrets', 'average_policy', 'policy'):
+            np.save(os.path.join(path, 'infoset_{}.npy'.format(name)), getattr(self, name)[order].astype(np.float32))
+        np.save(os.path.join(path, 'infoset_owners.npy'), self.owners[order])
+
+class CompactInfosetTable(object):
+    ''' A read-only table loaded from a compact checkpoint. The arrays are
+    memory-mapped, so loading does not read the table and the processes that
+    load the same checkpoint share the pages. An information set is found by
+    a binary search of the hash of its key.
+    '''
+
+    def __init__(self, path, mmap_mode='r'):
+        ''' Load the table
+
+        Args:
+            path (str): The directory of the checkpoint
+            mmap_mode (str): The mode of numpy.load, None to read the arrays into memory
+        '''
+        load = lambda name: np.load(os.path.join(path, 'infoset_{}.npy'.format(name)), mmap_mode=mmap_mode)
+        self.index = HashedIndex(load('keys'))
+        self._regrets = load('regrets')
+        self._average_policy = load('average_policy')
+        self._policy = load('policy')
+        self._owners = load('owners')
+        self.action_num = self._policy.shape[1]
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def regrets(self):
+        return self._regrets
+
+    @property
+    def average_policy(self):
+        return self._average_policy
+
+    @property
+    def policy(self):
+        return self._policy
+
+    @property
+    def owners(self):
+        return self._owners
+
+    def get_id(self, key):
+        ''' Get the ID of an information set
+
+        Args:
+            key (bytes): The key of the information set
+
+        Returns:
+            (int): The ID of the information set
+        '''
+        infoset_id = self.index.get(key)
+        if infoset_id is None:
+            raise ValueError('The compact table is read-only, the information set is not in it')
+        return infoset_id
+
+class HashedIndex(object):
+    ''' Map the keys of the information sets to their IDs with the sorted
+    hashes of the keys, like the dictionary index of InfosetTable
+    '''
+
+    def __init__(self, hashes):
+        ''' Initialize the index
+
+        Args:
+            hashes (numpy.array): The sorted hashes of the keys, the ID of a key is its position
+        '''
+        self.hashes = hashes
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        ''' Get the ID of a key
+
+        Args:
+            key (bytes): The key of the information set
+            default (object): The value returned if the key is not in the index
+
+        Returns:
+            (int): The ID of the information set
+        '''
+        key_hash = np.uint64(hash_infoset_key(key))
+        position = int(np.searchsorted(self.hashes, key_hash))
+        if position < len(self.hashes) and self.hashes[position] == key_hash:
+            return position
+        return default
+
+def hash_infoset_key(key):
+    ''' Hash the key of an information set to 64 bits. Unlike hash, the
+    hash does not change between processes.
+
+    Args:
+        key (bytes): The key of the information set
+
+    Returns:
+        (int): The hash
+    '''
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+# The update rules of CFRAgent
+CFR_VARIANTS = ('vanilla', 'cfr+', 'linear', 'dcfr')
+
 class CFRAgent():
-    ''' Implement CFR algorithm
+    ''' Implement CFR algorithm and its variants with faster convergence:
+
+        - 'vanilla': CFR with the strategies averaged with linear weights
+        - 'cfr+': the regrets are floored at zero after every iteration
+        - 'linear': the regrets and the strategies of iteration t are weighted by t
+        - 'dcfr': Discounted CFR, after iteration t the positive regrets are scaled
+          by t^alpha / (t^alpha + 1), the negative ones by t^beta / (t^beta + 1)
+          and the strategy sums by (t / (t + 1))^gamma
     '''
 
-    def __init__(self, env, model_path='./cfr_model'):
+    def __init__(self, env, model_path='./cfr_model', variant='vanilla', alternating=False,
+                 alpha=1.5, beta=0.0, gamma=2.0, perfect_recall=False):
         ''' Initilize Agent
 
         Args:
             env (Env): Env class
+            model_path (str): The directory to save the model
+            variant (str): The update rule, one of CFR_VARIANTS
+            alternating (boolean): True to update the policy after the traversal of
+              each player, so that the next player responds to the updated policy
+            alpha (float): The discount exponent of the positive regrets for 'dcfr'
+            beta (float): The discount exponent of the negative regrets for 'dcfr'
+            gamma (float): The discount exponent of the strategy sums for 'dcfr'
+            perfect_recall (boolean): True to append the betting history of the
+              states to the keys of the information sets, see `get_key`
         '''
+        if variant not in CFR_VARIANTS:
+            raise ValueError('Unknown CFR variant {}, expected one of {}'.format(variant, CFR_VARIANTS))
         self.env = env
         self.model_path = model_path
+        self.variant = variant
+        self.alternating = alternating
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.perfect_recall = perfect_recall
 
-        # A policy is a dict state_str -> action probabilities
-        self.policy = collections.defaultdict(list)
-        self.average_policy =collections.defaultdict(np.array)
-
-        # Regret is a dict state_str -> action regrets
-        self.regrets = collections.defaultdict(np.array)
+        # The regrets and the policies of all the information sets
+        self.table = InfosetTable(self.env.action_num)
 
         self.iteration = 0
 
+    @property
+    def policy(self):
+        return self.table.policy
+
+    @property
+    def average_policy(self):
+        return self.table.average_policy
+
+    @property
+    def regrets(self):
+        return self.table.regrets
+
     def train(self):
         ''' Do one iteration of CFR
         '''
+        self.check_trainable()
         self.iteration += 1
         # Firstly, tranvers tree to compute counterfactual regret for each player
         # The regrets are recorded in traversal
         for player_id in range(self.env.player_num):
-            self.env.init_game()
+            state, _ = self.env.init_game()
             probs = np.ones(self.env.player_num)
-            self.traverse_tree(probs, player_id)
+            self.traverse_tree(probs, player_id, state)
+            if self.alternating:
+                self.discount(self.table.owners == player_id)
+                self.update_policy()
 
         # Update policy
-        self.update_policy()
+        if not self.alternating:
+            self.discount()
+            self.update_policy()
+
+    def get_key(self, state):
+        ''' Get the key of the information set of a state. The key is the
+        observation by default. The observations of Leduc Hold'em and Limit
+        Hold'em only show the cards, so different betting histories share an
+        information set and the average policy does not converge to a Nash
+        equilibrium. With `perfect_recall`, the `action_history` of the state,
+        the actions and the public cards dealt after them, is appended to the
+        key, which gives the information sets perfect recall in these games.
 
-    def traverse_tree(self, probs, player_id):
+        Args:
+            state (dict): An extracted state
+
+        Returns:
+            (bytes): The key of the information set
+        '''
+        key = state['obs'].tobytes()
+        if self.perfect_recall:
+            key += repr(tuple(state['action_history'])).encode()
+        return key
+
+    def check_trainable(self):
+        ''' Check that the table can be updated. A table loaded from a compact
+        checkpoint is read-only.
+
+        Raises:
+            ValueError: If the table is a CompactInfosetTable
+        '''
+        if isinstance(self.table, CompactInfosetTable):
+            raise ValueError('The table is loaded from a compact checkpoint, which can only be '
+                             'evaluated. Save a full checkpoint to resume the training')
+
+    def discount(self, rows=None):
+        ''' Apply the discounts of the variant after an iteration
+
+        Args:
+            rows (numpy.array): Optional, a boolean mask of the information sets to discount
+        '''
+        t = self.iteration
+        if self.variant == 'cfr+':
+            self.table.discount(negative_scale=0.0, rows=rows)
+        elif self.variant == 'linear':
+            self.table.discount(t / (t + 1), t / (t + 1), t / (t + 1), rows=rows)
+        elif self.variant == 'dcfr':
+            self.table.discount(t ** self.alpha / (t ** self.alpha + 1),
+                                t ** self.beta / (t ** self.beta + 1),
+                                (t / (t + 1)) ** self.gamma, rows=rows)
+
+    def traverse_tree(self, probs, player_id, state):
         ''' Traverse the game tree, update the regrets
 
         Args:
             probs: The reach probability of the current node
             player_id: The player to update the value
+            state (dict): The state of the current player
 
         Returns:
             state_utilities (list): The expected utilities for all the players
@@ -57,24 +382,21 @@ class CFRAgent():
 
         current_player = self.env.get_player_id()
 
-        action_utilities = {}
-        state_utility = np.zeros(self.env.player_num)
-        obs, legal_actions = self.get_state(current_player)
-        action_probs = self.action_probs(obs, legal_actions, self.policy)
+        legal_actions = state['legal_actions']
+        infoset_id = self.table.get_id(self.get_key(state))
+        action_probs = self.action_probs(infoset_id, legal_actions, self.table.policy)
 
-        for action in legal_actions:
-            action_prob = action_probs[action]
+        action_utilities = np.zeros((len(legal_actions), self.env.player_num))
+        for i, action in enumerate(legal_actions):
             new_probs = probs.copy()
-            new_probs[current_player] *= action_prob
+            new_probs[current_player] *= action_probs[action]
 
             # Keep traversing the child state
-            self.env.step(action)
-            utility = self.traverse_tree(new_probs, player_id)
+            next_state, _ = self.env.step(action)
+            action_utilities[i] = self.traverse_tree(new_probs, player_id, next_state)
             self.env.step_back()
 
-            state_utility += action_prob * utility
-            action_utilities[action] = utility
-
+        state_utility = action_probs[legal_actions].dot(action_utilities)
         if not current_player == player_id:
             return state_utility
 
@@ -82,66 +404,60 @@ class CFRAgent():
         player_prob = probs[current_player]
         counterfactual_prob = (np.prod(probs[:current_player]) *
                                 np.prod(probs[current_player + 1:]))
-        player_state_utility = state_utility[current_player]
-
-        if obs not in self.regrets:
-            self.regrets[obs] = np.zeros(self.env.action_num)
-        if obs not in self.average_policy:
-            self.average_policy[obs] = np.zeros(self.env.action_num)
-        for action in legal_actions:
-            action_prob = action_probs[action]
-            regret = counterfactual_prob * (action_utilities[action][current_player]
-                    - player_state_utility)
-            self.regrets[obs][action] += regret
-            self.average_policy[obs][action] += self.iteration * player_prob * action_prob
+        regrets = counterfactual_prob * (action_utilities[:, current_player] - state_utility[current_player])
+        self.table.regrets[infoset_id, legal_actions] += regrets
+        # The discounted variants weight the strategies through the discounts
+        weight = self.iteration if self.variant in ('vanilla', 'cfr+') else 1.0
+        self.table.average_policy[infoset_id, legal_actions] += weight * player_prob * action_probs[legal_actions]
+        self.table.owners[infoset_id] = current_player
         return state_utility
 
     def update_policy(self):
         ''' Update policy based on the current regrets
         '''
-        for obs in self.regrets:
-            self.policy[obs] = self.regret_matching(obs)
+        self.table.regret_matching()
 
-    def regret_matching(self, obs):
-        ''' Apply regret matching
+    def action_probs(self, infoset_id, legal_actions, policy):
+        ''' Obtain the action probabilities of the current state
 
         Args:
-            obs (string): The state_str
-        '''
-        regret = self.regrets[obs]
-        positive_regret_sum = sum([r for r in regret if r > 0])
+            infoset_id (int): The ID of the information set, None if it is not in the table
+            legal_actions (list): List of leagel actions
+            policy (numpy.array): The used policy, the current or the average one
 
-        action_probs = np.zeros(self.env.action_num)
-        if positive_regret_sum > 0:
-            for action in range(self.env.action_num):
-                action_probs[action] = max(0.0, regret[action] / positive_regret_sum)
+        Returns:
+            action_probs(numpy.array): The action probabilities
+        '''
+        if infoset_id is None:
+            action_probs = np.ones(self.env.action_num)
         else:
-            for action in range(self.env.action_num):
-                action_probs[action] = 1.0 / self.env.action_num
+            action_probs = policy[infoset_id]
+        return remove_illegal(action_probs, legal_actions)
 
-        return action_probs
+    def get_average_probs(self, state):
+        ''' Get the action probabilities of the average policy
 
-    def action_probs(self, obs, legal_actions, policy):
-        ''' Obtain the action probabilities of the current state
+        Args:
+            state (dict): An extracted state
+
+        Returns:
+            (numpy.array): The probabilities of all the actions
+        '''
+        infoset_id = self.table.index.get(self.get_key(state))
+        return self.action_probs(infoset_id, state['legal_actions'], self.table.average_policy)
+
+    def batch_eval_probs(self, states):
+        ''' Get the action probabilities of the average policy for a batch of states
 
         Args:
-            obs (str): state_str
-            legal_actions (list): List of leagel actions
-            player_id (int): The current player
-            policy (dict): The used policy
+            states (dict): batched states with `obs` of shape [batch, *state_shape], `legal_actions`
+              and `action_history` if the keys have perfect recall
 
         Returns:
-            (tuple) that contains:
-                action_probs(numpy.array): The action probabilities
-                legal_actions (list): Indices of legal actions
+            (numpy.array): The probabilities with shape [batch, action_num]
         '''
-        if obs not in policy:
-            action_probs = np.array([1.0/self.env.action_num for _ in range(self.env.action_num)])
-            self.policy[obs] = action_probs
-        else:
-            action_probs = policy[obs]
-        action_probs = remove_illegal(action_probs, legal_actions)
-        return action_probs
+        return np.array([self.get_average_probs(dict(zip(states, values)))
+                         for values in zip(*states.values())])
 
     def eval_step(self, state):
         ''' Given a state, predict action based on average policy
@@ -152,7 +468,7 @@ class CFRAgent():
         Returns:
             action (int): Predicted action
         '''
-        probs = self.action_probs(state['obs'].tostring(), state['legal_actions'], self.average_policy)
+        probs = self.get_average_probs(state)
         action = np.random.choice(len(probs), p=probs)
         return action
 
@@ -168,49 +484,71 @@ class CFRAgent():
                 legal_actions (list): Indices of legal actions
         '''
         state = self.env.get_state(player_id)
-        return state['obs'].tostring(), state['legal_actions']
+        return self.get_key(state), state['legal_actions']
 
-    def save(self):
+    def save(self, compact=False):
         ''' Save model
+
+        Args:
+            compact (boolean): True to save a compact checkpoint for serving. It
+              stores the hashes of the keys, so the training cannot be resumed from it
         '''
         if not os.path.exists(self.model_path):
             os.makedirs(self.model_path)
 
-        policy_file = open(os.path.join(self.model_path, 'policy.pkl'),'wb')
-        pickle.dump(self.policy, policy_file)
-        policy_file.close()
-
-        average_policy_file = open(os.path.join(self.model_path, 'average_policy.pkl'),'wb')
-        pickle.dump(self.average_policy, average_policy_file)
-        average_policy_file.close()
-
-        regrets_file = open(os.path.join(self.model_path, 'regrets.pkl'),'wb')
-        pickle.dump(self.regrets, regrets_file)
-        regrets_file.close()
+        if compact:
+            self.table.save_compact(self.model_path)
+        else:
+            table_file = open(os.path.join(self.model_path, 'infoset_table.pkl'),'wb')
+            pickle.dump(self.table, table_file)
+            table_file.close()
 
         iteration_file = open(os.path.join(self.model_path, 'iteration.pkl'),'wb')
         pickle.dump(self.iteration, iteration_file)
         iteration_file.close()
 
-    def load(self):
-        ''' Load model
+    def load(self, compact=False):
+        ''' Load model. The models saved as dictionaries of arrays are converted.
+        A compact checkpoint is loaded if the directory only has one.
+
+        Args:
+            compact (boolean): True to memory-map a compact checkpoint. The
+              table is read-only and the agent can only be evaluated
         '''
         if not os.path.exists(self.model_path):
             return
 
-        policy_file = open(os.path.join(self.model_path, 'policy.pkl'),'rb')
-        self.policy = pickle.load(policy_file)
-        policy_file.close()
-
-        average_policy_file = open(os.path.join(self.model_path, 'average_policy.pkl'),'rb')
-        self.average_policy = pickle.load(average_policy_file)
-        average_policy_file.close()
-
-        regrets_file = open(os.path.join(self.model_path, 'regrets.pkl'),'rb')
-        self.regrets = pickle.load(regrets_file)
-        regrets_file.close()
+        table_path = os.path.join(self.model_path, 'infoset_table.pkl')
+        compact_only = (not os.path.exists(table_path)
+                        and not os.path.exists(os.path.join(self.model_path, 'policy.pkl'))
+                        and os.path.exists(os.path.join(self.model_path, 'infoset_keys.npy')))
+        if compact or compact_only:
+            self.table = CompactInfosetTable(self.model_path)
+        elif os.path.exists(table_path):
+            table_file = open(table_path,'rb')
+            self.table = pickle.load(table_file)
+            table_file.close()
+        else:
+            self.table = self._load_dict_table()
 
         iteration_file = open(os.path.join(self.model_path, 'iteration.pkl'),'rb')
         self.iteration = pickle.load(iteration_file)
         iteration_file.close()
 
+    def _load_dict_table(self):
+        ''' Load a model saved with one dictionary per array
+
+        Returns:
+            (InfosetTable): The table with the loaded arrays
+        '''
+        dicts = {}
+        for name in ('policy', 'average_policy', 'regrets'):
+            dict_file = open(os.path.join(self.model_path, name + '.pkl'),'rb')
+            dicts[name] = pickle.load(dict_file)
+            dict_file.close()
+        table = InfosetTable(self.env.action_num)
+        for name in ('policy', 'average_policy', 'regrets'):
+            for key, value in dicts[name].items():
+                infoset_id = table.get_id(key)
+                getattr(table, name)[infoset_id] = value
+        return table
@@ -49,6 +49,27 @@ AdvantageMemory = collections.namedtuple(
 StrategyMemory = collections.namedtuple(
     'StrategyMemory', 'info_state iteration strategy_action_probs')
 
+class TraversalNode(object):
+    ''' A node visited by the batched traversals, with its own copy of the env
+    '''
+
+    def __init__(self, env, state, parent):
+        ''' Initialize the node
+
+        Args:
+            env (Env): The env at the node, released when the node is expanded
+            state (dict): The state of the current player
+            parent (int): The index of the parent node, None for a root
+        '''
+        self.env = env
+        self.state = state
+        self.parent = parent
+        self.player = None
+        self.strategy = None
+        self.actions = []
+        self.children = []
+        self.value = None
+
 class FixedSizeRingBuffer(object):
     ''' ReplayBuffer of fixed size with a FIFO replacement policy.
 
@@ -135,7 +156,8 @@ class DeepCFR():
              learning_rate=1e-4,
              batch_size_advantage=16,
              batch_size_strategy=16,
-             memory_capacity=int(1e7)):
+             memory_capacity=int(1e7),
+             traversal_batch_size=None):
         ''' Initialize the Deep CFR
 
         Args:
@@ -150,6 +172,9 @@ class DeepCFR():
             batch_size_strategy (int or None): Batch size to sample from strategy
             memories
             memory_capacity (int): Number af samples that can be stored in memory
+            traversal_batch_size (int or None): Number of traversals run together,
+            with the advantage networks queried once for all the states at the same
+            depth. None to run the traversals one by one with env.step_back
         '''
         self._env = env
         self._session = session
@@ -157,6 +182,7 @@ class DeepCFR():
         self._batch_size_strategy = batch_size_strategy
         self._num_players = env.player_num
         self._num_step = num_step
+        self._traversal_batch_size = traversal_batch_size
         self.advantage_losses = collections.defaultdict(list)
         self.traverse = []
 
@@ -260,11 +286,15 @@ class DeepCFR():
         init_state, init_player = self._env.init_game()
         self._root_node = init_state
         for p in range(self._num_players):
-            while init_player != p:
-                init_state, init_player = self._env.init_game()
-                self._root_node = init_state
-            for _ in range(self._num_traversals):
-                self._traverse_game_tree(self._root_node, init_player)
+            if self._traversal_batch_size:
+                for start in range(0, self._num_traversals, self._traversal_batch_size):
+                    self._traverse_game_trees(p, min(self._traversal_batch_size, self._num_traversals - start))
+            else:
+                while init_player != p:
+                    init_state, init_player = self._env.init_game()
+                    self._root_node = init_state
+                for _ in range(self._num_traversals):
+                    self._traverse_game_tree(self._root_node, init_player)
 
             # Re-initialize advantage networks and train from scratch.
             self.reinitialize_advantage_networks()
@@ -405,6 +435,90 @@ class DeepCFR():
                     self._iteration, strategy))
             return self._traverse_game_tree(child_state, player)
 
+    def _traverse_game_trees(self, player, num_traversals):
+        ''' Performs traversals of new games together, with external sampling.
+
+        The traversals are expanded one depth at a time. The states of all the
+        nodes at a depth are sent to the advantage networks in one batch, and
+        each child node steps its own clone of the env. The values are then
+        computed from the leaves to the roots to fill the memories.
+
+        Args:
+            player (int): Player index for the traversals.
+            num_traversals (int): Number of traversals.
+        '''
+        nodes = []
+        for _ in range(num_traversals):
+            state, _ = self._env.init_game()
+            nodes.append(TraversalNode(self._env.clone(), state, None))
+
+        frontier = list(range(len(nodes)))
+        while frontier:
+            pending = []
+            for index in frontier:
+                node = nodes[index]
+                if node.env.is_over():
+                    node.value = node.env.get_payoffs()[player]
+                    node.env = None
+                else:
+                    pending.append(index)
+            if not pending:
+                break
+
+            info_states = np.array([nodes[index].state['obs'].flatten() for index in pending])
+            advantages = self._session.run(self._advantage_outputs, feed_dict={self._info_state_ph: info_states})
+            frontier = []
+            for row, index in enumerate(pending):
+                node = nodes[index]
+                node.player = node.env.get_player_id()
+                legal_actions = node.state['legal_actions']
+                node.strategy = self._match_regrets(advantages[node.player][row], legal_actions)
+                if node.player == player:
+                    node.actions = list(legal_actions)
+                else:
+                    node.actions = [np.random.choice(self._num_actions, p=node.strategy)]
+                    self._strategy_memories.add(StrategyMemory(info_states[row], self._iteration, node.strategy))
+
+                # The last child takes over the env of the node
+                envs = [node.env.clone() for _ in node.actions[1:]] + [node.env]
+                node.env = None
+                for action, env in zip(node.actions, envs):
+                    child_state, _ = env.step(action)
+                    node.children.append(len(nodes))
+                    frontier.append(len(nodes))
+                    nodes.append(TraversalNode(env, child_state, index))
+
+        # The children are after their parents
+        for node in reversed(nodes):
+            if not node.children:
+                continue
+            values = np.array([nodes[child].value for child in node.children])
+            if node.player != player:
+                node.value = values[0]
+                continue
+            node.value = node.strategy[node.actions].dot(values)
+            info_state = node.state['obs'].flatten()
+            for action, value in zip(node.actions, values):
+                self._advantage_memories[player].add(AdvantageMemory(info_state, self._iteration, value - node.value, action))
+
+    def _match_regrets(self, advantages, legal_actions):
+        ''' Computes the policy of an info state by regret matching.
+
+        Args:
+            advantages (numpy.array): Advantage values of all the actions.
+            legal_actions (list): Legal actions.
+
+        Returns:
+            (numpy.array) Probabilities of all the actions.
+        '''
+        probs = np.zeros(self._num_actions)
+        probs[legal_actions] = np.maximum(advantages[legal_actions], 0.)
+        if probs.sum() > 0.:
+            probs /= probs.sum()
+        else:
+            probs[legal_actions] = 1. / len(legal_actions)
+        return probs
+
     def _sample_action_from_advantage(self, state, player):
         ''' Returns an info state policy by applying regret-matching.
 
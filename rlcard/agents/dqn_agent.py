@@ -27,12 +27,9 @@ SOFTWARE.
 import random
 import numpy as np
 import tensorflow as tf
-from collections import namedtuple
 
 from rlcard.utils.utils import remove_illegal
 
-Transition = namedtuple('Transition', ['state', 'action', 'reward', 'next_state', 'done'])
-
 
 class DQNAgent(object):
 
@@ -51,7 +48,10 @@ class DQNAgent(object):
                  state_shape=None,
                  norm_step=100,
                  mlp_layers=None,
-                 learning_rate=0.00005):
+                 learning_rate=0.00005,
+                 prioritized_replay=False,
+                 prioritized_alpha=0.6,
+                 prioritized_beta=0.4):
 
         '''
         Q-Learning algorithm for off-policy TD control using Function Approximation.
@@ -77,6 +77,9 @@ class DQNAgent(object):
             norm_step (int): The number of the step used form noramlize state
             mlp_layers (list): The layer number and the dimension of each layer in MLP
             learning_rate (float): The learning rate of the DQN agent.
+            prioritized_replay (boolean): True if sampling the transitions proportionally to their TD errors
+            prioritized_alpha (float): How much prioritization is used in prioritized replay
+            prioritized_beta (float): The exponent of the importance-sampling weights in prioritized replay
         '''
         self.sess = sess
         self.scope = scope
@@ -100,14 +103,21 @@ class DQNAgent(object):
 
         # Create estimators
         #with tf.variable_scope(scope):
+        variables = set(tf.global_variables())
         self.q_estimator = Estimator(scope=self.scope+"_q", action_num=action_num, learning_rate=learning_rate, state_shape=state_shape, mlp_layers=mlp_layers)
         self.target_estimator = Estimator(scope=self.scope+"_target_q", action_num=action_num, learning_rate=learning_rate, state_shape=state_shape, mlp_layers=mlp_layers)
+        self.variables = [v for v in tf.global_variables() if v not in variables]
+        self.saver = None
 
         # Create normalizer
         self.normalizer = Normalizer()
 
         # Create replay memory
-        self.memory = Memory(replay_memory_size, batch_size)
+        self.prioritized_replay = prioritized_replay
+        if prioritized_replay:
+            self.memory = PrioritizedMemory(replay_memory_size, batch_size, state_shape, prioritized_alpha, prioritized_beta)
+        else:
+            self.memory = Memory(replay_memory_size, batch_size, state_shape)
 
     def feed(self, ts):
         ''' Store data in to replay buffer and train the agent. There are two stages.
@@ -153,6 +163,53 @@ class DQNAgent(object):
         best_action = np.argmax(probs)
         return best_action
 
+    def batch_step(self, states):
+        ''' Predict the actions of a batch of states for generating training data
+
+        Args:
+            states (dict): batched states with `obs` of shape [batch, *state_shape] and `legal_actions`
+
+        Returns:
+            actions (numpy.array): an array of action ids
+        '''
+        A = self.predict_batch(states['obs'])
+        actions = np.zeros(len(A), dtype=int)
+        for i, legal_actions in enumerate(states['legal_actions']):
+            probs = remove_illegal(A[i], legal_actions)
+            actions[i] = np.random.choice(np.arange(len(probs)), p=probs)
+        return actions
+
+    def batch_eval_step(self, states):
+        ''' Predict the actions of a batch of states for evaluation purpose.
+
+        Args:
+            states (dict): batched states with `obs` of shape [batch, *state_shape] and `legal_actions`
+
+        Returns:
+            actions (numpy.array): an array of action ids
+        '''
+        q_values = self.q_estimator.predict(self.sess, self.normalizer.normalize(states['obs']))
+        actions = np.zeros(len(q_values), dtype=int)
+        for i, legal_actions in enumerate(states['legal_actions']):
+            actions[i] = np.argmax(remove_illegal(np.exp(q_values[i]), legal_actions))
+        return actions
+
+    def batch_eval_probs(self, states):
+        ''' Get the action probabilities of eval_step for a batch of states,
+            all the mass is on the greedy legal action
+
+        Args:
+            states (dict): batched states with `obs` of shape [batch, *state_shape] and `legal_actions`
+
+        Returns:
+            probs (numpy.array): The probabilities with shape [batch, action_num]
+        '''
+        q_values = self.q_estimator.predict(self.sess, self.normalizer.normalize(states['obs']))
+        probs = np.zeros((len(q_values), self.action_num))
+        for i, legal_actions in enumerate(states['legal_actions']):
+            probs[i, np.argmax(remove_illegal(np.exp(q_values[i]), legal_actions))] = 1
+        return probs
+
     def predict(self, state):
         ''' Predict the action probabilities
 
@@ -162,11 +219,22 @@ class DQNAgent(object):
         Returns:
             q_values (numpy.array): a 1-d array where each entry represents a Q value
         '''
+        return self.predict_batch(np.expand_dims(state, 0))[0]
+
+    def predict_batch(self, states):
+        ''' Predict the action probabilities of a batch of states
+
+        Args:
+            states (numpy.array): states with shape [batch, *state_shape]
+
+        Returns:
+            A (numpy.array): a 2-d array where each row holds the action probabilities of a state
+        '''
         epsilon = self.epsilons[min(self.total_t, self.epsilon_decay_steps-1)]
-        A = np.ones(self.action_num, dtype=float) * epsilon / self.action_num
-        q_values = self.q_estimator.predict(self.sess, np.expand_dims(self.normalizer.normalize(state), 0))[0]
-        best_action = np.argmax(q_values)
-        A[best_action] += (1.0 - epsilon)
+        A = np.ones((len(states), self.action_num), dtype=float) * epsilon / self.action_num
+        q_values = self.q_estimator.predict(self.sess, self.normalizer.normalize(states))
+        best_actions = np.argmax(q_values, axis=1)
+        A[np.arange(len(states)), best_actions] += (1.0 - epsilon)
         return A
 
     def train(self):
@@ -175,7 +243,11 @@ class DQNAgent(object):
         Returns:
             loss (float): The loss of the current batch.
         '''
-        state_batch, action_batch, reward_batch, next_state_batch, done_batch = self.memory.sample()
+        weights = None
+        if self.prioritized_replay:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch, indices, weights = self.memory.sample()
+        else:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch = self.memory.sample()
         # Calculate q values and targets (Double DQN)
         q_values_next = self.q_estimator.predict(self.sess, next_state_batch)
         best_actions = np.argmax(q_values_next, axis=1)
@@ -186,7 +258,9 @@ class DQNAgent(object):
         # Perform gradient descent update
         state_batch = np.array(state_batch)
 
-        loss = self.q_estimator.update(self.sess, state_batch, action_batch, target_batch)
+        loss, td_errors = self.q_estimator.update(self.sess, state_batch, action_batch, target_batch, weights)
+        if self.prioritized_replay:
+            self.memory.update_priorities(indices, td_errors)
 
         # Update the target estimator
         if self.train_t % self.update_target_estimator_every == 0:
@@ -216,6 +290,35 @@ class DQNAgent(object):
         '''
         self.memory.save(self.normalizer.normalize(state), action, reward, self.normalizer.normalize(next_state), done)
 
+    def save(self, path):
+        ''' Save a checkpoint of the agent. The variables of the estimators are
+            saved with a tf.train.Saver, and the normalizer and the step
+            counters to `path + '_state.npz'`
+
+        Args:
+            path (string): The path prefix of the checkpoint files
+        '''
+        if self.saver is None:
+            self.saver = tf.train.Saver(self.variables)
+        self.saver.save(self.sess, path)
+        state = {'normalizer_' + key: value for key, value in self.normalizer.state_dict().items()}
+        np.savez(path + '_state.npz', total_t=self.total_t, train_t=self.train_t, **state)
+
+    def load(self, path):
+        ''' Load a checkpoint saved by `save`
+
+        Args:
+            path (string): The path prefix of the checkpoint files
+        '''
+        if self.saver is None:
+            self.saver = tf.train.Saver(self.variables)
+        self.saver.restore(self.sess, path)
+        with np.load(path + '_state.npz') as data:
+            self.normalizer.load_state_dict({key[len('normalizer_'):]: data[key]
+                                             for key in data.files if key.startswith('normalizer_')})
+            self.total_t = int(data['total_t'])
+            self.train_t = int(data['train_t'])
+
     def copy_params_op(self, global_vars):
         ''' Copys the variables of two estimator to others.
 
@@ -232,16 +335,22 @@ class DQNAgent(object):
 
 
 class Normalizer(object):
-    ''' Normalizer class that tracks the running statistics for normlization
+    ''' Normalizer class that tracks the running statistics for normlization.
+        The mean and the variance are updated incrementally (Welford's algorithm),
+        or with exponential weighting if a decay is given.
     '''
 
-    def __init__(self):
+    def __init__(self, decay=None):
         ''' Initialize a Normalizer instance.
+
+        Args:
+            decay (float): Optional, the weight of the old statistics for each new state.
+              If None, all the states have the same weight
         '''
+        self.decay = decay
         self.mean = None
+        self.var = None
         self.std = None
-        self.state_memory = []
-        self.max_size = 1000
         self.length = 0
 
     def normalize(self, s):
@@ -255,7 +364,7 @@ class Normalizer(object):
         '''
         if self.length == 0:
             return s
-        return (s - self.mean) / (self.std + 1e-8)
+        return (s - self.mean) / self.std
 
     def append(self, s):
         ''' Append a new state and update the running statistics
@@ -263,12 +372,95 @@ class Normalizer(object):
         Args:
             s (numpy.array): the input state
         '''
-        if len(self.state_memory) > self.max_size:
-            self.state_memory.pop(0)
-        self.state_memory.append(s)
-        self.mean = np.mean(self.state_memory, axis=0)
-        self.std = np.mean(self.state_memory, axis=0)
-        self.length = len(self.state_memory)
+        self.append_many(np.expand_dims(s, 0))
+
+    def append_many(self, states):
+        ''' Append a batch of states and update the running statistics
+
+        Args:
+            states (numpy.array): the input states with shape [batch, *state_shape]
+        '''
+        states = np.asarray(states, dtype=np.float64)
+        num = len(states)
+        if num == 0:
+            return
+        batch_mean = np.mean(states, axis=0)
+        batch_var = np.var(states, axis=0)
+        if self.length == 0:
+            self.mean, self.var = batch_mean, batch_var
+        else:
+            delta = batch_mean - self.mean
+            if self.decay is None:
+                # Merge the statistics of the two sets (Chan et al.)
+                total = self.length + num
+                self.mean = self.mean + delta * num / total
+                self.var = (self.var * self.length + batch_var * num + delta ** 2 * self.length * num / total) / total
+            else:
+                weight = 1 - self.decay ** num
+                self.mean = self.mean + weight * delta
+                self.var = (1 - weight) * (self.var + weight * delta ** 2) + weight * batch_var
+        self.length += num
+        self.std = self._get_std(self.var)
+
+    @staticmethod
+    def _get_std(var):
+        ''' Compute the standard deviations to divide the states by. The constant
+            features are only centered
+
+        Args:
+            var (numpy.array): The variances
+
+        Returns:
+            (numpy.array): The standard deviations, 1 where the variance is about 0
+        '''
+        std = np.sqrt(var)
+        return np.where(std < 1e-6, 1.0, std)
+
+    def state_dict(self):
+        ''' Get the running statistics
+
+        Returns:
+            (dict): A dictionary of numpy arrays that can be saved with the checkpoints
+        '''
+        state = {'length': np.array(self.length),
+                 'decay': np.array(np.nan if self.decay is None else self.decay)}
+        if self.length > 0:
+            state['mean'] = self.mean
+            state['var'] = self.var
+        return state
+
+    def load_state_dict(self, state):
+        ''' Restore the running statistics
+
+        Args:
+            state (dict): A dictionary returned by `state_dict`
+        '''
+        decay = float(state['decay'])
+        self.decay = None if np.isnan(decay) else decay
+        self.length = int(state['length'])
+        if self.length > 0:
+            self.mean = np.array(state['mean'])
+            self.var = np.array(state['var'])
+            self.std = self._get_std(self.var)
+        else:
+            self.mean, self.var, self.std = None, None, None
+
+    def save(self, path):
+        ''' Save the running statistics to a .npz file
+
+        Args:
+            path (string): The path of the file
+        '''
+        np.savez(path, **self.state_dict())
+
+    def load(self, path):
+        ''' Load the running statistics from a .npz file
+
+        Args:
+            path (string): The path of the file
+        '''
+        with np.load(path) as state:
+            self.load_state_dict(dict(state))
 
 
 class Estimator():
@@ -309,6 +501,8 @@ class Estimator():
         self.y_pl = tf.placeholder(shape=[None], dtype=tf.float32, name="y")
         # Integer id of which action was selected
         self.actions_pl = tf.placeholder(shape=[None], dtype=tf.int32, name="actions")
+        # Importance-sampling weights of the samples, all ones without prioritized replay
+        self.weights_pl = tf.placeholder_with_default(tf.ones_like(self.y_pl), shape=[None], name="weights")
 
         batch_size = tf.shape(self.X_pl)[0]
 
@@ -323,8 +517,9 @@ class Estimator():
         self.action_predictions = tf.gather(tf.reshape(self.predictions, [-1]), gather_indices)
 
         # Calculate the loss
+        self.td_errors = self.y_pl - self.action_predictions
         self.losses = tf.squared_difference(self.y_pl, self.action_predictions)
-        self.loss = tf.reduce_mean(self.losses)
+        self.loss = tf.reduce_mean(self.weights_pl * self.losses)
 
     def predict(self, sess, s):
         ''' Predicts action values.
@@ -339,7 +534,7 @@ class Estimator():
         '''
         return sess.run(self.predictions, { self.X_pl: s })
 
-    def update(self, sess, s, a, y):
+    def update(self, sess, s, a, y, weights=None):
         ''' Updates the estimator towards the given targets.
 
         Args:
@@ -347,31 +542,60 @@ class Estimator():
           s (list): State input of shape [batch_size, 4, 160, 160, 3]
           a (list): Chosen actions of shape [batch_size]
           y (list): Targets of shape [batch_size]
+          weights (list): Optional, importance-sampling weights of shape [batch_size]
 
         Returns:
-          The calculated loss on the batch.
+          The calculated loss on the batch and the TD errors of shape [batch_size].
         '''
         feed_dict = { self.X_pl: s, self.y_pl: y, self.actions_pl: a }
-        _, _, loss = sess.run(
-                [tf.contrib.framework.get_global_step(), self.train_op, self.loss],
+        if weights is not None:
+            feed_dict[self.weights_pl] = weights
+        _, _, loss, td_errors = sess.run(
+                [tf.contrib.framework.get_global_step(), self.train_op, self.loss, self.td_errors],
                 feed_dict)
-        return loss
+        return loss, td_errors
 
 class Memory(object):
-    ''' Memory for saving transitions
+    ''' Memory for saving transitions. The transitions are stored in
+        preallocated arrays that are used as a ring buffer.
     '''
 
-    def __init__(self, memory_size, batch_size):
+    def __init__(self, memory_size, batch_size, state_shape=None):
         ''' Initialize
         Args:
             memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled batches
+            state_shape (list): the shape of the state. If None, it is inferred from the first saved state
         '''
         self.memory_size = memory_size
         self.batch_size = batch_size
-        self.memory = []
+        self.state_shape = None
+
+        # The position to write the next transition and the number of stored transitions
+        self.position = 0
+        self.size = 0
+
+        if state_shape is not None:
+            self._allocate(state_shape)
+
+    def _allocate(self, state_shape):
+        ''' Allocate the arrays of the ring buffer
+
+        Args:
+            state_shape (list): the shape of the state
+        '''
+        self.state_shape = list(state_shape)
+        self.states = np.zeros([self.memory_size] + self.state_shape, dtype=np.float32)
+        self.actions = np.zeros(self.memory_size, dtype=np.int32)
+        self.rewards = np.zeros(self.memory_size, dtype=np.float32)
+        self.next_states = np.zeros([self.memory_size] + self.state_shape, dtype=np.float32)
+        self.dones = np.zeros(self.memory_size, dtype=bool)
+
+    def __len__(self):
+        return self.size
 
     def save(self, state, action, reward, next_state, done):
-        ''' Save transition into memory
+        ''' Save transition into memory. The oldest transition is overwritten if the memory is full
 
         Args:
             state (numpy.array): the current state
@@ -380,23 +604,184 @@ class Memory(object):
             next_state (numpy.array): the next state after performing the action
             done (boolean): whether the episode is finished
         '''
-        if len(self.memory) == self.memory_size:
-            self.memory.pop(0)
-        transition = Transition(state, action, reward, next_state, done)
-        self.memory.append(transition)
+        if self.memory_size == 0:
+            return
+        if self.state_shape is None:
+            self._allocate(np.shape(state))
+        self.states[self.position] = state
+        self.actions[self.position] = action
+        self.rewards[self.position] = reward
+        self.next_states[self.position] = next_state
+        self.dones[self.position] = done
+        self.position = (self.position + 1) % self.memory_size
+        self.size = min(self.size + 1, self.memory_size)
 
     def sample(self):
         ''' Sample a minibatch from the replay memory
 
         Returns:
-            state_batch (list): a batch of states
-            action_batch (list): a batch of actions
-            reward_batch (list): a batch of rewards
-            next_state_batch (list): a batch of states
-            done_batch (list): a batch of dones
-        '''
-        samples = random.sample(self.memory, self.batch_size)
-        return map(np.array, zip(*samples))
+            state_batch (numpy.array): a batch of states
+            action_batch (numpy.array): a batch of actions
+            reward_batch (numpy.array): a batch of rewards
+            next_state_batch (numpy.array): a batch of states
+            done_batch (numpy.array): a batch of dones
+        '''
+        indices = np.array(random.sample(range(self.size), self.batch_size), dtype=int)
+        return self.get(indices)
+
+    def get(self, indices):
+        ''' Get the transitions at the given positions
+
+        Args:
+            indices (numpy.array): the positions of the transitions
+
+        Returns:
+            (tuple): the batches of states, actions, rewards, next states and dones
+        '''
+        return self.states[indices], self.actions[indices], self.rewards[indices], \
+            self.next_states[indices], self.dones[indices]
+
+class PrioritizedMemory(Memory):
+    ''' Memory for prioritized experience replay. The transitions are sampled
+        proportionally to their priorities, which are stored in a sum-tree.
+
+    See the paper https://arxiv.org/abs/1511.05952 for more details.
+    '''
+
+    def __init__(self, memory_size, batch_size, state_shape=None, alpha=0.6, beta=0.4, epsilon=1e-6):
+        ''' Initialize
+        Args:
+            memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled batches
+            state_shape (list): the shape of the state. If None, it is inferred from the first saved state
+            alpha (float): how much prioritization is used, 0 means uniform sampling
+            beta (float): the exponent of the importance-sampling weights
+            epsilon (float): a small value added to the priorities so that no transition has zero probability
+        '''
+        super().__init__(memory_size, batch_size, state_shape)
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.tree = SumTree(max(memory_size, 1))
+        self.max_priority = 1.0
+
+    def save(self, state, action, reward, next_state, done):
+        ''' Save transition into memory with the maximum priority so that it is replayed at least once
+
+        Args:
+            state (numpy.array): the current state
+            action (int): the performed action ID
+            reward (float): the reward received
+            next_state (numpy.array): the next state after performing the action
+            done (boolean): whether the episode is finished
+        '''
+        if self.memory_size == 0:
+            return
+        self.tree.update(np.array([self.position]), np.array([self.max_priority]))
+        super().save(state, action, reward, next_state, done)
+
+    def sample(self):
+        ''' Sample a minibatch proportionally to the priorities
+
+        Returns:
+            state_batch (numpy.array): a batch of states
+            action_batch (numpy.array): a batch of actions
+            reward_batch (numpy.array): a batch of rewards
+            next_state_batch (numpy.array): a batch of states
+            done_batch (numpy.array): a batch of dones
+            indices (numpy.array): the positions of the sampled transitions, used to update the priorities
+            weights (numpy.array): the importance-sampling weights of the sampled transitions
+        '''
+        # Stratified sampling: one value in each of the batch_size segments of the total priority
+        segment = self.tree.total() / self.batch_size
+        values = (np.arange(self.batch_size) + np.random.uniform(size=self.batch_size)) * segment
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+
+        probs = self.tree.get(indices) / self.tree.total()
+        weights = (self.size * probs) ** (-self.beta)
+        weights = (weights / weights.max()).astype(np.float32)
+        return self.get(indices) + (indices, weights)
+
+    def update_priorities(self, indices, td_errors):
+        ''' Update the priorities of the sampled transitions with their new TD errors
+
+        Args:
+            indices (numpy.array): the positions of the transitions
+            td_errors (numpy.array): the TD errors of the transitions
+        '''
+        priorities = (np.abs(td_errors) + self.epsilon) ** self.alpha
+        self.tree.update(indices, priorities)
+        self.max_priority = max(self.max_priority, np.max(priorities))
+
+
+class SumTree(object):
+    ''' A binary tree stored in an array where each node holds the sum of its children.
+        The leaves hold the priorities. Sampling and updating cost O(log n).
+    '''
+
+    def __init__(self, capacity):
+        ''' Initialize
+        Args:
+            capacity (int): the number of leaves
+        '''
+        self.capacity = capacity
+        # Round the number of leaves up to a power of two so that every leaf has the same depth
+        self.leaf_num = 1
+        while self.leaf_num < capacity:
+            self.leaf_num *= 2
+        # Node 1 is the root, the children of node i are 2i and 2i+1, and the leaves start at leaf_num
+        self.nodes = np.zeros(2 * self.leaf_num)
+
+    def total(self):
+        ''' Get the sum of all the priorities
+
+        Returns:
+            (float): the sum of the leaves
+        '''
+        return self.nodes[1]
+
+    def get(self, indices):
+        ''' Get the priorities of some leaves
+
+        Args:
+            indices (numpy.array): the positions of the leaves
+
+        Returns:
+            (numpy.array): the priorities
+        '''
+        return self.nodes[indices + self.leaf_num]
+
+    def update(self, indices, priorities):
+        ''' Set the priorities of some leaves and update their ancestors
+
+        Args:
+            indices (numpy.array): the positions of the leaves
+            priorities (numpy.array): the new priorities
+        '''
+        nodes = np.asarray(indices) + self.leaf_num
+        self.nodes[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.nodes[nodes] = self.nodes[2 * nodes] + self.nodes[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        ''' Find the leaves where the prefix sums of the priorities reach the values
+
+        Args:
+            values (numpy.array): values between 0 and the total priority
+
+        Returns:
+            (numpy.array): the positions of the leaves
+        '''
+        values = np.array(values, dtype=float)
+        nodes = np.ones(len(values), dtype=int)
+        while nodes[0] < self.leaf_num:
+            left = 2 * nodes
+            go_right = values > self.nodes[left]
+            values = values - go_right * self.nodes[left]
+            nodes = left + go_right
+        return nodes - self.leaf_num
 
 def copy_model_parameters(sess, estimator1, estimator2):
     ''' Copys the model parameters of one estimator to another.
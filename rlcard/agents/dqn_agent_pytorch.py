@@ -28,14 +28,11 @@ SOFTWARE.
 import numpy as np
 import torch
 import torch.nn as nn
-from collections import namedtuple
 from copy import deepcopy
 
-from rlcard.agents.dqn_agent import Memory, Normalizer
+from rlcard.agents.dqn_agent import Memory, PrioritizedMemory, Normalizer
 from rlcard.utils.utils import remove_illegal
 
-Transition = namedtuple('Transition', ['state', 'action', 'reward', 'next_state', 'done'])
-
 
 class DQNAgent(object):
     '''
@@ -57,7 +54,10 @@ class DQNAgent(object):
                  norm_step=100,
                  mlp_layers=None,
                  learning_rate=0.00005,
-                 device=None):
+                 device=None,
+                 prioritized_replay=False,
+                 prioritized_alpha=0.6,
+                 prioritized_beta=0.4):
 
         '''
         Q-Learning algorithm for off-policy TD control using Function Approximation.
@@ -83,6 +83,9 @@ class DQNAgent(object):
             mlp_layers (list): The layer number and the dimension of each layer in MLP
             learning_rate (float): The learning rate of the DQN agent.
             device (torch.device): whether to use the cpu or gpu
+            prioritized_replay (boolean): True if sampling the transitions proportionally to their TD errors
+            prioritized_alpha (float): How much prioritization is used in prioritized replay
+            prioritized_beta (float): The exponent of the importance-sampling weights in prioritized replay
         '''
         self.scope = scope
         self.replay_memory_init_size = replay_memory_init_size
@@ -119,7 +122,11 @@ class DQNAgent(object):
         self.normalizer = Normalizer()
 
         # Create replay memory
-        self.memory = Memory(replay_memory_size, batch_size)
+        self.prioritized_replay = prioritized_replay
+        if prioritized_replay:
+            self.memory = PrioritizedMemory(replay_memory_size, batch_size, state_shape, prioritized_alpha, prioritized_beta)
+        else:
+            self.memory = Memory(replay_memory_size, batch_size, state_shape)
 
     def feed(self, ts):
         ''' Store data in to replay buffer and train the agent. There are two stages.
@@ -166,6 +173,53 @@ class DQNAgent(object):
         best_action = np.argmax(probs)
         return best_action
 
+    def batch_step(self, states):
+        ''' Predict the actions of a batch of states for generating training data
+
+        Args:
+            states (dict): batched states with `obs` of shape [batch, *state_shape] and `legal_actions`
+
+        Returns:
+            actions (numpy.array): an array of action ids
+        '''
+        A = self.predict_batch(states['obs'])
+        actions = np.zeros(len(A), dtype=int)
+        for i, legal_actions in enumerate(states['legal_actions']):
+            probs = remove_illegal(A[i], legal_actions)
+            actions[i] = np.random.choice(np.arange(len(probs)), p=probs)
+        return actions
+
+    def batch_eval_step(self, states):
+        ''' Predict the actions of a batch of states for evaluation purpose.
+
+        Args:
+            states (dict): batched states with `obs` of shape [batch, *state_shape] and `legal_actions`
+
+        Returns:
+            actions (numpy.array): an array of action ids
+        '''
+        q_values = self.q_estimator.predict_nograd(self.normalizer.normalize(states['obs']))
+        actions = np.zeros(len(q_values), dtype=int)
+        for i, legal_actions in enumerate(states['legal_actions']):
+            actions[i] = np.argmax(remove_illegal(np.exp(q_values[i]), legal_actions))
+        return actions
+
+    def batch_eval_probs(self, states):
+        ''' Get the action probabilities of eval_step for a batch of states,
+            all the mass is on the greedy legal action
+
+        Args:
+            states (dict): batched states with `obs` of shape [batch, *state_shape] and `legal_actions`
+
+        Returns:
+            probs (numpy.array): The probabilities with shape [batch, action_num]
+        '''
+        q_values = self.q_estimator.predict_nograd(self.normalizer.normalize(states['obs']))
+        probs = np.zeros((len(q_values), self.action_num))
+        for i, legal_actions in enumerate(states['legal_actions']):
+            probs[i, np.argmax(remove_illegal(np.exp(q_values[i]), legal_actions))] = 1
+        return probs
+
     def predict(self, state):
         ''' Predict the action probabilities but have them
             disconnected from the computation graph
@@ -176,11 +230,22 @@ class DQNAgent(object):
         Returns:
             q_values (numpy.array): a 1-d array where each entry represents a Q value
         '''
+        return self.predict_batch(np.expand_dims(state, 0))[0]
+
+    def predict_batch(self, states):
+        ''' Predict the action probabilities of a batch of states
+
+        Args:
+            states (numpy.array): states with shape [batch, *state_shape]
+
+        Returns:
+            A (numpy.array): a 2-d array where each row holds the action probabilities of a state
+        '''
         epsilon = self.epsilons[min(self.total_t, self.epsilon_decay_steps-1)]
-        A = np.ones(self.action_num, dtype=float) * epsilon / self.action_num
-        q_values = self.q_estimator.predict_nograd(np.expand_dims(self.normalizer.normalize(state), 0))[0]
-        best_action = np.argmax(q_values)
-        A[best_action] += (1.0 - epsilon)
+        A = np.ones((len(states), self.action_num), dtype=float) * epsilon / self.action_num
+        q_values = self.q_estimator.predict_nograd(self.normalizer.normalize(states))
+        best_actions = np.argmax(q_values, axis=1)
+        A[np.arange(len(states)), best_actions] += (1.0 - epsilon)
         return A
 
     def train(self):
@@ -189,7 +254,11 @@ class DQNAgent(object):
         Returns:
             loss (float): The loss of the current batch.
         '''
-        state_batch, action_batch, reward_batch, next_state_batch, done_batch = self.memory.sample()
+        weights = None
+        if self.prioritized_replay:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch, indices, weights = self.memory.sample()
+        else:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch = self.memory.sample()
 
         # Calculate best next actions using Q-network (Double DQN)
         q_values_next = self.q_estimator.predict_nograd(next_state_batch)
@@ -203,7 +272,9 @@ class DQNAgent(object):
         # Perform gradient descent update
         state_batch = np.array(state_batch)
 
-        loss = self.q_estimator.update(state_batch, action_batch, target_batch)
+        loss, td_errors = self.q_estimator.update(state_batch, action_batch, target_batch, weights)
+        if self.prioritized_replay:
+            self.memory.update_priorities(indices, td_errors)
 
         # Update the target estimator
         if self.train_t % self.update_target_estimator_every == 0:
@@ -213,6 +284,49 @@ class DQNAgent(object):
         self.train_t += 1
         return loss
 
+    def state_dict(self):
+        ''' Get the parameters of the networks, the running statistics of the
+            normalizer and the step counters
+
+        Returns:
+            (dict): A dictionary of tensors that can be saved with `torch.save`
+        '''
+        return {'q_estimator': self.q_estimator.qnet.state_dict(),
+                'q_optimizer': self.q_estimator.optimizer.state_dict(),
+                'target_estimator': self.target_estimator.qnet.state_dict(),
+                'normalizer': {key: torch.as_tensor(value) for key, value in self.normalizer.state_dict().items()},
+                'total_t': self.total_t,
+                'train_t': self.train_t}
+
+    def load_state_dict(self, state):
+        ''' Restore the agent from a dictionary returned by `state_dict`
+
+        Args:
+            state (dict): The parameters, statistics and counters of the agent
+        '''
+        self.q_estimator.qnet.load_state_dict(state['q_estimator'])
+        self.q_estimator.optimizer.load_state_dict(state['q_optimizer'])
+        self.target_estimator.qnet.load_state_dict(state['target_estimator'])
+        self.normalizer.load_state_dict({key: value.cpu().numpy() for key, value in state['normalizer'].items()})
+        self.total_t = state['total_t']
+        self.train_t = state['train_t']
+
+    def save(self, path):
+        ''' Save a checkpoint of the agent, including the normalizer
+
+        Args:
+            path (string): The path of the checkpoint file
+        '''
+        torch.save(self.state_dict(), path)
+
+    def load(self, path):
+        ''' Load a checkpoint saved by `save`
+
+        Args:
+            path (string): The path of the checkpoint file
+        '''
+        self.load_state_dict(torch.load(path, map_location=self.device))
+
     def feed_norm(self, state):
         ''' Feed state to normalizer to collect statistics
 
@@ -291,7 +405,7 @@ class Estimator(object):
             q_as = self.qnet(s).numpy()
         return q_as
 
-    def update(self, s, a, y):
+    def update(self, s, a, y, weights=None):
         ''' Updates the estimator towards the given targets.
             In this case y is the target-network estimated
             value of the Q-network optimal actions, which
@@ -301,9 +415,10 @@ class Estimator(object):
           s (np.ndarray): (batch, state_shape) state representation
           a (np.ndarray): (batch,) integer sampled actions
           y (np.ndarray): (batch,) value of optimal actions according to Q-target
+          weights (np.ndarray): Optional, (batch,) importance-sampling weights
 
         Returns:
-          The calculated loss on the batch.
+          The calculated loss on the batch and the (batch,) TD errors.
         '''
         self.optimizer.zero_grad()
 
@@ -320,14 +435,19 @@ class Estimator(object):
         Q = torch.gather(q_as, dim=-1, index=a.unsqueeze(-1)).squeeze(-1)
 
         # update model
-        batch_loss = self.mse_loss(Q, y)
+        if weights is None:
+            batch_loss = self.mse_loss(Q, y)
+        else:
+            weights = torch.from_numpy(weights).float().to(self.device)
+            batch_loss = torch.mean(weights * (Q - y) ** 2)
         batch_loss.backward()
         self.optimizer.step()
         batch_loss = batch_loss.item()
+        td_errors = (y - Q).detach().cpu().numpy()
 
         self.qnet.eval()
 
-        return batch_loss
+        return batch_loss, td_errors
 
 class EstimatorNetwork(nn.Module):
     ''' The function approximation network for Estimator
@@ -0,0 +1,202 @@
+import numpy as np
+
+from rlcard.agents.cfr_agent import CFRAgent
+
+class MCCFRAgent(CFRAgent):
+    ''' Implement Monte Carlo CFR. Instead of enumerating every action, a
+    traversal samples the actions:
+
+        - 'external': the actions of the other players are sampled and all
+          the actions of the traversing player are explored. The cost grows
+          with the branching of the traversing player's decisions only.
+        - 'outcome': a single trajectory is sampled, with exploration at the
+          nodes of the traversing player. The cost is O(depth).
+
+    The chance events are sampled by the game itself. With a baseline, the
+    values of the unsampled actions are estimated from a running average of
+    their past values, which reduces the variance of the sampled regrets.
+
+    The regrets and the strategies are stored in the same InfosetTable as
+    CFRAgent, so the saved policies are interchangeable. By default the
+    information sets are keyed by the observations, which do not show the
+    betting history in Leduc Hold'em and Limit Hold'em, and the average policy
+    does not converge. Use `perfect_recall` to make it converge, see
+    CFRAgent.get_key.
+    '''
+
+    def __init__(self, env, model_path='./mccfr_model', sampling='external', epsilon=0.6,
+                 baseline=False, baseline_decay=0.5, perfect_recall=False):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class with step_back enabled
+            model_path (str): The directory to save the model
+            sampling (str): 'external' or 'outcome'
+            epsilon (float): The exploration of outcome sampling at the nodes
+              of the traversing player
+            baseline (boolean): True to use baselines to estimate the values
+              of the unsampled actions
+            baseline_decay (float): The weight of a new value in the running
+              average of the baselines
+            perfect_recall (boolean): True to append the betting history of the
+              states to the keys of the information sets, see CFRAgent.get_key
+        '''
+        if sampling not in ('external', 'outcome'):
+            raise ValueError('Unknown sampling {}, expected external or outcome'.format(sampling))
+        super().__init__(env, model_path=model_path, perfect_recall=perfect_recall)
+        self.sampling = sampling
+        self.epsilon = epsilon
+        self.baseline = baseline
+        self.baseline_decay = baseline_decay
+
+        # The baselines of the actions by information set and traversing player
+        self._baselines = np.zeros((0, self.env.player_num, self.env.action_num))
+
+    def train(self):
+        ''' Do one iteration of MCCFR, one sampled traversal for each player
+        '''
+        self.check_trainable()
+        self.iteration += 1
+        for player_id in range(self.env.player_num):
+            state, _ = self.env.init_game()
+            if self.sampling == 'external':
+                self.traverse_external(player_id, state)
+            else:
+                self.traverse_outcome(player_id, state, np.ones(self.env.player_num), 1.0)
+
+    def traverse_external(self, player_id, state):
+        ''' Traverse the game tree with external sampling, update the regrets of
+        the traversing player and the average policies of the other players
+
+        Args:
+            player_id (int): The traversing player
+            state (dict): The state of the current player
+
+        Returns:
+            (float): The sampled value of the traversing player
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id]
+
+        current_player = self.env.get_player_id()
+        legal_actions = state['legal_actions']
+        infoset_id = self.table.get_id(self.get_key(state))
+        probs = self.regret_matching(infoset_id, legal_actions)[legal_actions]
+
+        if current_player == player_id:
+            values = np.zeros(len(legal_actions))
+            for i, action in enumerate(legal_actions):
+                next_state, _ = self.env.step(action)
+                values[i] = self.traverse_external(player_id, next_state)
+                self.env.step_back()
+            value = probs.dot(values)
+            self.table.regrets[infoset_id, legal_actions] += values - value
+            self.table.owners[infoset_id] = current_player
+            return value
+
+        # The other players sample their actions on policy
+        self.table.average_policy[infoset_id, legal_actions] += probs
+        index = np.random.choice(len(legal_actions), p=probs)
+        next_state, _ = self.env.step(legal_actions[index])
+        child_value = self.traverse_external(player_id, next_state)
+        self.env.step_back()
+        if not self.baseline:
+            return child_value
+        values = self.estimate_values(player_id, infoset_id, legal_actions, index, probs[index], child_value)
+        return probs.dot(values)
+
+    def traverse_outcome(self, player_id, state, reaches, sample_reach):
+        ''' Traverse one sampled trajectory with outcome sampling, update the
+        regrets of the traversing player and the average policies of the others
+
+        Args:
+            player_id (int): The traversing player
+            state (dict): The state of the current player
+            reaches (numpy.array): The reach probability of each player
+            sample_reach (float): The probability to sample the trajectory so far
+
+        Returns:
+            (float): The estimated value of the traversing player
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id]
+
+        current_player = self.env.get_player_id()
+        legal_actions = state['legal_actions']
+        infoset_id = self.table.get_id(self.get_key(state))
+        probs = self.regret_matching(infoset_id, legal_actions)[legal_actions]
+
+        if current_player == player_id:
+            sample_probs = self.epsilon / len(legal_actions) + (1 - self.epsilon) * probs
+        else:
+            sample_probs = probs
+        index = np.random.choice(len(legal_actions), p=sample_probs)
+
+        new_reaches = reaches.copy()
+        new_reaches[current_player] *= probs[index]
+        next_state, _ = self.env.step(legal_actions[index])
+        child_value = self.traverse_outcome(player_id, next_state, new_reaches, sample_reach * sample_probs[index])
+        self.env.step_back()
+
+        values = self.estimate_values(player_id, infoset_id, legal_actions, index, sample_probs[index], child_value)
+        value = probs.dot(values)
+        if current_player == player_id:
+            counterfactual_prob = (np.prod(reaches[:current_player]) *
+                                   np.prod(reaches[current_player + 1:]))
+            self.table.regrets[infoset_id, legal_actions] += counterfactual_prob / sample_reach * (values - value)
+            self.table.owners[infoset_id] = current_player
+        else:
+            self.table.average_policy[infoset_id, legal_actions] += reaches[current_player] / sample_reach * probs
+        return value
+
+    def regret_matching(self, infoset_id, legal_actions):
+        ''' Compute the current strategy of one information set from its
+        positive regrets, and store it in the table
+
+        Args:
+            infoset_id (int): The ID of the information set
+            legal_actions (list): The legal actions
+
+        Returns:
+            (numpy.array): The probabilities of all the actions
+        '''
+        positive_regrets = np.maximum(self.table.regrets[infoset_id, legal_actions], 0)
+        total = positive_regrets.sum()
+        probs = np.zeros(self.env.action_num)
+        if total > 0:
+            probs[legal_actions] = positive_regrets / total
+        else:
+            probs[legal_actions] = 1.0 / len(legal_actions)
+        self.table.policy[infoset_id] = probs
+        return probs
+
+    def estimate_values(self, player_id, infoset_id, legal_actions, index, sample_prob, child_value):
+        ''' Estimate the values of all the legal actions from the value of the
+        sampled one. The estimates are unbiased with or without a baseline.
+
+        Args:
+            player_id (int): The traversing player
+            infoset_id (int): The ID of the information set
+            legal_actions (list): The legal actions
+            index (int): The index of the sampled action in the legal actions
+            sample_prob (float): The probability to sample the action
+            child_value (float): The value of the sampled action
+
+        Returns:
+            (numpy.array): The estimated value of each legal action
+        '''
+        if not self.baseline:
+            values = np.zeros(len(legal_actions))
+            values[index] = child_value / sample_prob
+            return values
+
+        if self._baselines.shape[0] <= infoset_id:
+            baselines = np.zeros((max(2 * self._baselines.shape[0], infoset_id + 1),) + self._baselines.shape[1:])
+            baselines[:self._baselines.shape[0]] = self._baselines
+            self._baselines = baselines
+        baselines = self._baselines[infoset_id, player_id]
+        values = baselines[legal_actions]
+        values[index] += (child_value - values[index]) / sample_prob
+        action = legal_actions[index]
+        baselines[action] += self.baseline_decay * (child_value - baselines[action])
+        return values
@@ -110,7 +110,10 @@ class NFSPAgent(object):
             self._rl_agent = DQNAgent(sess, 'dqn', q_replay_memory_size, q_replay_memory_init_size, q_update_target_estimator_every, q_discount_factor, q_epsilon_start, q_epsilon_end, q_epsilon_decay_steps, q_batch_size, action_num, state_shape, q_norm_step, q_mlp_layers, rl_learning_rate)
 
             # Build supervised model
+            variables = set(tf.global_variables())
             self._build_model()
+            self._variables = [v for v in tf.global_variables() if v not in variables]
+            self._saver = None
 
         self.sample_episode_policy()
 
@@ -199,6 +202,26 @@ class NFSPAgent(object):
 
         return action
 
+    def batch_eval_probs(self, states):
+        ''' Get the action probabilities of eval_step for a batch of states
+
+        Args:
+            states (dict): batched states with `obs` of shape [batch, *state_shape] and `legal_actions`
+
+        Returns:
+            probs (numpy.array): The probabilities with shape [batch, action_num]
+        '''
+        if self.evaluate_with == 'best_response':
+            return self._rl_agent.batch_eval_probs(states)
+        elif self.evaluate_with == 'average_policy':
+            action_probs = self._sess.run(
+                    self._avg_policy_probs,
+                    feed_dict={self._info_state_ph: states['obs']})
+            return np.array([remove_illegal(probs, legal_actions)
+                             for probs, legal_actions in zip(action_probs, states['legal_actions'])])
+        else:
+            raise ValueError("'evaluate_with' should be either 'average_policy' or 'best_response'.")
+
     def sample_episode_policy(self):
         ''' Sample average/best_response policy
         '''
@@ -269,6 +292,32 @@ class NFSPAgent(object):
 
         return loss
 
+    def save(self, path):
+        ''' Save a checkpoint of the agent. The average policy network is saved
+            to `path` and the inner RL agent, with its normalizer, to `path + '_dqn'`
+
+        Args:
+            path (string): The path prefix of the checkpoint files
+        '''
+        if self._saver is None:
+            self._saver = tf.train.Saver(self._variables)
+        self._saver.save(self._sess, path)
+        np.savez(path + '_state.npz', step_counter=self._step_counter)
+        self._rl_agent.save(path + '_dqn')
+
+    def load(self, path):
+        ''' Load a checkpoint saved by `save`
+
+        Args:
+            path (string): The path prefix of the checkpoint files
+        '''
+        if self._saver is None:
+            self._saver = tf.train.Saver(self._variables)
+        self._saver.restore(self._sess, path)
+        with np.load(path + '_state.npz') as data:
+            self._step_counter = int(data['step_counter'])
+        self._rl_agent.load(path + '_dqn')
+
 class ReservoirBuffer(object):
     ''' Allows uniform sampling over a stream of data.
 
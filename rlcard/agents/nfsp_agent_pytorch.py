@@ -184,6 +184,17 @@ class NFSPAgent(object):
         action = self._rl_agent.eval_step(state)
         return action
 
+    def batch_eval_probs(self, states):
+        ''' Get the action probabilities of eval_step for a batch of states
+
+        Args:
+            states (dict): batched states with `obs` of shape [batch, *state_shape] and `legal_actions`
+
+        Returns:
+            probs (numpy.array): The probabilities with shape [batch, action_num]
+        '''
+        return self._rl_agent.batch_eval_probs(states)
+
     def sample_episode_policy(self):
         ''' Sample average/best_response policy
         '''
@@ -268,6 +279,45 @@ class NFSPAgent(object):
 
         return ce_loss
 
+    def state_dict(self):
+        ''' Get the parameters of the average policy network and of the inner
+            RL agent, including its normalizer
+
+        Returns:
+            (dict): A dictionary of tensors that can be saved with `torch.save`
+        '''
+        return {'policy_network': self.policy_network.state_dict(),
+                'policy_network_optimizer': self.policy_network_optimizer.state_dict(),
+                'rl_agent': self._rl_agent.state_dict(),
+                'step_counter': self._step_counter}
+
+    def load_state_dict(self, state):
+        ''' Restore the agent from a dictionary returned by `state_dict`
+
+        Args:
+            state (dict): The parameters, statistics and counters of the agent
+        '''
+        self.policy_network.load_state_dict(state['policy_network'])
+        self.policy_network_optimizer.load_state_dict(state['policy_network_optimizer'])
+        self._rl_agent.load_state_dict(state['rl_agent'])
+        self._step_counter = state['step_counter']
+
+    def save(self, path):
+        ''' Save a checkpoint of the agent
+
+        Args:
+            path (string): The path of the checkpoint file
+        '''
+        torch.save(self.state_dict(), path)
+
+    def load(self, path):
+        ''' Load a checkpoint saved by `save`
+
+        Args:
+            path (string): The path of the checkpoint file
+        '''
+        self.load_state_dict(torch.load(path, map_location=self.device))
+
 class AveragePolicyNetwork(nn.Module):
     '''
     Approximates the history of action probabilities
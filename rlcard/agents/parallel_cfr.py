@@ -0,0 +1,206 @@
+''' Run the traversals of CFR iterations in persistent worker processes
+'''
+
+import itertools
+import multiprocessing
+import random
+
+import numpy as np
+
+import rlcard
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.mccfr_agent import MCCFRAgent
+
+
+class ParallelCFRTrainer(object):
+    ''' Train a CFRAgent with the traversals of each iteration split between
+        worker processes. Every worker owns an env with step_back enabled and
+        a copy of the current policy. A worker sends back the regret and
+        strategy-sum deltas of the information sets it updated, as sparse rows
+        keyed by the information sets. The master adds them into the table of
+        the agent, applies the update rule and sends the rows of the policy
+        that changed to the workers.
+    '''
+
+    def __init__(self, agent, env_id, process_num, deals_per_iteration=None, seed=None):
+        ''' Initialize and start the worker processes
+
+        Args:
+            agent (CFRAgent): The agent to train, with the table to update
+            env_id (string): The name of the environment of the agent
+            process_num (int): The number of worker processes
+            deals_per_iteration (int): The number of deals traversed for each
+              player in an iteration. Default to process_num
+            seed (int): Optional, the seed to generate the seeds of the deals
+        '''
+        if process_num < 1:
+            raise ValueError('process_num should be a positive integer')
+        if not isinstance(agent, CFRAgent) or isinstance(agent, MCCFRAgent):
+            raise ValueError('Only CFRAgent traversals can be run in parallel')
+        agent.check_trainable()
+        self.agent = agent
+        self.process_num = process_num
+        self.deals_per_iteration = process_num if deals_per_iteration is None else deals_per_iteration
+        self.rng = np.random.RandomState(seed)
+
+        # The keys of the information sets in the order of their IDs, and the
+        # rows of the policy to send to the workers with the next tasks
+        self.keys = list(agent.table.index)
+        self.policy_update = (list(self.keys), agent.table.policy.copy())
+        self.touched = set()
+        # The error of a worker that failed to start, it can not run any task
+        self.error = None
+
+        self.input_queues = [multiprocessing.Queue() for _ in range(process_num)]
+        self.output_queue = multiprocessing.Queue()
+        self.processes = []
+        for index in range(process_num):
+            process = multiprocessing.Process(target=_worker,
+                                              args=(index, env_id, agent.variant, agent.perfect_recall,
+                                                    self.input_queues[index], self.output_queue))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+
+    def train(self):
+        ''' Do one iteration of CFR. With alternating updates, the traversals of
+            a player start after the policy is updated with those of the previous player
+        '''
+        agent = self.agent
+        agent.iteration += 1
+        players = list(range(agent.env.player_num))
+        if agent.alternating:
+            for player_id in players:
+                self._run([player_id])
+                agent.discount(agent.table.owners == player_id)
+                self._update_policy()
+        else:
+            self._run(players)
+            agent.discount()
+            self._update_policy()
+
+    def _run(self, players):
+        ''' Traverse the deals of some players in the workers and merge the deltas
+
+        Args:
+            players (list): The IDs of the traversing players
+        '''
+        if self.error is not None:
+            raise self.error
+        tasks = [(player_id, int(seed)) for player_id in players
+                 for seed in self.rng.randint(0, 2**31-1, size=self.deals_per_iteration)]
+        worker_tasks = np.array_split(np.arange(len(tasks)), self.process_num)
+        for worker_id, indices in enumerate(worker_tasks):
+            self.input_queues[worker_id].put(('run', self.agent.iteration, self.policy_update,
+                                              [tasks[i] for i in indices]))
+
+        # Every worker answers once, so all the messages are read before
+        # raising an error, so that the next run does not read stale deltas
+        results = [None for _ in range(self.process_num)]
+        error = None
+        for _ in range(self.process_num):
+            worker_id, kind, result = self.output_queue.get()
+            if kind == 'init':
+                self.error = result
+            if kind == 'deltas':
+                results[worker_id] = result
+            elif error is None:
+                error = result
+        if error is not None:
+            raise error
+
+        # Merge in the order of the workers to be reproducible
+        self.touched = set()
+        for keys, regrets, average_policy, owners in results:
+            self._merge(keys, regrets, average_policy, owners)
+
+    def _merge(self, keys, regrets, average_policy, owners):
+        ''' Add the deltas of a worker into the table of the agent
+
+        Args:
+            keys (list): The keys of the updated information sets
+            regrets (numpy.array): The regret deltas with shape [len(keys), action_num]
+            average_policy (numpy.array): The strategy-sum deltas with shape [len(keys), action_num]
+            owners (numpy.array): The player of each information set
+        '''
+        table = self.agent.table
+        infoset_ids = np.array([table.get_id(key) for key in keys], dtype=int)
+        self.keys.extend(itertools.islice(table.index, len(self.keys), None))
+        table.regrets[infoset_ids] += regrets
+        table.average_policy[infoset_ids] += average_policy
+        table.owners[infoset_ids] = owners
+        self.touched.update(infoset_ids.tolist())
+
+    def _update_policy(self):
+        ''' Run regret matching and prepare the changed rows for the workers.
+            The policy of an information set only changes with its regrets,
+            since the discounts keep the ratios of the positive regrets.
+        '''
+        self.agent.update_policy()
+        infoset_ids = sorted(self.touched)
+        self.policy_update = ([self.keys[i] for i in infoset_ids], self.agent.table.policy[infoset_ids])
+
+    def close(self):
+        ''' Stop the worker processes
+        '''
+        for queue in self.input_queues:
+            queue.put(None)
+        for process in self.processes:
+            process.join()
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _worker(index, env_id, variant, perfect_recall, input_queue, output_queue):
+    ''' The loop of a worker process
+
+    Args:
+        index (int): The index of the worker
+        env_id (string): The name of the environment
+        variant (str): The update rule of the agent, which sets the strategy weights
+        perfect_recall (boolean): Whether the betting history is part of the keys of the information sets
+        input_queue (multiprocessing.Queue): The queue of tasks
+        output_queue (multiprocessing.Queue): The queue of the results. A
+          result is a tuple of the index of the worker, its kind, 'deltas',
+          'error' or 'init' for an error at start, and the deltas or the error
+    '''
+    try:
+        env = rlcard.make(env_id, allow_step_back=True)
+        agent = CFRAgent(env, variant=variant, perfect_recall=perfect_recall)
+        table = agent.table
+        keys = []
+    except Exception as e:
+        output_queue.put((index, 'init', e))
+        return
+
+    while True:
+        instruction = input_queue.get()
+        if instruction is None:
+            break
+        try:
+            _, agent.iteration, (policy_keys, policy), tasks = instruction
+            for key, row in zip(policy_keys, policy):
+                infoset_id = table.get_id(key)
+                table.policy[infoset_id] = row
+
+            # Only the deltas of this batch of tasks are accumulated
+            table.regrets.fill(0)
+            table.average_policy.fill(0)
+            table.owners.fill(-1)
+            for player_id, seed in tasks:
+                np.random.seed(seed)
+                random.seed(seed)
+                state, _ = env.init_game()
+                agent.traverse_tree(np.ones(env.player_num), player_id, state)
+
+            keys.extend(itertools.islice(table.index, len(keys), None))
+            infoset_ids = np.flatnonzero(table.owners >= 0)
+            output_queue.put((index, 'deltas', ([keys[i] for i in infoset_ids], table.regrets[infoset_ids],
+                                                table.average_policy[infoset_ids], table.owners[infoset_ids])))
+        except Exception as e:
+            output_queue.put((index, 'error', e))
@@ -0,0 +1,245 @@
+from collections import deque
+
+import numpy as np
+
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.utils.public_tree import build_leduc_tree
+
+class PublicTreeCFR(object):
+    ''' Run full CFR iterations on the public tree of a small game. The
+    tree is built once and flattened level by level. Every node handles all
+    the private hands at once: the reach probabilities are vectors over the
+    hands and the payoffs of a terminal node are a matrix over the hands of
+    the two players, so an iteration is a few array operations per level.
+
+    An information set is a decision node of the public tree with a hand of
+    the acting player. The node holds the betting history and the public
+    cards, so the information sets have perfect recall and the average policy
+    converges to a Nash equilibrium. The regrets and the strategies are stored
+    in the table of a CFRAgent, `cfr`, which also applies the update rule.
+    Its keys are the public nodes, not the states of the env:
+
+        - `get_node_probs` gives the average policy on the tree, so the
+          solver can be passed to `exploitability`
+        - `get_agent` projects the solution onto the information sets of a
+          CFRAgent with `perfect_recall`, to play with CFRAgent.eval_step
+    '''
+
+    def __init__(self, env, model_path='./cfr_model', tree=None, **kwargs):
+        ''' Initialize the solver
+
+        Args:
+            env (Env): The env of the tree
+            model_path (str): The directory to save the agent of `get_agent`
+            tree (PublicTree): Optional, the public tree, e.g. the one of
+              `build_limit_holdem_tree`. The tree of Leduc Hold'em is built if None
+            kwargs: The update rule of the agent, see CFRAgent. The agent of
+              `get_agent` always has `perfect_recall`
+        '''
+        self.env = env
+        self.model_path = model_path
+        self.kwargs = kwargs
+        self.tree = build_leduc_tree(env) if tree is None else tree
+        self.cfr = CFRAgent(env, **kwargs)
+        self._flatten()
+
+    def _flatten(self):
+        ''' Number the nodes in breadth-first order, so that the nodes of a
+        level and the children of a node are contiguous, and build the arrays
+        of the iterations
+        '''
+        tree = self.tree
+        hand_num = tree.num_hands
+        nodes, parents, slots, depths = [], [], [], []
+        queue = deque((root, -1, -1, 0) for root in tree.roots)
+        while queue:
+            node, parent, slot, depth = queue.popleft()
+            for child_slot, child in enumerate(node.children):
+                queue.append((child, len(nodes), child_slot, depth + 1))
+            nodes.append(node)
+            parents.append(parent)
+            slots.append(slot)
+            depths.append(depth)
+        node_num = len(nodes)
+        self.parents = np.array(parents)
+
+        # The nodes of a level, and the offset of the children of each parent in the level
+        boundaries = np.flatnonzero(np.diff(depths)) + 1
+        levels = zip(boundaries, np.r_[boundaries[1:], node_num])
+        self.levels = []
+        for start, stop in levels:
+            level_parents = self.parents[start:stop]
+            offsets = np.flatnonzero(np.r_[True, level_parents[1:] != level_parents[:-1]])
+            self.levels.append((start, stop, level_parents[offsets], offsets))
+
+        # The probability of the chance events of a deal to each node, the
+        # hands that hold a public card, and for each hand the number of hands
+        # of the opponent that do not conflict with it or the public cards
+        self.chance_probs = np.zeros(node_num)
+        blocked = np.zeros((node_num, hand_num), dtype=bool)
+        for index in range(node_num):
+            parent = parents[index]
+            if parent < 0:
+                self.chance_probs[index] = tree.deal_prob / len(tree.roots)
+                continue
+            self.chance_probs[index] = self.chance_probs[parent]
+            blocked[index] = blocked[parent]
+            if nodes[parent].kind == 'chance':
+                self.chance_probs[index] *= nodes[parent].probs[slots[index]]
+                blocked[index, nodes[parent].blocked_hands[slots[index]]] = True
+        self.opponent_hand_nums = np.dot(~blocked, (~tree.conflicts).astype(float))
+
+        # The decision nodes: the ID of the information set of each hand, -1
+        # for the hands that hold a public card, and the legal actions
+        decisions = [index for index, node in enumerate(nodes) if node.kind == 'decision']
+        self.decision_nodes = [nodes[index] for index in decisions]
+        self.node_rows = {node: row for row, node in enumerate(self.decision_nodes)}
+        self.decision_rows = np.full(node_num, -1)
+        self.decision_rows[decisions] = np.arange(len(decisions))
+        self.infoset_ids = np.full((len(decisions), hand_num), -1)
+        self.legal_masks = np.zeros((len(decisions), self.env.action_num), dtype=bool)
+        for row, index in enumerate(decisions):
+            for hand in np.flatnonzero(~blocked[index]):
+                self.infoset_ids[row, hand] = self.cfr.table.get_id('{}:{}'.format(index, hand).encode())
+            self.legal_masks[row, nodes[index].actions] = True
+
+        # The edges from the decision nodes: the acting player and the action
+        edges = [index for index in range(node_num) if parents[index] >= 0 and nodes[parents[index]].kind == 'decision']
+        self.edges = np.array(edges, dtype=int)
+        self.edge_players = np.array([nodes[parents[index]].player for index in edges], dtype=int)
+        self.edge_actions = np.array([nodes[parents[index]].actions[slots[index]] for index in edges], dtype=int)
+
+        # The reach multipliers of the edges from the chance nodes remove the
+        # hands with the public cards
+        self.multipliers = np.ones((node_num, tree.player_num, hand_num))
+        for index in range(node_num):
+            if parents[index] >= 0 and nodes[parents[index]].kind == 'chance':
+                self.multipliers[index, :, nodes[parents[index]].blocked_hands[slots[index]]] = 0
+
+        terminals = [index for index, node in enumerate(nodes) if node.kind == 'terminal']
+        self.terminals = np.array(terminals, dtype=int)
+        self.terminal_payoffs = np.array([nodes[index].payoffs for index in terminals])
+        self.root_num = len(tree.roots)
+
+    def train(self):
+        ''' Do one iteration of CFR over the whole tree
+        '''
+        agent = self.cfr
+        agent.iteration += 1
+        players = list(range(self.tree.player_num))
+        if agent.alternating:
+            for player_id in players:
+                self.update([player_id])
+                agent.discount(agent.table.owners == player_id)
+                agent.update_policy()
+        else:
+            self.update(players)
+            agent.discount()
+            agent.update_policy()
+
+    def update(self, players):
+        ''' Compute the counterfactual values of the current policy and add the
+        regrets and the strategies of some players into the table
+
+        Args:
+            players (list): The players to update
+        '''
+        table = self.cfr.table
+        probs = self.get_probs()
+
+        # The reach probabilities, from the roots to the leaves
+        edge_probs = probs[self.decision_rows[self.parents[self.edges]], :, self.edge_actions]
+        multipliers = self.multipliers.copy()
+        multipliers[self.edges, self.edge_players] = edge_probs
+        reaches = np.empty_like(multipliers)
+        reaches[:self.root_num] = 1
+        for start, stop, _, _ in self.levels:
+            reaches[start:stop] = reaches[self.parents[start:stop]] * multipliers[start:stop]
+
+        # The counterfactual values, from the leaves to the roots. The payoffs
+        # are weighted by the probability of the public cards, so the values
+        # of the children of a chance node are summed
+        values = np.empty_like(multipliers)
+        deal_prob = self.tree.deal_prob / self.root_num
+        values[self.terminals, 0] = deal_prob * np.einsum('tij,tj->ti', self.terminal_payoffs, reaches[self.terminals, 1])
+        values[self.terminals, 1] = -deal_prob * np.einsum('tij,ti->tj', self.terminal_payoffs, reaches[self.terminals, 0])
+        weights = np.ones_like(multipliers)
+        weights[self.edges, self.edge_players] = edge_probs
+        for start, stop, level_parents, offsets in reversed(self.levels):
+            values[level_parents] = np.add.reduceat(weights[start:stop] * values[start:stop], offsets, axis=0)
+
+        mask = np.isin(self.edge_players, players)
+        edges, edge_players, edge_actions = self.edges[mask], self.edge_players[mask], self.edge_actions[mask]
+        parents = self.parents[edges]
+        infoset_ids = self.infoset_ids[self.decision_rows[parents]]
+        valid = infoset_ids >= 0
+        flat_ids = (infoset_ids * self.env.action_num + edge_actions[:, None])[valid]
+        size = table.regrets.size
+
+        regrets = values[edges, edge_players] - values[parents, edge_players]
+        table_regrets = table.regrets
+        table_regrets += np.bincount(flat_ids, regrets[valid], minlength=size).reshape(table_regrets.shape)
+
+        weight = self.cfr.iteration if self.cfr.variant in ('vanilla', 'cfr+') else 1.0
+        # A hand reaches a node with every hand of the opponent that does not conflict with it
+        strategies = (weight * self.chance_probs[parents])[:, None] * self.opponent_hand_nums[parents] * \
+                     reaches[parents, edge_players] * edge_probs[mask]
+        average_policy = table.average_policy
+        average_policy += np.bincount(flat_ids, strategies[valid], minlength=size).reshape(average_policy.shape)
+        table.owners[infoset_ids[valid]] = np.broadcast_to(edge_players[:, None], infoset_ids.shape)[valid]
+
+    def get_probs(self):
+        ''' Get the probabilities of the current policy at the decision nodes.
+        The probabilities are normalized over the legal actions.
+
+        Returns:
+            (numpy.array): The probabilities with shape [num_decision_nodes, num_hands, action_num]
+        '''
+        probs = self.cfr.table.policy[np.maximum(self.infoset_ids, 0)] * self.legal_masks[:, None, :]
+        sums = probs.sum(axis=2, keepdims=True)
+        uniform = self.legal_masks[:, None, :] / self.legal_masks.sum(axis=1)[:, None, None]
+        return np.where(sums > 0, probs / np.where(sums > 0, sums, 1), uniform)
+
+    def get_node_probs(self, node):
+        ''' Get the probabilities of the average policy at a decision node
+
+        Args:
+            node (PublicNode): A decision node of the tree
+
+        Returns:
+            (numpy.array): The probabilities of the legal actions with shape [num_hands, num_actions]
+        '''
+        infoset_ids = np.maximum(self.infoset_ids[self.node_rows[node]], 0)
+        probs = self.cfr.table.average_policy[infoset_ids][:, node.actions]
+        sums = probs.sum(axis=1, keepdims=True)
+        return np.where(sums > 0, probs / np.where(sums > 0, sums, 1), 1.0 / len(node.actions))
+
+    def get_agent(self, model_path=None):
+        ''' Project the solution onto the information sets of a CFRAgent with
+        `perfect_recall`, see CFRAgent.get_key. The observations alone do not
+        show the betting history, and an agent keyed by them would average the
+        policy over different histories. The keys with perfect recall only
+        merge the information sets of the two seats: their regrets and strategy
+        sums are added, so the agent mixes the equivalent policies of the seats
+        and it is no more exploitable than the solver.
+
+        Args:
+            model_path (str): The directory to save the agent, the one of the solver if None
+
+        Returns:
+            (CFRAgent): The agent with the projected table
+        '''
+        kwargs = dict(self.kwargs, perfect_recall=True)
+        agent = CFRAgent(self.env, model_path=self.model_path if model_path is None else model_path, **kwargs)
+        agent.iteration = self.cfr.iteration
+        solver_ids, agent_ids = [], []
+        for row, node in enumerate(self.decision_nodes):
+            for hand, state in enumerate(self.tree.get_states(node)):
+                if self.infoset_ids[row, hand] >= 0:
+                    solver_ids.append(self.infoset_ids[row, hand])
+                    agent_ids.append(agent.table.get_id(agent.get_key(state)))
+        for name in ('regrets', 'average_policy'):
+            np.add.at(getattr(agent.table, name), agent_ids, getattr(self.cfr.table, name)[solver_ids])
+        agent.table.owners[agent_ids] = self.cfr.table.owners[solver_ids]
+        agent.update_policy()
+        return agent
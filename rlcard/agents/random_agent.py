@@ -37,3 +37,17 @@ class RandomAgent(object):
             action (int): the action predicted (randomly chosen) by the random agent
         '''
         return self.step(state)
+
+    def batch_eval_probs(self, states):
+        ''' Get the action probabilities of a batch of states, uniform over the legal actions
+
+        Args:
+            states (dict): batched states with `obs` of shape [batch, *state_shape] and `legal_actions`
+
+        Returns:
+            (numpy.array): The probabilities with shape [batch, action_num]
+        '''
+        probs = np.zeros((len(states['legal_actions']), self.action_num))
+        for i, legal_actions in enumerate(states['legal_actions']):
+            probs[i, legal_actions] = 1.0 / len(legal_actions)
+        return probs
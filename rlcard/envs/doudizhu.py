@@ -1,25 +1,34 @@
-import numpy as np
-
 from rlcard.envs.env import Env
 from rlcard.games.doudizhu.game import DoudizhuGame as Game
-from rlcard.games.doudizhu.utils import SPECIFIC_MAP, CARD_RANK_STR
-from rlcard.games.doudizhu.utils import ACTION_LIST, ACTION_SPACE
-from rlcard.games.doudizhu.utils import encode_cards
+from rlcard.games.doudizhu.utils import CARD_RANK_INDEX, get_action_tables
+from rlcard.games.doudizhu.utils import ACTION_LIST
+from rlcard.games.doudizhu.utils import cards_list2counts, encode_counts
 
 
 class DoudizhuEnv(Env):
     ''' Doudizhu Environment
     '''
 
-    def __init__(self, allow_step_back=False):
+    def __init__(self, allow_step_back=False, obs_dtype=int):
+        ''' Initialize the Doudizhu environment
+
+        Args:
+            allow_step_back (boolean): True if you wants to able to step_back
+            obs_dtype (numpy.dtype): The type of the observations. np.int8 or
+                bool take 8 times less memory than the default
+        '''
         super().__init__(Game(allow_step_back), allow_step_back)
         self.state_shape = [6, 5, 15]
+        self.obs_dtype = obs_dtype
 
-    def extract_state(self, state):
+    def extract_state(self, state, out=None):
         ''' Encode state
 
         Args:
             state (dict): dict of original state
+            out (numpy.array): An array with shape [6, 5, 15] to write the
+                observation into, e.g. a slot of a batch of observations.
+                A new array of type `obs_dtype` is allocated if None
 
         Returns:
             numpy array: 6*5*15 array
@@ -28,16 +37,13 @@ class DoudizhuEnv(Env):
                              the recent three actions
                              the union of all played cards
         '''
-        obs = np.zeros((6, 5, 15), dtype=int)
-        for index in range(6):
-            obs[index][0] = np.ones(15, dtype=int)
-        encode_cards(obs[0], state['current_hand'])
-        encode_cards(obs[1], state['others_hand'])
+        cards_list = [state['current_hand'], state['others_hand'], '', '', '', '']
         for i, action in enumerate(state['trace'][-3:]):
             if action[1] != 'pass':
-                encode_cards(obs[4-i], action[1])
+                cards_list[4-i] = action[1]
         if state['played_cards'] is not None:
-            encode_cards(obs[5], state['played_cards'])
+            cards_list[5] = state['played_cards']
+        obs = encode_counts(cards_list2counts(cards_list), out=out, dtype=self.obs_dtype)
 
         extrated_state = {'obs': obs, 'legal_actions': self.get_legal_actions()}
         return extrated_state
@@ -65,12 +71,13 @@ class DoudizhuEnv(Env):
             return abstract_action
         # with kicker
         legal_actions = self.game.state['actions']
+        tables = get_action_tables()
         specific_actions = []
         kickers = []
         for legal_action in legal_actions:
-            for abstract in SPECIFIC_MAP[legal_action]:
-                main = abstract.strip('*')
-                if abstract == abstract_action:
+            for abstract_id in tables.get_abstract_ids(legal_action):
+                if abstract_id == action_id:
+                    main = abstract_action.strip('*')
                     specific_actions.append(legal_action)
                     kickers.append(legal_action.replace(main, '', 1))
                     break
@@ -82,7 +89,7 @@ class DoudizhuEnv(Env):
             for action in self.game.judger.playable_cards[player_id]:
                 if kicker in action:
                     score += 1
-            kicker_scores.append(score+CARD_RANK_STR.index(kicker[0]))
+            kicker_scores.append(score+CARD_RANK_INDEX[kicker[0]])
         min_index = 0
         min_score = kicker_scores[0]
         for index, score in enumerate(kicker_scores):
@@ -100,9 +107,9 @@ class DoudizhuEnv(Env):
         legal_action_id = []
         legal_actions = self.game.state['actions']
         if legal_actions:
+            tables = get_action_tables()
             for action in legal_actions:
-                for abstract in SPECIFIC_MAP[action]:
-                    action_id = ACTION_SPACE[abstract]
+                for action_id in tables.get_abstract_ids(action).tolist():
                     if action_id not in legal_action_id:
                         legal_action_id.append(action_id)
         return legal_action_id
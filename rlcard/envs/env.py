@@ -1,5 +1,6 @@
 import numpy as np
 import random
+from copy import copy
 
 from rlcard.utils.utils import *
 
@@ -160,6 +161,41 @@ class Env(object):
 
         return state, player_id
 
+    def get_snapshot(self):
+        ''' Take a compact snapshot of the current game
+
+        Returns:
+            (object): The snapshot to pass to `restore`
+        '''
+        return self.game.get_snapshot()
+
+    def restore(self, snapshot):
+        ''' Restore the current game from a snapshot
+
+        Args:
+            snapshot (object): A snapshot taken by `get_snapshot`
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (numpy.array): The restored state
+                (int): The ID of the current player
+        '''
+        self.game.restore(snapshot)
+        player_id = self.get_player_id()
+        return self.get_state(player_id), player_id
+
+    def clone(self):
+        ''' Copy the environment so that the copy can be stepped independently.
+        The copy shares the agents with the environment.
+
+        Returns:
+            (Env): The copy of the environment
+        '''
+        env = copy(self)
+        env.game = self.game.clone()
+        return env
+
 
     def get_player_id(self):
         ''' Get the current player id
@@ -125,6 +125,12 @@ class LeducholdemEnv(Env):
         obs[idx] = 1
         processed_state['obs'] = obs
 
+        # The betting history: whether each action is the player's own, its id
+        # and the indices of the public cards dealt after it
+        processed_state['action_history'] = tuple((own, self.actions.index(action),
+                                                   tuple(self.card2index[card] for card in dealt_cards))
+                                                  for own, action, dealt_cards in state['action_history'])
+
         return processed_state
 
     def get_payoffs(self):
@@ -1,8 +1,5 @@
-import json
-import os
 import numpy as np
 
-import rlcard
 from rlcard.envs.env import Env
 from rlcard.games.limitholdem.game import LimitholdemGame as Game
 
@@ -17,9 +14,6 @@ class LimitholdemEnv(Env):
         self.actions = ['call', 'raise', 'fold', 'check']
         self.state_shape=[72]
 
-        with open(os.path.join(rlcard.__path__[0], 'games/limitholdem/card2index.json'), 'r') as file:
-            self.card2index = json.load(file)
-
     def get_legal_actions(self):
         ''' Get all leagal actions
 
@@ -47,14 +41,19 @@ class LimitholdemEnv(Env):
         public_cards = state['public_cards']
         hand = state['hand']
         raise_nums = state['raise_nums']
-        cards = public_cards + hand
-        idx = [self.card2index[card] for card in cards]
+        # The cards are already the indices of card2index.json
+        idx = public_cards + hand
         obs = np.zeros(72)
         obs[idx] = 1
         for i, num in enumerate(raise_nums):
             obs[52 + i * 5 + num] = 1
         processed_state['obs'] = obs
 
+        # The betting history: whether each action is the player's own, its id
+        # and the public cards dealt after it
+        processed_state['action_history'] = tuple((own, self.actions.index(action), dealt_cards)
+                                                  for own, action, dealt_cards in state['action_history'])
+
         return processed_state
 
     def get_payoffs(self):
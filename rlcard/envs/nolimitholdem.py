@@ -1,8 +1,5 @@
-import json
-import os
 import numpy as np
 
-import rlcard
 from rlcard.envs.env import Env
 from rlcard.games.nolimitholdem.game import NolimitholdemGame as Game
 
@@ -19,9 +16,6 @@ class NolimitholdemEnv(Env):
         for raise_amount in range(1, self.game.init_chips+1):
             self.actions.append(raise_amount)
 
-        with open(os.path.join(rlcard.__path__[0], 'games/limitholdem/card2index.json'), 'r') as file:
-            self.card2index = json.load(file)
-
     def get_legal_actions(self):
         ''' Get all leagal actions
 
@@ -50,8 +44,8 @@ class NolimitholdemEnv(Env):
         hand = state['hand']
         my_chips = state['my_chips']
         all_chips = state['all_chips']
-        cards = public_cards + hand
-        idx = [self.card2index[card] for card in cards]
+        # The cards are already the indices of card2index.json
+        idx = public_cards + hand
         obs = np.zeros(54)
         obs[idx] = 1
         obs[52] = float(my_chips)
@@ -1,5 +1,7 @@
 import importlib
 
+from rlcard.envs.vec_env import VectorEnv
+
 class EnvSpec(object):
     ''' A specification for a particular instance of the environment.
     '''
@@ -57,6 +59,18 @@ class EnvRegistry(object):
             raise ValueError('Cannot find env_id: {}'.format(env_id))
         return self.env_specs[env_id].make(allow_step_back)
 
+    def make_vec(self, env_id, num_envs, allow_step_back=False):
+        ''' Create a vectorized environment with several copies of an environment
+
+        Args:
+            env_id (string): the name of the environment
+            num_envs (int): the number of copies that run in lockstep
+            allow_step_back (boolean): True if you wants to able to step_back
+        '''
+        if num_envs < 1:
+            raise ValueError('num_envs should be a positive integer')
+        return VectorEnv([self.make(env_id, allow_step_back) for _ in range(num_envs)])
+
 # Have a global registry
 registry = EnvRegistry()
 
@@ -78,3 +92,13 @@ def make(env_id, allow_step_back=False):
         allow_step_back (boolean): True if you wants to able to step_back
     '''
     return registry.make(env_id, allow_step_back)
+
+def make_vec(env_id, num_envs, allow_step_back=False):
+    ''' Create a vectorized environment with several copies of an environment
+
+    Args:
+        env_id (string): the name of the environment
+        num_envs (int): the number of copies that run in lockstep
+        allow_step_back (boolean): True if you wants to able to step_back
+    '''
+    return registry.make_vec(env_id, num_envs, allow_step_back)
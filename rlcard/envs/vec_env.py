@@ -0,0 +1,170 @@
+import numpy as np
+
+from rlcard.utils.utils import reorganize
+
+
+class VectorEnv(object):
+    ''' Run several copies of an environment in lockstep. The states of all
+        the copies are stacked so that an agent can act on the whole batch
+        with a single forward pass.
+    '''
+
+    def __init__(self, envs):
+        ''' Initialize
+
+        Args:
+            envs (list): A list of Env objects of the same game
+        '''
+        if len(envs) == 0:
+            raise ValueError('VectorEnv needs at least one environment')
+        self.envs = envs
+        self.num_envs = len(envs)
+        self.player_num = envs[0].player_num
+        self.action_num = envs[0].action_num
+        self.state_shape = envs[0].state_shape
+
+        # A counter for the timesteps over all the copies
+        self.timestep = 0
+
+        self.player_ids = np.zeros(self.num_envs, dtype=int)
+        self.states = [None for _ in range(self.num_envs)]
+
+    def init_game(self):
+        ''' Start a new game in every copy
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (dict): The batched begining states
+                (numpy.array): The begining players of the copies
+        '''
+        for i, env in enumerate(self.envs):
+            self.states[i], self.player_ids[i] = env.init_game()
+        return self.stack_states(self.states), self.player_ids.copy()
+
+    def step(self, actions):
+        ''' Step forward in every copy. The copies whose games are over
+            will be reset automatically so that the batch is always full.
+
+        Args:
+            actions (list): The actions taken by the current players, one per copy
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (dict): The batched next states
+                (numpy.array): The IDs of the next players
+                (numpy.array): A boolean array, True if the game of the copy is over
+                (numpy.array): The payoffs of the finished games with shape [num_envs, player_num].
+                               The rows of the unfinished games are zeros
+        '''
+        if len(actions) != self.num_envs:
+            raise ValueError('Expected {} actions, got {}'.format(self.num_envs, len(actions)))
+
+        dones = np.zeros(self.num_envs, dtype=bool)
+        payoffs = np.zeros((self.num_envs, self.player_num))
+        for i, env in enumerate(self.envs):
+            self.timestep += 1
+            self.states[i], self.player_ids[i] = env.step(actions[i])
+            if env.is_over():
+                dones[i] = True
+                payoffs[i] = env.get_payoffs()
+                self.states[i], self.player_ids[i] = env.init_game()
+        return self.stack_states(self.states), self.player_ids.copy(), dones, payoffs
+
+    def set_agents(self, agents):
+        ''' Set the agents that will interact with the environments
+
+        Args:
+            agents (list): List of Agent classes, shared by all the copies
+        '''
+        self.agents = agents
+
+    def run(self, is_training=False):
+        ''' Run one complete game in each copy. At every step, the copies
+            waiting for the same player are batched into one agent call if
+            the agent provides `batch_step` and `batch_eval_step`.
+
+        Args:
+            is_training (boolean): True if for training purpose.
+
+        Returns:
+            (tuple) Tuple containing:
+
+                (list): A list of trajectories, one per copy, in the same format as `Env.run`
+                (list): A list of payoffs, one per copy
+        '''
+        trajectories = [[[] for _ in range(self.player_num)] for _ in range(self.num_envs)]
+        states = [None for _ in range(self.num_envs)]
+        player_ids = [None for _ in range(self.num_envs)]
+        for i, env in enumerate(self.envs):
+            states[i], player_ids[i] = env.init_game()
+            trajectories[i][player_ids[i]].append(states[i])
+        active = [i for i in range(self.num_envs) if not self.envs[i].is_over()]
+
+        while active:
+            # Group the copies by the current player
+            actions = {}
+            for player_id in set(player_ids[i] for i in active):
+                indices = [i for i in active if player_ids[i] == player_id]
+                batch_actions = self._act(self.agents[player_id], [states[i] for i in indices], is_training)
+                for i, action in zip(indices, batch_actions):
+                    actions[i] = action
+
+            for i in active:
+                env = self.envs[i]
+                self.timestep += 1
+                next_state, next_player_id = env.step(actions[i])
+                trajectories[i][player_ids[i]].append(actions[i])
+                states[i], player_ids[i] = next_state, next_player_id
+                if not env.is_over():
+                    trajectories[i][next_player_id].append(next_state)
+            active = [i for i in active if not self.envs[i].is_over()]
+
+        payoffs = []
+        for i, env in enumerate(self.envs):
+            for player_id in range(self.player_num):
+                trajectories[i][player_id].append(env.get_state(player_id))
+            payoffs.append(env.get_payoffs())
+            trajectories[i] = reorganize(trajectories[i], payoffs[i])
+
+        return trajectories, payoffs
+
+    def _act(self, agent, states, is_training):
+        ''' Query an agent on a list of states
+
+        Args:
+            agent (Agent): The agent to be queried
+            states (list): A list of extracted states
+            is_training (boolean): True if for training purpose.
+
+        Returns:
+            (list): A list of actions, one per state
+        '''
+        batch_name = 'batch_step' if is_training else 'batch_eval_step'
+        if hasattr(agent, batch_name):
+            return list(getattr(agent, batch_name)(self.stack_states(states)))
+        if is_training:
+            return [agent.step(state) for state in states]
+        return [agent.eval_step(state) for state in states]
+
+    def stack_states(self, states):
+        ''' Stack a list of extracted states into a batched state
+
+        Args:
+            states (list): A list of extracted states
+
+        Returns:
+            (dict): A dictionary containing:
+
+                obs (numpy.array): The observations with shape [batch, *state_shape]
+                legal_actions (list): The legal actions of each state
+                legal_mask (numpy.array): A boolean matrix with shape [batch, action_num]
+        '''
+        legal_actions = [state['legal_actions'] for state in states]
+        legal_mask = np.zeros((len(states), self.action_num), dtype=bool)
+        for i, actions in enumerate(legal_actions):
+            legal_mask[i, actions] = True
+        return {'obs': np.stack([state['obs'] for state in states]),
+                'legal_actions': legal_actions,
+                'legal_mask': legal_mask}
@@ -1,4 +1,4 @@
-from copy import deepcopy
+from copy import deepcopy, copy
 
 from rlcard.games.blackjack.dealer import BlackjackDealer as Dealer
 from rlcard.games.blackjack.player import BlackjackPlayer as Player
@@ -90,6 +90,45 @@ class BlackjackGame(object):
             return True
         return False
 
+    def get_snapshot(self):
+        ''' Take a compact snapshot of the game. The snapshot shares the cards
+        with the game and can be restored any number of times.
+
+        Returns:
+            (tuple): The snapshot to pass to `restore`
+        '''
+        dealer = (tuple(self.dealer.deck), tuple(self.dealer.hand), self.dealer.status, self.dealer.score)
+        player = (tuple(self.player.hand), self.player.status, self.player.score)
+        return dealer, player, tuple(self.winner.items())
+
+    def restore(self, snapshot):
+        ''' Restore the game from a snapshot. The history for stepping back
+        is cleared.
+
+        Args:
+            snapshot (tuple): A snapshot taken by `get_snapshot`
+        '''
+        dealer, player, winner = snapshot
+        deck, hand, self.dealer.status, self.dealer.score = dealer
+        self.dealer.deck = list(deck)
+        self.dealer.hand = list(hand)
+        hand, self.player.status, self.player.score = player
+        self.player.hand = list(hand)
+        self.winner = dict(winner)
+        self.history = []
+
+    def clone(self):
+        ''' Copy the game so that the copy can be played independently
+
+        Returns:
+            (object): The copy of the game, without the history for stepping back
+        '''
+        game = copy(self)
+        game.dealer = copy(self.dealer)
+        game.player = copy(self.player)
+        game.restore(self.get_snapshot())
+        return game
+
     @staticmethod
     def get_player_num():
         ''' Return the number of players in blackjack
@@ -7,7 +7,7 @@ import functools
 
 from rlcard.utils.utils import init_54_deck
 from rlcard.games.doudizhu.utils import doudizhu_sort_card
-from rlcard.games.doudizhu.judger import cards2str
+from rlcard.games.doudizhu.utils import cards2str
 
 
 class DoudizhuDealer(object):
@@ -6,7 +6,7 @@ import functools
 import copy
 from heapq import merge 
 
-from rlcard.games.doudizhu.judger import cards2str
+from rlcard.games.doudizhu.utils import cards2str
 from rlcard.games.doudizhu.player import DoudizhuPlayer as Player
 from rlcard.games.doudizhu.round import DoudizhuRound as Round
 from rlcard.games.doudizhu.judger import DoudizhuJudger as Judger
@@ -84,6 +84,9 @@ class DoudizhuGame(object):
             # TODO: don't record game.round, game.players, game.judger if allow_step_back not set
             pass
 
+        # The steps that can be undone, cleared by `restore`
+        self.history.append(action)
+
         # perfrom action
         player = self.players[self.round.current_player]
         self.round.proceed_round(player, action)
@@ -106,8 +109,9 @@ class DoudizhuGame(object):
         Returns:
             (bool): True if the game steps back successfully
         '''            
-        if not self.round.trace:
+        if not self.history:
             return False
+        self.history.pop()
 
         #winner_id will be always None no matter step_back from any case
         self.winner_id = None
@@ -136,6 +140,61 @@ class DoudizhuGame(object):
         self.state = self.get_state(self.round.current_player)
         return True
 
+    def get_snapshot(self):
+        ''' Take a compact snapshot of the game. The snapshot shares the cards
+        with the game and can be restored any number of times.
+
+        Returns:
+            (tuple): The snapshot to pass to `restore`
+        '''
+        greater_player = self.round.greater_player
+        round_state = (self.round.current_player, tuple(self.round.trace), tuple(self.round.played_cards),
+                       None if greater_player is None else greater_player.player_id)
+        players = tuple((tuple(player.current_hand), tuple(player._recorded_played_cards),
+                         player.played_cards, player.singles) for player in self.players)
+        judger = (tuple(frozenset(cards) for cards in self.judger.playable_cards),
+                  tuple(self.judger.playable_ids),
+                  tuple(tuple(records) for records in self.judger._recorded_removed_playable_cards))
+        return self.winner_id, self.state, round_state, players, judger
+
+    def restore(self, snapshot):
+        ''' Restore the game from a snapshot. The history for stepping back
+        is cleared.
+
+        Args:
+            snapshot (tuple): A snapshot taken by `get_snapshot`
+        '''
+        self.winner_id, self.state, round_state, players, judger = snapshot
+        current_player, trace, played_cards, greater_player_id = round_state
+        self.round.current_player = current_player
+        self.round.trace = list(trace)
+        self.round.played_cards = list(played_cards)
+        self.round.greater_player = None if greater_player_id is None else self.players[greater_player_id]
+        self.round.public = dict(self.round.public, trace=self.round.trace, played_cards=self.round.played_cards)
+        for player, (current_hand, recorded_played_cards, played, singles) in zip(self.players, players):
+            player.set_current_hand(list(current_hand))
+            player._recorded_played_cards = list(recorded_played_cards)
+            player.played_cards = played
+            player.singles = singles
+        playable_cards, playable_ids, recorded_removed_playable_cards = judger
+        self.judger.playable_cards = [set(cards) for cards in playable_cards]
+        self.judger.playable_ids = list(playable_ids)
+        self.judger._recorded_removed_playable_cards = [list(records) for records in recorded_removed_playable_cards]
+        self.history = []
+
+    def clone(self):
+        ''' Copy the game so that the copy can be played independently
+
+        Returns:
+            (object): The copy of the game, without the history for stepping back
+        '''
+        game = copy.copy(self)
+        game.players = [copy.copy(player) for player in self.players]
+        game.round = copy.copy(self.round)
+        game.judger = copy.copy(self.judger)
+        game.restore(self.get_snapshot())
+        return game
+
     def get_state(self, player_id):
         ''' Return player's state
 
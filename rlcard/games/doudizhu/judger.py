@@ -3,8 +3,8 @@
 '''
 import numpy as np
 
-from rlcard.games.doudizhu.utils import CARD_TYPE
-from rlcard.games.doudizhu.utils import cards2str, contains_cards
+from rlcard.games.doudizhu.utils import CARD_RANK_INDEX
+from rlcard.games.doudizhu.utils import get_action_tables, cards2counts
 
 
 class DoudizhuJudger(object):
@@ -14,15 +14,16 @@ class DoudizhuJudger(object):
     def __init__(self, players):
         ''' Initilize the Judger class for Dou Dizhu
         '''
-        all_cards_list = CARD_TYPE[1]
+        tables = get_action_tables()
         self.playable_cards = [set() for _ in range(3)]
+        # the indices in the action tables of the playable cards
+        self.playable_ids = [None for _ in range(3)]
         self._recorded_removed_playable_cards = [[] for _ in range(3)]
         for player in players:
             player_id = player.player_id
-            current_hand = cards2str(player.current_hand)
-            for cards in all_cards_list:
-                if contains_cards(current_hand, cards):
-                    self.playable_cards[player_id].add(cards)
+            playable_ids = tables.get_playable_ids(cards2counts(player.current_hand))
+            self.playable_ids[player_id] = playable_ids
+            self.playable_cards[player_id].update(tables.action_list[index] for index in playable_ids)
 
     def calc_playable_cards(self, player):
         ''' Recalculate all legal cards the player can play according to his
@@ -30,38 +31,26 @@ class DoudizhuJudger(object):
 
         Args:
             player (DoudizhuPlayer object): object of DoudizhuPlayer
-            init_flag (boolean): For the first time, set it True to accelerate
-              the preocess.
 
         Returns:
             list: list of string of playable cards
         '''
-        removed_playable_cards = []
-
+        tables = get_action_tables()
         player_id = player.player_id
-        current_hand = cards2str(player.current_hand)
-        missed = None
-        for single in player.singles:
-            if single not in current_hand:
-                missed = single
+        current_hand = cards2counts(player.current_hand)
+        for index, single in enumerate(player.singles):
+            if current_hand[CARD_RANK_INDEX[single]] == 0:
+                player.singles = player.singles[index+1:]
                 break
 
-        playable_cards = self.playable_cards[player_id].copy()
-
-        if missed is not None:
-            position = player.singles.find(missed)
-            player.singles = player.singles[position+1:]
-            for cards in playable_cards:
-                if missed in cards or (not contains_cards(current_hand, cards)):
-                    removed_playable_cards.append(cards)
-                    self.playable_cards[player_id].remove(cards)
-        else:
-            for cards in playable_cards:
-                if not contains_cards(current_hand, cards):
-                    #del self.playable_cards[player_id][cards]
-                    removed_playable_cards.append(cards)
-                    self.playable_cards[player_id].remove(cards)
-        self._recorded_removed_playable_cards[player_id].append(removed_playable_cards)
+        # The playable cards can only shrink, so only the previous ones are checked
+        previous_ids = self.playable_ids[player_id]
+        playable_ids = tables.get_playable_ids(current_hand, previous_ids)
+        removed_ids = np.setdiff1d(previous_ids, playable_ids, assume_unique=True)
+        removed_playable_cards = [tables.action_list[index] for index in removed_ids]
+        self.playable_cards[player_id].difference_update(removed_playable_cards)
+        self.playable_ids[player_id] = playable_ids
+        self._recorded_removed_playable_cards[player_id].append((previous_ids, removed_playable_cards))
         return self.playable_cards[player_id]
 
     def restore_playable_cards(self, player_id):
@@ -70,7 +59,8 @@ class DoudizhuJudger(object):
         Args:
             player_id: The id of the player whose playable_cards need to be restored
         '''
-        removed_playable_cards = self._recorded_removed_playable_cards[player_id].pop()
+        previous_ids, removed_playable_cards = self._recorded_removed_playable_cards[player_id].pop()
+        self.playable_ids[player_id] = previous_ids
         self.playable_cards[player_id].update(removed_playable_cards)
             
 
@@ -75,7 +75,7 @@ class DoudizhuPlayer(object):
         if greater_player is None or greater_player.player_id == self.player_id:
             actions = judger.get_playable_cards(self)
         else:
-            actions = get_gt_cards(self, greater_player)
+            actions = get_gt_cards(self, greater_player, judger.playable_ids[self.player_id])
         return actions 
 
     def play(self, action, greater_player=None):
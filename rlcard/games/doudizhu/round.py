@@ -5,7 +5,7 @@
 import functools
 
 from rlcard.games.doudizhu.dealer import DoudizhuDealer as Dealer
-from rlcard.games.doudizhu.judger import cards2str
+from rlcard.games.doudizhu.utils import cards2str
 from rlcard.games.doudizhu.utils import doudizhu_sort_card
 from rlcard.games.doudizhu.utils import doudizhu_sort_str
 
@@ -3,6 +3,7 @@
 
 import os
 import json
+import hashlib
 from collections import OrderedDict
 import numpy as np
 import threading
@@ -13,23 +14,22 @@ import rlcard
 # Read required docs
 ROOT_PATH = rlcard.__path__[0]
 
-# a map of action to abstract action
-with open(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/specific_map.json'), 'r') as file:
-    SPECIFIC_MAP = json.load(file, object_pairs_hook=OrderedDict)
-
 # a map of abstract action to its index and a list of abstract action
 with open(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/action_space.json'), 'r') as file:
     ACTION_SPACE = json.load(file, object_pairs_hook=OrderedDict)
     ACTION_LIST = list(ACTION_SPACE.keys())
 
-# a map of card to its type. Also return both dict and list to accelerate
-with open(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/card_type.json'), 'r') as file:
-    data = json.load(file, object_pairs_hook=OrderedDict)
-    CARD_TYPE = (data, list(data), set(data))
-
-# a map of type to its cards
-with open(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/type_card.json'), 'r') as file:
-    TYPE_CARD = json.load(file, object_pairs_hook=OrderedDict)
+# The large maps between specific actions and their types are compiled into
+# NumPy tables (see `compile_action_tables`) and memory-mapped on first use,
+# so that the processes of a pool share the same pages. The tables are
+# written to the user cache directory, which can be set with RLCARD_CACHE_DIR.
+CACHE_PATH = os.environ.get('RLCARD_CACHE_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'rlcard')
+TABLES_PATH = os.path.join(CACHE_PATH, 'doudizhu_tables')
+TABLE_NAMES = ('actions', 'action_types', 'action_weights', 'type_names',
+               'abstract_ids', 'action_counts', 'type_starts', 'beat_starts')
+# Increase when the layout of the tables changes, to recompile the old ones
+TABLES_FORMAT = 1
 
 # rank list of solo character of cards
 CARD_RANK_STR = ['3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K',
@@ -37,6 +37,283 @@ CARD_RANK_STR = ['3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K',
 # rank list
 CARD_RANK = ['3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K',
              'A', '2', 'BJ', 'RJ']
+# a map of solo character of card to its rank
+CARD_RANK_INDEX = {rank: index for index, rank in enumerate(CARD_RANK_STR)}
+# the same map as a lookup table indexed by the character code
+CARD_RANK_LOOKUP = np.zeros(256, dtype=np.intp)
+for _rank, _index in CARD_RANK_INDEX.items():
+    CARD_RANK_LOOKUP[ord(_rank)] = _index
+# the layers of the planes of the encoded cards, one per number of cards
+COUNT_LAYERS = np.arange(5).reshape(5, 1)
+
+
+def _load_json(name):
+    with open(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata', name), 'r') as file:
+        return json.load(file, object_pairs_hook=OrderedDict)
+
+
+def __getattr__(name):
+    ''' Load the JSON maps on first access. They are only kept for
+    compatibility, the game itself uses the tables of `get_action_tables`.
+    '''
+    if name == 'SPECIFIC_MAP':
+        # a map of action to abstract action
+        value = _load_json('specific_map.json')
+    elif name == 'CARD_TYPE':
+        # a map of card to its type. Also return both dict and list to accelerate
+        data = _load_json('card_type.json')
+        value = (data, list(data), set(data))
+    elif name == 'TYPE_CARD':
+        # a map of type to its cards
+        value = _load_json('type_card.json')
+    else:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+class ActionTables(object):
+    ''' Integer-indexed tables of the specific actions of Dou Dizhu. The
+    actions are sorted by type and then by weight, 'pass' is the last one.
+
+    Attributes:
+        actions (numpy.array): The specific actions as byte strings
+        action_types (numpy.array): The index of the type of each action
+        action_weights (numpy.array): The weight of each action within its type
+        type_names (numpy.array): The names of the types
+        abstract_ids (numpy.array): The indices in ACTION_SPACE of the abstract
+            actions of each action, padded with -1
+        action_counts (numpy.array): The number of cards of each rank in each
+            action, with shape [num_actions, 15]
+        type_starts (numpy.array): The index of the first action of each type,
+            followed by the number of actions
+        beat_starts (numpy.array): The index of the first action of the same
+            type with a greater weight, for each action
+    '''
+
+    def __init__(self, arrays):
+        for name in TABLE_NAMES:
+            setattr(self, name, arrays[name])
+        self.pass_id = len(self.actions) - 1
+        self.type_ids = {name: index for index, name in enumerate(self.type_names.tolist())}
+        bomb = self.type_ids['bomb']
+        rocket = self.type_ids['rocket']
+        self.bomb_range = (int(self.type_starts[bomb]), int(self.type_starts[bomb+1]))
+        self.rocket_range = (int(self.type_starts[rocket]), int(self.type_starts[rocket+1]))
+        self._action_list = None
+        self._action_ids = None
+
+    @property
+    def action_list(self):
+        ''' (list): The specific actions as str, built on first access
+        '''
+        if self._action_list is None:
+            self._action_list = [action.decode() for action in self.actions.tolist()]
+        return self._action_list
+
+    @property
+    def action_ids(self):
+        ''' (dict): A map of specific action to its index, built on first access
+        '''
+        if self._action_ids is None:
+            self._action_ids = {action: index for index, action in enumerate(self.action_list)}
+        return self._action_ids
+
+    def get_abstract_ids(self, action):
+        ''' Get the abstract actions of a specific action
+
+        Args:
+            action (str): The specific action
+
+        Returns:
+            (numpy.array): The indices of the abstract actions in ACTION_SPACE
+        '''
+        abstract_ids = self.abstract_ids[self.action_ids[action]]
+        return abstract_ids[abstract_ids >= 0]
+
+    def get_playable_ids(self, hand_counts, candidates=None):
+        ''' Select the actions that can be played from a hand
+
+        Args:
+            hand_counts (numpy.array): The counts of the hand, see `cards2counts`
+            candidates (numpy.array): The indices of the actions to check. All
+                the actions except 'pass' are checked if None
+
+        Returns:
+            (numpy.array): The sorted indices of the playable actions
+        '''
+        if candidates is None:
+            return np.flatnonzero(np.all(self.action_counts[:self.pass_id] <= hand_counts, axis=1))
+        return candidates[np.all(self.action_counts[candidates] <= hand_counts, axis=1)]
+
+    def get_beating_ranges(self, action_id):
+        ''' Get the actions that beat an action, i.e. the actions of the same
+        type with a greater weight, the bombs and the rocket
+
+        Args:
+            action_id (int): The index of the action
+
+        Returns:
+            (list): A list of (start, end) ranges of action indices
+        '''
+        action_type = self.action_types[action_id]
+        if (action_type == self.type_ids['rocket']):
+            return []
+        ranges = [(int(self.beat_starts[action_id]), int(self.type_starts[action_type+1])),
+                  self.rocket_range]
+        if (action_type != self.type_ids['bomb']):
+            ranges.append(self.bomb_range)
+        return ranges
+
+
+def build_action_tables():
+    ''' Build the action tables from the JSON data
+
+    Returns:
+        (dict): A dictionary of numpy arrays keyed by TABLE_NAMES
+    '''
+    type_card = _load_json('type_card.json')
+    specific_map = _load_json('specific_map.json')
+    type_names = list(type_card)
+    actions, action_types, action_weights = [], [], []
+    for type_id, type_name in enumerate(type_names):
+        for weight in sorted(type_card[type_name], key=int):
+            for cards in type_card[type_name][weight]:
+                actions.append(cards)
+                action_types.append(type_id)
+                action_weights.append(int(weight))
+    # 'pass' has a type of its own
+    type_names.append('pass')
+    actions.append('pass')
+    action_types.append(len(type_names) - 1)
+    action_weights.append(0)
+
+    width = max(len(abstracts) for abstracts in specific_map.values())
+    abstract_ids = np.full((len(actions), width), -1, dtype=np.int16)
+    for index, action in enumerate(actions):
+        for i, abstract in enumerate(specific_map[action]):
+            abstract_ids[index][i] = ACTION_SPACE[abstract]
+
+    action_counts = np.zeros((len(actions), len(CARD_RANK_STR)), dtype=np.uint8)
+    for index, action in enumerate(actions[:-1]):
+        action_counts[index] = cards2counts(action)
+
+    # the actions are sorted by type and weight, so the actions beating an
+    # action of the same type are a contiguous range
+    action_types = np.array(action_types, dtype=np.int8)
+    action_weights = np.array(action_weights, dtype=np.int8)
+    type_starts = np.searchsorted(action_types, np.arange(len(type_names) + 1)).astype(np.int32)
+    beat_starts = np.zeros(len(actions), dtype=np.int32)
+    for type_id in range(len(type_names)):
+        start, end = type_starts[type_id], type_starts[type_id+1]
+        weights = action_weights[start:end]
+        beat_starts[start:end] = start + np.searchsorted(weights, weights, side='right')
+
+    return {'actions': np.array(actions, dtype=np.bytes_),
+            'action_types': action_types,
+            'action_weights': action_weights,
+            'type_names': np.array(type_names),
+            'abstract_ids': abstract_ids,
+            'action_counts': action_counts,
+            'type_starts': type_starts,
+            'beat_starts': beat_starts}
+
+
+def get_tables_version():
+    ''' Get the version of the action tables, a hash of the JSON data they are
+    built from and of TABLES_FORMAT
+
+    Returns:
+        (str): The version of the tables
+    '''
+    digest = hashlib.sha256(str(TABLES_FORMAT).encode())
+    for name in ('action_space.json', 'specific_map.json', 'type_card.json'):
+        with open(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata', name), 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _read_tables_version(path):
+    ''' Read the version of the compiled tables in a directory
+
+    Args:
+        path (str): The directory of the tables
+
+    Returns:
+        (str): The version of the tables, or None if they are not compiled
+    '''
+    try:
+        with open(os.path.join(path, 'version'), 'r') as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+def _write_file(file_path, write):
+    ''' Write a file atomically, as several processes may compile at once
+
+    Args:
+        file_path (str): The path of the file
+        write (callable): A function that writes the content into a binary file
+    '''
+    tmp_path = '{}.{}.tmp'.format(file_path, os.getpid())
+    with open(tmp_path, 'wb') as file:
+        write(file)
+    os.replace(tmp_path, file_path)
+
+
+def compile_action_tables(path=TABLES_PATH):
+    ''' Compile the JSON data into one .npy file per table so that they can
+    be memory-mapped
+
+    Args:
+        path (str): The directory to write the tables into
+
+    Returns:
+        (dict): A dictionary of numpy arrays keyed by TABLE_NAMES
+    '''
+    arrays = build_action_tables()
+    os.makedirs(path, exist_ok=True)
+    for name in TABLE_NAMES:
+        _write_file(os.path.join(path, name + '.npy'), lambda file: np.save(file, arrays[name]))
+    # The version is written last, so that it only matches complete tables
+    version = get_tables_version().encode()
+    _write_file(os.path.join(path, 'version'), lambda file: file.write(version))
+    return arrays
+
+
+def load_action_tables(path=TABLES_PATH):
+    ''' Memory-map the compiled action tables. The tables are compiled if
+    they are missing or were built from other data or by another version,
+    and kept in memory if they can not be written.
+
+    Args:
+        path (str): The directory of the tables
+
+    Returns:
+        (ActionTables): The action tables
+    '''
+    file_paths = {name: os.path.join(path, name + '.npy') for name in TABLE_NAMES}
+    if _read_tables_version(path) != get_tables_version():
+        try:
+            compile_action_tables(path)
+        except OSError:
+            return ActionTables(build_action_tables())
+    arrays = {name: np.load(file_path, mmap_mode='r') for name, file_path in file_paths.items()}
+    return ActionTables(arrays)
+
+
+_action_tables = None
+def get_action_tables():
+    ''' Get the action tables of the process, loaded on first use
+
+    Returns:
+        (ActionTables): The action tables
+    '''
+    global _action_tables
+    if _action_tables is None:
+        _action_tables = load_action_tables()
+    return _action_tables
 
 
 def doudizhu_sort_str(card_1, card_2):
@@ -49,8 +326,8 @@ def doudizhu_sort_str(card_1, card_2):
     Returns:
         int: 1(card_1 > card_2) / 0(card_1 = card2) / -1(card_1 < card_2)
     '''
-    key_1 = CARD_RANK_STR.index(card_1)
-    key_2 = CARD_RANK_STR.index(card_2)
+    key_1 = CARD_RANK_INDEX[card_1]
+    key_2 = CARD_RANK_INDEX[card_2]
     if key_1 > key_2:
         return 1
     if key_1 < key_2:
@@ -120,7 +397,9 @@ def get_optimal_action(probs, legal_actions):
     Returns:
         str: optimal legal action
     '''
-    abstract_actions = [SPECIFIC_MAP[action] for action in legal_actions]
+    tables = get_action_tables()
+    abstract_actions = [[ACTION_LIST[index] for index in tables.get_abstract_ids(action)]
+                        for action in legal_actions]
     action_probs = []
     for actions in abstract_actions:
         max_prob = -1
@@ -154,6 +433,56 @@ def cards2str(cards):
             response += card.rank
     return response
 
+def cards2counts(cards):
+    ''' Count the cards of each rank
+
+    Args:
+        cards (str or list): string of cards, list of solo characters of cards,
+            or list of Card objects
+
+    Returns:
+        numpy.array: The number of cards of each rank in the order of CARD_RANK_STR
+    '''
+    return cards_list2counts([cards])[0]
+
+
+def cards_list2counts(cards_list):
+    ''' Count the cards of each rank for several groups of cards at once
+
+    Args:
+        cards_list (list): list of groups of cards, see `cards2counts`
+
+    Returns:
+        numpy.array: The counts with shape [len(cards_list), 15]
+    '''
+    cards_list = [cards if isinstance(cards, str) or not cards or isinstance(cards[0], str)
+                  else cards2str(cards) for cards in cards_list]
+    lengths = [len(cards) for cards in cards_list]
+    codes = np.frombuffer(''.join(''.join(cards) for cards in cards_list).encode('ascii'), dtype=np.uint8)
+    # offset the ranks of each group so that a single bincount does all the groups
+    offsets = np.repeat(np.arange(len(cards_list)) * len(CARD_RANK_STR), lengths)
+    counts = np.bincount(CARD_RANK_LOOKUP[codes] + offsets, minlength=len(cards_list) * len(CARD_RANK_STR))
+    return counts.reshape(len(cards_list), len(CARD_RANK_STR)).astype(np.uint8)
+
+
+def encode_counts(counts, out=None, dtype=np.int8):
+    ''' Encode the counts of cards into planes. The layer k of the plane of a
+    rank is 1 if there are k cards of that rank.
+
+    Args:
+        counts (numpy.array): The counts with shape [..., 15], see `cards2counts`
+        out (numpy.array): The array with shape [..., 5, 15] to write into. A
+            new array is allocated if None
+        dtype (numpy.dtype): The type of the new array
+
+    Returns:
+        numpy.array: The planes with shape [..., 5, 15]
+    '''
+    counts = np.expand_dims(counts, -2)
+    if out is None:
+        return (counts == COUNT_LAYERS).astype(dtype)
+    return np.equal(counts, COUNT_LAYERS, out=out, casting='unsafe')
+
 _local_objs = threading.local()
 _local_objs.cached_candidate_cards = None
 def contains_cards(candidate, target):
@@ -202,34 +531,21 @@ def encode_cards(plane, cards):
     '''
     if not cards:
         return None
-    layer = 1
-    if len(cards) == 1:
-        rank = CARD_RANK_STR.index(cards[0])
-        plane[layer][rank] = 1
-        plane[0][rank] = 0
-    else:
-        for index, card in enumerate(cards):
-            if index == 0:
-                continue
-            if card == cards[index-1]:
-                layer += 1
-            else:
-                rank = CARD_RANK_STR.index(cards[index-1])
-                plane[layer][rank] = 1
-                layer = 1
-                plane[0][rank] = 0
-        rank = CARD_RANK_STR.index(cards[-1])
-        plane[layer][rank] = 1
-        plane[0][rank] = 0
-
-
-def get_gt_cards(player, greater_player):
+    counts = cards2counts(cards)
+    ranks = np.flatnonzero(counts)
+    plane[0][ranks] = 0
+    plane[counts[ranks], ranks] = 1
+
+
+def get_gt_cards(player, greater_player, playable_ids=None):
     ''' Provide player's cards which are greater than the ones played by
     previous player in one round
 
     Args:
         player (DoudizhuPlayer object): the player waiting to play cards
         greater_player (DoudizhuPlayer object): the player who played current biggest cards.
+        playable_ids (numpy.array): the sorted indices of the actions the player
+            can play, see `DoudizhuJudger.playable_ids`. Computed from the hand if None
 
     Returns:
         list: list of string of greater cards
@@ -239,32 +555,17 @@ def get_gt_cards(player, greater_player):
     '''
     # add 'pass' to legal actions
     gt_cards = ['pass']
-    current_hand = cards2str(player.current_hand)
-    target_cards = greater_player.played_cards
-    target_types = CARD_TYPE[0][target_cards]
-    type_dict = {}
-    for card_type, weight in target_types:
-        if card_type not in type_dict:
-            type_dict[card_type] = weight
-    if 'rocket' in type_dict:
-        return gt_cards
-    type_dict['rocket'] = -1
-    if 'bomb' not in type_dict:
-        type_dict['bomb'] = -1
-    for card_type, weight in type_dict.items():
-        candidate = TYPE_CARD[card_type]
-        for can_weight, cards_list in candidate.items():
-            if int(can_weight) > int(weight):
-                for cards in cards_list:
-                    # TODO: improve efficiency
-                    if cards not in gt_cards and contains_cards(current_hand, cards):
-                        # if self.contains_cards(current_hand, cards):
-                        gt_cards.append(cards)
+    tables = get_action_tables()
+    target = tables.action_ids[greater_player.played_cards]
+    if playable_ids is None:
+        playable_ids = tables.get_playable_ids(cards2counts(player.current_hand))
+    action_list = tables.action_list
+    for start, end in tables.get_beating_ranges(target):
+        # both are sorted, so the intersection is a slice of playable_ids
+        first, last = np.searchsorted(playable_ids, (start, end))
+        gt_cards.extend(action_list[index] for index in playable_ids[first:last])
     return gt_cards
 
-
-# Test json order
-#if __name__ == '__main__':
-#    for action, index in ACTION_SPACE.items():
-#        if action != ACTION_LIST[index]:
-#            print('order error')
+# Compile the action tables, e.g. when building the package
+if __name__ == '__main__':
+    compile_action_tables()
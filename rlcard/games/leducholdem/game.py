@@ -64,6 +64,9 @@ class LeducholdemGame(LimitholdemGame):
         # Save the hisory for stepping back to the last state.
         self.history = []
 
+        # Save the betting history, the players, their actions and the public cards dealt after them
+        self.action_history = []
+
         state = self.get_state(self.game_pointer)
 
         return state, self.game_pointer
@@ -91,6 +94,8 @@ class LeducholdemGame(LimitholdemGame):
             ps = [copy(self.players[i]) for i in range(self.num_players)]
             ps_hand = [copy(self.players[i].hand) for i in range(self.num_players)]
             self.history.append((r, r_raised, gp, r_c, d_deck, p, ps, ps_hand))
+        player = self.game_pointer
+        dealt_cards = ()
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -101,9 +106,11 @@ class LeducholdemGame(LimitholdemGame):
             if self.round_counter == 0:
                 self.public_card = self.dealer.deal_card()
                 self.round.raise_amount = 2 * self.raise_amount
+                dealt_cards = (self.public_card.get_index(),)
 
             self.round_counter += 1
             self.round.start_new_round(self.game_pointer)
+        self.action_history.append((player, action, dealt_cards))
 
         state = self.get_state(self.game_pointer)
 
@@ -121,6 +128,10 @@ class LeducholdemGame(LimitholdemGame):
         chips = [self.players[i].in_chips for i in range(self.num_players)]
         legal_actions = self.get_legal_actions()
         state = self.players[player].get_state(self.public_card, chips, legal_actions)
+        # The betting history as seen by the player: whether each action is its
+        # own, the action and the public cards dealt after it
+        state['action_history'] = tuple((acting_player == player, action, dealt_cards)
+                                        for acting_player, action, dealt_cards in self.action_history)
 
         return state
 
@@ -162,10 +173,35 @@ class LeducholdemGame(LimitholdemGame):
             self.dealer.deck = d_deck
             for i, hand in enumerate(ps_hand):
                 self.players[i].hand = hand
+            self.action_history.pop()
             return True
         return False
 
 
+    def get_snapshot(self):
+        ''' Take a compact snapshot of the game. The snapshot shares the cards
+        with the game and can be restored any number of times.
+
+        Returns:
+            (dict): The snapshot to pass to `restore`
+        '''
+        snapshot = self._get_table_snapshot()
+        snapshot['public_card'] = self.public_card
+        snapshot['action_history'] = tuple(self.action_history)
+        return snapshot
+
+    def restore(self, snapshot):
+        ''' Restore the game from a snapshot. The history for stepping back
+        is cleared.
+
+        Args:
+            snapshot (dict): A snapshot taken by `get_snapshot`
+        '''
+        self._restore_table(snapshot)
+        self.public_card = snapshot['public_card']
+        self.action_history = list(snapshot['action_history'])
+
+
 # Test the game
 
 #if __name__ == "__main__":
@@ -1,14 +1,13 @@
 import random
 
-from rlcard.utils.utils import init_standard_deck
-
 class LimitholdemDealer(object):
 
     def __init__(self):
         ''' Initialize a limitholdem dealer class
         '''
         super().__init__()
-        self.deck = init_standard_deck()
+        # The cards are the indices of card2index.json, see `index2str`
+        self.deck = list(range(52))
         self.shuffle()
         self.pot = 0
 
@@ -21,6 +20,6 @@ class LimitholdemDealer(object):
         ''' Deal one card from the deck
 
         Returns:
-            (Card): The drawn card from the deck
+            (int): The index of the drawn card from the deck
         '''
         return self.deck.pop()
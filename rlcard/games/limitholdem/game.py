@@ -1,4 +1,4 @@
-from copy import deepcopy, copy
+from copy import copy
 import numpy as np
 
 from rlcard.games.limitholdem.dealer import LimitholdemDealer as Dealer
@@ -79,6 +79,9 @@ class LimitholdemGame(object):
         # Save the hisory for stepping back to the last state.
         self.history = []
 
+        # Save the betting history, the players, their actions and the public cards dealt after them
+        self.action_history = []
+
         state = self.get_state(self.game_pointer)
 
         # Save betting history
@@ -99,15 +102,10 @@ class LimitholdemGame(object):
                 (int): next plater's id
         '''
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            rn = copy(self.history_raise_nums)
-            self.history.append((r, b, r_c, d, p, ps, rn))
+            # First record what this step can change
+            self.history.append((self._record_step(), list(self.history_raise_nums)))
+        player = self.game_pointer
+        public_card_num = len(self.public_cards)
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -133,6 +131,7 @@ class LimitholdemGame(object):
 
             self.round_counter += 1
             self.round.start_new_round(self.game_pointer)
+        self.action_history.append((player, action, tuple(self.public_cards[public_card_num:])))
 
         state = self.get_state(self.game_pointer)
 
@@ -145,10 +144,114 @@ class LimitholdemGame(object):
             (bool): True if the game steps back successfully
         '''
         if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, self.players, self.history_raises_nums = self.history.pop()
+            record, self.history_raise_nums = self.history.pop()
+            self._undo_step(record)
+            self.action_history.pop()
             return True
         return False
 
+    def _record_step(self):
+        ''' Record the part of the game that a step can change. This is much
+        cheaper than copying the round, the dealer and the players.
+
+        Returns:
+            (tuple): The record to pass to `_undo_step`
+        '''
+        round_state = dict(self.round.__dict__)
+        round_state['raised'] = list(self.round.raised)
+        players = [(p.in_chips, p.status) for p in self.players]
+        return (self.game_pointer, self.round_counter, round_state, players, len(self.public_cards))
+
+    def _undo_step(self, record):
+        ''' Restore the game from a record of `_record_step`
+
+        Args:
+            record (tuple): The record taken before the step
+        '''
+        self.game_pointer, self.round_counter, round_state, players, public_card_num = record
+        self.round.__dict__ = round_state
+        for player, (in_chips, status) in zip(self.players, players):
+            player.in_chips = in_chips
+            player.status = status
+        # Put the public cards dealt by the step back on top of the deck
+        while len(self.public_cards) > public_card_num:
+            self.dealer.deck.append(self.public_cards.pop())
+
+    def get_snapshot(self):
+        ''' Take a compact snapshot of the game. The snapshot shares the cards
+        with the game and can be restored any number of times.
+
+        Returns:
+            (dict): The snapshot to pass to `restore`
+        '''
+        snapshot = self._get_table_snapshot()
+        snapshot['history_raise_nums'] = tuple(self.history_raise_nums)
+        snapshot['action_history'] = tuple(self.action_history)
+        snapshot['public_cards'] = tuple(self.public_cards)
+        return snapshot
+
+    def restore(self, snapshot):
+        ''' Restore the game from a snapshot. The history for stepping back
+        is cleared.
+
+        Args:
+            snapshot (dict): A snapshot taken by `get_snapshot`
+        '''
+        self._restore_table(snapshot)
+        self.history_raise_nums = list(snapshot['history_raise_nums'])
+        self.action_history = list(snapshot['action_history'])
+        self.public_cards = list(snapshot['public_cards'])
+
+    def clone(self):
+        ''' Copy the game so that the copy can be played independently
+
+        Returns:
+            (object): The copy of the game, without the history for stepping back
+        '''
+        game = copy(self)
+        game.dealer = copy(self.dealer)
+        game.players = [copy(player) for player in self.players]
+        game.round = copy(self.round)
+        game.restore(self.get_snapshot())
+        return game
+
+    def _get_table_snapshot(self):
+        ''' Take a snapshot of the parts shared by all the hold'em games
+
+        Returns:
+            (dict): The snapshot of the pointers, the round, the players and the deck
+        '''
+        round_state = dict(self.round.__dict__)
+        round_state['raised'] = tuple(self.round.raised)
+        players = []
+        for player in self.players:
+            player_state = dict(player.__dict__)
+            if isinstance(player.hand, list):
+                player_state['hand'] = tuple(player.hand)
+            players.append(player_state)
+        return {'game_pointer': self.game_pointer,
+                'round_counter': self.round_counter,
+                'round': round_state,
+                'players': tuple(players),
+                'deck': tuple(self.dealer.deck)}
+
+    def _restore_table(self, snapshot):
+        ''' Restore the parts shared by all the hold'em games
+
+        Args:
+            snapshot (dict): A snapshot taken by `_get_table_snapshot`
+        '''
+        self.game_pointer = snapshot['game_pointer']
+        self.round_counter = snapshot['round_counter']
+        self.round.__dict__ = dict(snapshot['round'])
+        self.round.raised = list(self.round.raised)
+        for player, player_state in zip(self.players, snapshot['players']):
+            player.__dict__ = dict(player_state)
+            if isinstance(player.hand, tuple):
+                player.hand = list(player.hand)
+        self.dealer.deck = list(snapshot['deck'])
+        self.history = []
+
     def get_player_num(self):
         ''' Return the number of players in Limit Texas Hold'em
 
@@ -187,6 +290,10 @@ class LimitholdemGame(object):
         legal_actions = self.get_legal_actions()
         state = self.players[player].get_state(self.public_cards, chips, legal_actions)
         state['raise_nums'] = self.history_raise_nums
+        # The betting history as seen by the player: whether each action is its
+        # own, the action and the public cards dealt after it
+        state['action_history'] = tuple((acting_player == player, action, dealt_cards)
+                                        for acting_player, action, dealt_cards in self.action_history)
 
         return state
 
@@ -1,4 +1,4 @@
-from rlcard.games.limitholdem.utils import compare_hands
+from rlcard.games.limitholdem.utils import compare_hands, split_pot
 
 class LimitholdemJudger(object):
     ''' The Judger class for Texas Hold'em
@@ -15,33 +15,12 @@ class LimitholdemJudger(object):
 
         Args:
             players (list): The list of players who play the game
-            hands (list): The list of hands that from the players
+            hands (list): The list of hands that from the players, as card indices
 
         Returns:
             (list): Each entry of the list corresponds to one entry of the
         '''
-        # Convert the hands into card indexes
-        for i, hand in enumerate(hands):
-            if hands[i] is not None:
-                h = [card.get_index() for card in hand]
-                hands[i] = h
-
-        #winners = compare_hands(hands)
-        #winners = [1, 0, 0]
         winners = compare_hands(hands)
 
-        # Compute the total chips
-        total = 0
-        for p in players:
-            total += p.in_chips
-
-        each_win = float(total) / sum(winners)
-
-        payoffs = []
-        for i, _ in enumerate(players):
-            if winners[i] == 1:
-                payoffs.append(each_win - players[i].in_chips)
-            else:
-                payoffs.append(float(-players[i].in_chips))
-
-        return payoffs
+        in_chips = [p.in_chips for p in players]
+        return split_pot(winners, in_chips).tolist()
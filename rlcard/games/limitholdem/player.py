@@ -18,15 +18,16 @@ class LimitholdemPlayer(object):
         ''' Encode the state for the player
 
         Args:
-            public_cards (list): A list of public cards that seen by all the players
+            public_cards (list): A list of public cards that seen by all the players,
+                as card indices (see `rlcard.games.limitholdem.utils.index2str`)
             all_chips (int): The chips that all players have put in
 
         Returns:
             (dict): The state of the player
         '''
         state = {}
-        state['hand'] = [c.get_index() for c in self.hand]
-        state['public_cards'] = [c.get_index() for c in public_cards]
+        state['hand'] = list(self.hand)
+        state['public_cards'] = list(public_cards)
         state['all_chips'] = all_chips
         state['my_chips'] = self.in_chips
         state['legal_actions'] = legal_actions
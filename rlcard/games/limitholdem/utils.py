@@ -1,3 +1,5 @@
+import numpy as np
+
 
 
 class Hand:
@@ -407,154 +409,311 @@ class Hand:
         High_cards = self.all_cards[2:7]
         return High_cards
 
-def compare_ranks(position, hands):
-    '''
-    Compare cards in same position of plays' five handcards
+# The ranks of the evaluator go from 0 for '2' to 12 for 'A'
+RANK_LOOKUP = '23456789TJQKA'
+STRING_RANK = {rank: index for index, rank in enumerate(RANK_LOOKUP)}
+# The rank and the suit of the card indices of card2index.json, where the
+# cards go from 'A' to 'K' within each suit
+INDEX_RANK = [(index - 1) % 13 for index in range(52)]
+INDEX_SUIT = [index // 13 for index in range(52)]
+
+# The string representations of the card indices, the same as card2index.json
+CARD_STRINGS = [suit + rank for suit in 'SHDC' for rank in 'A23456789TJQK']
+
+
+def index2str(cards):
+    ''' Get the string representations of card indices, e.g. for printing
+
     Args:
-        position(int): the position of a card in a sorted handcard
-        hands(list): cards of those players.
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
+        cards (list): The card indices
+
     Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
+        (list): The strings of the cards, e.g. ['SA', 'HK']
+    '''
+    return [CARD_STRINGS[card] for card in cards]
+
+
+# The categories of hands, the same as Hand.category
+HIGH_CARD, ONE_PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT, FLUSH, \
+    FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH = range(1, 10)
+# The category takes the bits above the 5 ranks of the tie-breaking cards
+CATEGORY_SHIFT = 20
+
+
+def _build_rank_tables():
+    ''' Build the tables indexed by a 13-bit mask of ranks
+
+    Returns:
+        (tuple): Tuple containing:
 
+            (numpy.array): The number of ranks in the mask
+            (numpy.array): The highest rank of the straight in the mask plus 1, or 0
+            (numpy.array): The 5 highest ranks of the mask plus 1, packed in
+                4 bits each from the highest one
     '''
-    RANKS = '23456789TJQKA'
-    winner = [0]*len(hands)
-    figure = [['1', 'J']]*len(hands) #cards without suit
-    for _ in enumerate(hands):
-        i = hands[_[0]].get_hand_five_cards()
-        if len(i[0]) != 1:# remove suit
-            for p in range(5):
-                i[p] = i[p][1:]
-        figure[_[0]] = i
-
-    rival_figures = [] # figures in the same position, to be compared
-    rival_ranks = [] # ranks of rival_figures
-    for _ in enumerate(figure):
-        rival_figures.append(figure[_[0]][position])
-        rival_ranks.append(RANKS.index(rival_figures[_[0]]))
-    high_ranks = [q for q, j in enumerate(rival_ranks) if j == max(rival_ranks)]
-    for _ in high_ranks:
-        winner[_] = 1
-    return winner
-
-def determine_winner(key_index, hands, all_players, potential_winner_index):
+    bit_counts = np.zeros(1 << 13, dtype=np.int32)
+    straight_highs = np.zeros(1 << 13, dtype=np.int32)
+    top_fives = np.zeros(1 << 13, dtype=np.int32)
+    straights = [(high, sum(1 << (rank % 13) for rank in range(high - 4, high + 1))) for high in range(12, 2, -1)]
+    for mask in range(1 << 13):
+        ranks = [rank for rank in range(12, -1, -1) if mask >> rank & 1]
+        bit_counts[mask] = len(ranks)
+        for high, straight in straights:
+            # The wheel A2345 has a mask with the ace at the bit 12
+            if mask & straight == straight:
+                straight_highs[mask] = high + 1
+                break
+        packed = 0
+        for i in range(5):
+            packed = packed << 4 | (ranks[i] + 1 if i < len(ranks) else 0)
+        top_fives[mask] = packed
+    return bit_counts, straight_highs, top_fives
+
+BIT_COUNTS, STRAIGHT_HIGHS, TOP_FIVES = _build_rank_tables()
+# Indexing lists is faster than indexing arrays for a single hand
+_BIT_COUNTS, _STRAIGHT_HIGHS, _TOP_FIVES = BIT_COUNTS.tolist(), STRAIGHT_HIGHS.tolist(), TOP_FIVES.tolist()
+
+
+def _top(mask, num):
+    ''' Get the num highest ranks of a mask packed in 4 bits each
     '''
-    Find out who wins in the situation of having players with same highest hand_catagory
+    return _TOP_FIVES[mask] >> (4 * (5 - num))
+
+
+def evaluate_hand(cards):
+    ''' Evaluate the best five cards among 5 to 7 cards with the tables of
+    13-bit rank masks
+
     Args:
-        key_index(int): the position of a card in a sorted handcard
-        hands(list): cards of those players with same highest hand_catagory. 
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        all_players(list): all the players in this round, 0 for losing and 1 for winning or draw
-        potential_winner_index(list): the positions of those players with same highest hand_catagory in all_players
-    Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
+        cards (list): The card indices of card2index.json, e.g. [0, 13, 50],
+            or their string representations, e.g. ['SA', 'HA', 'CQ']
 
+    Returns:
+        (int): The strength of the hand. The greater the better, and equal
+            strengths tie. The category is `strength >> CATEGORY_SHIFT`
     '''
-    count = 0
-    winner = [1]*len(hands)
-    for _ in key_index:
-        index_winner = compare_ranks(_, hands)
-        for _ in enumerate(winner):
-            if winner[_[0]] == 1:
-                winner[_[0]] = index_winner[_[0]]
-            if winner[_[0]] == 0:
-                continue
-        if winner.count(1) == 1:
-            break
-    for _ in winner:
-        if _ == 1:
-            all_players[potential_winner_index[count]] = 1
-        count+=1
-    return all_players
+    # The masks of the ranks with at least one, two, three and four cards
+    singles = pairs = trips = quads = 0
+    suit_masks = {}
+    for card in cards:
+        if isinstance(card, str):
+            rank, suit = STRING_RANK[card[1]], card[0]
+        else:
+            rank, suit = INDEX_RANK[card], INDEX_SUIT[card]
+        bit = 1 << rank
+        if not singles & bit:
+            singles |= bit
+        elif not pairs & bit:
+            pairs |= bit
+        elif not trips & bit:
+            trips |= bit
+        else:
+            quads |= bit
+        suit_masks[suit] = suit_masks.get(suit, 0) | bit
+
+    # A flush excludes the four of a kind and the full house with 7 cards or less
+    for suit_mask in suit_masks.values():
+        if _BIT_COUNTS[suit_mask] >= 5:
+            if _STRAIGHT_HIGHS[suit_mask]:
+                return STRAIGHT_FLUSH << CATEGORY_SHIFT | _STRAIGHT_HIGHS[suit_mask] << 16
+            return FLUSH << CATEGORY_SHIFT | _top(suit_mask, 5)
+
+    if quads:
+        quad = quads.bit_length() - 1
+        return FOUR_OF_A_KIND << CATEGORY_SHIFT | (quad + 1) << 16 | _top(singles & ~(1 << quad), 1) << 12
+    if trips:
+        trip = trips.bit_length() - 1
+        pair = pairs & ~(1 << trip)
+        if pair:
+            return FULL_HOUSE << CATEGORY_SHIFT | (trip + 1) << 16 | pair.bit_length() << 12
+    if _STRAIGHT_HIGHS[singles]:
+        return STRAIGHT << CATEGORY_SHIFT | _STRAIGHT_HIGHS[singles] << 16
+    if trips:
+        return THREE_OF_A_KIND << CATEGORY_SHIFT | (trip + 1) << 16 | _top(singles & ~(1 << trip), 2) << 8
+    if _BIT_COUNTS[pairs] >= 2:
+        top_pairs = _top(pairs, 2)
+        kicker = _top(singles & ~(1 << (top_pairs >> 4) - 1) & ~(1 << (top_pairs & 15) - 1), 1)
+        return TWO_PAIR << CATEGORY_SHIFT | top_pairs << 12 | kicker << 8
+    if pairs:
+        pair = pairs.bit_length() - 1
+        return ONE_PAIR << CATEGORY_SHIFT | (pair + 1) << 16 | _top(singles & ~(1 << pair), 3) << 4
+    return HIGH_CARD << CATEGORY_SHIFT | _top(singles, 5)
+
 
 def compare_hands(hands):
     '''
     Compare all palyer's all seven cards
     Args:
-        hands(list): cards of those players with same highest hand_catagory.
+        hands(list): cards of those players, None for the players who folded.
         e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
+        The cards can also be card indices, see `evaluate_hand`
     Returns:
         [0, 1, 0]: player1 wins
         [1, 0, 0]: player0 wins
         [1, 1, 1]: draw
         [1, 1, 0]: player1 and player0 draws
+    '''
+    remaining = [i for i, hand in enumerate(hands) if hand is not None]
+    if len(remaining) == 1:
+        return [1 if hand is not None else 0 for hand in hands]
+    strengths = [evaluate_hand(hand) if hand is not None else -1 for hand in hands]
+    best = max(strengths)
+    return [1 if strength == best else 0 for strength in strengths]
+
+
+# Indexed by card indices of card2index.json
+INDEX_RANK_ARRAY = np.array(INDEX_RANK)
+RANK_BITS = 1 << np.arange(13)
 
-    if hands[0] == None:
-        return [0, 1]
-    elif hands[1] == None:
-        return [1, 0]
+
+def _top_array(masks, num):
+    ''' Get the num highest ranks plus 1 of arrays of masks packed in 4 bits each
     '''
-    hand_category = [] #such as high_card, straight_flush, etc
-    all_players = [0]*len(hands) #all the players in this round, 0 for losing and 1 for winning or draw
-    if None in hands:
-        fold_players = [i for i, j in enumerate(hands) if j is None]
-        if len(fold_players) == len(all_players) - 1:
-            for _ in enumerate(hands):
-                if _[0] in fold_players:
-                    all_players[_[0]] = 0
-                else:
-                    all_players[_[0]] = 1
-            return all_players
-        else:
-            for _ in enumerate(hands):
-                if hands[_[0]] is not None:
-                    hands[_[0]] = Hand(hands[_[0]])
-                    hands[_[0]].evaluateHand()
-                    hand_category.append(hands[_[0]].category)
-                elif hands[_[0]] is None:
-                    hand_category.append(0)
-    else:
-            for i in enumerate(hands):
-                hands[i[0]] = Hand(hands[i[0]])
-                hands[i[0]].evaluateHand()
-                hand_category.append(hands[i[0]].category)
-    potential_winner_index = [i for i, j in enumerate(hand_category) if j == max(hand_category)]# potential winner are those with same max card_catagory
-
-    return final_compare(hands, potential_winner_index, all_players)
-
-def final_compare(hands, potential_winner_index, all_players):
+    return TOP_FIVES[masks] >> (4 * (5 - num))
+
+
+def _without(masks, ranks):
+    ''' Clear the bits of the ranks from arrays of masks. The ranks are given
+    plus 1, as returned by `_top_array`, and 0 clears nothing
     '''
-    Find out the winners from those who didn't fold
+    return masks & ~((1 << ranks) >> 1)
+
+
+def evaluate_hands(cards):
+    ''' Evaluate many hands at once, the same way as `evaluate_hand`
+
     Args:
-        hands(list): cards of those players with same highest hand_catagory.
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        potential_winner_index(list): index of those with same max card_catagory in all_players
-        all_players(list): a list of all the player's win/lose situation, 0 for lose and 1 for win
+        cards (numpy.array): The card indices with shape [..., n], where n is
+            between 5 and 7
+
     Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
+        (numpy.array): The strengths of the hands with shape [...]
+    '''
+    cards = np.asarray(cards)
+    ranks = INDEX_RANK_ARRAY[cards]
+    bits = RANK_BITS[ranks]
+    suits = cards // 13
+    # The cards are distinct, so summing the bits of a suit gives its rank mask
+    suit_masks = np.stack([np.where(suits == suit, bits, 0).sum(axis=-1) for suit in range(4)], axis=-1)
+    flush_masks = np.where(BIT_COUNTS[suit_masks] >= 5, suit_masks, 0).max(axis=-1)
+    counts = (ranks[..., None] == np.arange(13)).sum(axis=-2)
+
+    singles, pairs, trips, quads = [(counts >= i) @ RANK_BITS for i in range(1, 5)]
+    quad = _top_array(quads, 1)
+    trip = _top_array(trips, 1)
+    full_house_pair = _top_array(_without(pairs, trip), 1)
+    two_pairs = _top_array(pairs, 2)
+    pair = two_pairs >> 4
+
+    conditions = [
+        (flush_masks > 0) & (STRAIGHT_HIGHS[flush_masks] > 0),
+        flush_masks > 0,
+        quads > 0,
+        (trips > 0) & (full_house_pair > 0),
+        STRAIGHT_HIGHS[singles] > 0,
+        trips > 0,
+        BIT_COUNTS[pairs] >= 2,
+        pairs > 0,
+    ]
+    choices = [
+        STRAIGHT_FLUSH << CATEGORY_SHIFT | STRAIGHT_HIGHS[flush_masks] << 16,
+        FLUSH << CATEGORY_SHIFT | TOP_FIVES[flush_masks],
+        FOUR_OF_A_KIND << CATEGORY_SHIFT | quad << 16 | _top_array(_without(singles, quad), 1) << 12,
+        FULL_HOUSE << CATEGORY_SHIFT | trip << 16 | full_house_pair << 12,
+        STRAIGHT << CATEGORY_SHIFT | STRAIGHT_HIGHS[singles] << 16,
+        THREE_OF_A_KIND << CATEGORY_SHIFT | trip << 16 | _top_array(_without(singles, trip), 2) << 8,
+        TWO_PAIR << CATEGORY_SHIFT | two_pairs << 12
+            | _top_array(_without(_without(singles, pair), two_pairs & 15), 1) << 8,
+        ONE_PAIR << CATEGORY_SHIFT | pair << 16 | _top_array(_without(singles, pair), 3) << 4,
+    ]
+    return np.select(conditions, choices, HIGH_CARD << CATEGORY_SHIFT | TOP_FIVES[singles])
+
+
+def split_pot(winners, in_chips):
+    ''' Compute the payoffs when the winners split the chips of all the players
 
-    if hands[0] == None:
-        return [0, 1]
-    elif hands[1] == None:
-        return [1, 0]
+    Args:
+        winners (numpy.array): The winners with shape [..., players], 1 for winning or draw
+        in_chips (numpy.array): The chips put in the pot by the players, with
+            a shape that broadcasts to the one of winners
+
+    Returns:
+        (numpy.array): The payoffs with the shape of winners
+    '''
+    winners = np.asarray(winners, dtype=bool)
+    in_chips = np.broadcast_to(np.asarray(in_chips, dtype=float), winners.shape)
+    each_win = in_chips.sum(axis=-1, keepdims=True) / winners.sum(axis=-1, keepdims=True)
+    return np.where(winners, each_win - in_chips, -in_chips)
+
+
+def judge_showdowns(hole_cards, boards, in_chips=1, folded=None):
+    ''' Judge a batch of showdowns at once
+
+    Args:
+        hole_cards (numpy.array): The card indices of the hands with shape [batch, players, 2]
+        boards (numpy.array): The card indices of the public cards with shape [batch, 5]
+        in_chips (numpy.array): The chips of the players in the pot, broadcast
+            to [batch, players]. Every player puts in 1 chip by default
+        folded (numpy.array): True for the players who folded, with shape [batch, players]
+
+    Returns:
+        (tuple): Tuple containing:
+
+            (numpy.array): The boolean winner masks with shape [batch, players]
+            (numpy.array): The payoffs with shape [batch, players]
+    '''
+    hole_cards = np.asarray(hole_cards)
+    boards = np.broadcast_to(np.asarray(boards)[:, None, :], hole_cards.shape[:2] + (np.shape(boards)[-1],))
+    strengths = evaluate_hands(np.concatenate([hole_cards, boards], axis=-1))
+    if folded is not None:
+        strengths = np.where(folded, -1, strengths)
+    winners = strengths == strengths.max(axis=-1, keepdims=True)
+    return winners, split_pot(winners, in_chips)
+
+
+def estimate_equity(hole_cards, boards=None, num_samples=1000, np_random=None, chunk_size=65536):
+    ''' Estimate the equities of the players by sampling the rest of the board
+    with Monte Carlo. A draw counts as the share of the pot.
+
+    Args:
+        hole_cards (numpy.array): The card indices of the hands with shape [batch, players, 2]
+        boards (numpy.array): The card indices of the known public cards with
+            shape [batch, k], k between 0 and 5. No public card is known if None
+        num_samples (int): The number of boards sampled for each hand
+        np_random (numpy.random.RandomState): The random generator, numpy.random if None
+        chunk_size (int): The maximum number of showdowns evaluated at once
+
+    Returns:
+        (numpy.array): The equities with shape [batch, players], which sum to 1 over the players
     '''
-    if len(potential_winner_index) == 1:
-        all_players[potential_winner_index[0]] = 1
-        return all_players
-    elif len(potential_winner_index) > 1:
-        # compare when having equal max categories
-        equal_hands = []
-        for _ in potential_winner_index:
-            equal_hands.append(hands[_])
-        if hands[potential_winner_index[0]].category == 9 or hands[potential_winner_index[0]].category == 5 or hands[potential_winner_index[0]].category == 8:
-            return determine_winner([0], equal_hands, all_players, potential_winner_index)
-        if hands[potential_winner_index[0]].category == 7:
-            return determine_winner([2, 0], equal_hands, all_players, potential_winner_index)
-        if hands[potential_winner_index[0]].category == 4:
-            return determine_winner([2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hands[potential_winner_index[0]].category == 3:
-            return determine_winner([4, 2, 0], equal_hands, all_players, potential_winner_index)
-        if hands[potential_winner_index[0]].category == 2:
-            return determine_winner([4, 2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hands[potential_winner_index[0]].category == 1 or hands[potential_winner_index[0]].category == 6:
-            return determine_winner([4, 3, 2, 1, 0], equal_hands, all_players, potential_winner_index)
\ No newline at end of file
+    np_random = np.random if np_random is None else np_random
+    hole_cards = np.asarray(hole_cards)
+    batch_size = hole_cards.shape[0]
+    if boards is None:
+        boards = np.zeros((batch_size, 0), dtype=int)
+    boards = np.asarray(boards, dtype=int).reshape(batch_size, -1)
+    missing = 5 - boards.shape[1]
+    if missing < 0:
+        raise ValueError('The boards can not have more than 5 cards')
+    if missing == 0:
+        winners, _ = judge_showdowns(hole_cards, boards)
+        return winners / winners.sum(axis=-1, keepdims=True)
+
+    dead = np.zeros((batch_size, 52), dtype=bool)
+    np.put_along_axis(dead, hole_cards.reshape(batch_size, -1), True, axis=1)
+    np.put_along_axis(dead, boards, True, axis=1)
+    equities = np.zeros(hole_cards.shape[:2])
+    samples_per_chunk = max(1, chunk_size // batch_size)
+    done = 0
+    while done < num_samples:
+        samples = min(samples_per_chunk, num_samples - done)
+        # The smallest random keys of the live cards give a sample without replacement
+        keys = np_random.random_sample((batch_size, samples, 52))
+        keys[np.broadcast_to(dead[:, None, :], keys.shape)] = 2
+        drawn = np.argpartition(keys, missing - 1, axis=-1)[..., :missing]
+        full_boards = np.concatenate([np.broadcast_to(boards[:, None, :], (batch_size, samples, boards.shape[1])), drawn], axis=-1)
+        winners, _ = judge_showdowns(np.repeat(hole_cards, samples, axis=0), full_boards.reshape(batch_size * samples, 5))
+        shares = (winners / winners.sum(axis=-1, keepdims=True)).reshape(batch_size, samples, -1)
+        equities += shares.sum(axis=1)
+        done += samples
+    return equities / num_samples
@@ -1,5 +1,5 @@
 import numpy as np
-from copy import deepcopy
+from copy import copy
 
 from rlcard.games.mahjong.dealer import MahjongDealer as Dealer
 from rlcard.games.mahjong.player import MahjongPlayer as Player
@@ -58,12 +58,9 @@ class MahjongGame(object):
                 (dict): next player's state
                 (int): next plater's id
         '''
-        # First snapshot the current state
+        # First record what this step can change
         if self.allow_step_back:
-            hist_dealer = deepcopy(self.dealer)
-            hist_round = deepcopy(self.round)
-            hist_players = deepcopy(self.players)
-            self.history.append((hist_dealer, hist_players, hist_round))
+            self.history.append(self._record_step())
         self.round.proceed_round(self.players, action)
         state = self.get_state(self.round.current_player)
         self.cur_state = state
@@ -77,9 +74,90 @@ class MahjongGame(object):
         '''
         if not self.history:
             return False
-        self.dealer, self.players, self.round = self.history.pop()
+        self._undo_step(self.history.pop())
         return True
 
+    def _record_step(self):
+        ''' Record the part of the game that a step can change. A step deals
+        at most one card from the deck, puts a card on the table or takes the
+        last one back, removes cards from the hand of the current player and
+        appends cards to the hands and piles.
+
+        Returns:
+            (tuple): The record to pass to `_undo_step`
+        '''
+        round_state = dict(self.round.__dict__)
+        hand_nums = [len(player.hand) for player in self.players]
+        pile_nums = [len(player.pile) for player in self.players]
+        current_hand = list(self.players[self.round.current_player].hand)
+        table = self.dealer.table
+        return (round_state, self.cur_state, hand_nums, pile_nums, current_hand,
+                len(self.dealer.deck), self.dealer.deck[-1:], len(table), table[-1:])
+
+    def _undo_step(self, record):
+        ''' Restore the game from a record of `_record_step`
+
+        Args:
+            record (tuple): The record taken before the step
+        '''
+        (round_state, self.cur_state, hand_nums, pile_nums, current_hand,
+         deck_num, deck_top, table_num, table_top) = record
+        self.round.__dict__ = round_state
+        for player, hand_num, pile_num in zip(self.players, hand_nums, pile_nums):
+            del player.hand[hand_num:]
+            del player.pile[pile_num:]
+        self.players[self.round.current_player].hand[:] = current_hand
+        del self.dealer.deck[deck_num - len(deck_top):]
+        self.dealer.deck.extend(deck_top)
+        del self.dealer.table[table_num - len(table_top):]
+        self.dealer.table.extend(table_top)
+
+    def get_snapshot(self):
+        ''' Take a compact snapshot of the game. The snapshot shares the cards
+        with the game and can be restored any number of times.
+
+        Returns:
+            (tuple): The snapshot to pass to `restore`
+        '''
+        round_state = dict(self.round.__dict__)
+        del round_state['dealer']
+        del round_state['judger']
+        players = tuple((tuple(player.hand), tuple(player.pile)) for player in self.players)
+        return round_state, tuple(self.dealer.deck), tuple(self.dealer.table), players
+
+    def restore(self, snapshot):
+        ''' Restore the game from a snapshot. The history for stepping back
+        is cleared.
+
+        Args:
+            snapshot (tuple): A snapshot taken by `get_snapshot`
+        '''
+        round_state, deck, table, players = snapshot
+        dealer, judger = self.round.dealer, self.round.judger
+        self.round.__dict__ = dict(round_state)
+        self.round.dealer, self.round.judger = dealer, judger
+        self.dealer.deck = list(deck)
+        self.dealer.table = list(table)
+        for player, (hand, pile) in zip(self.players, players):
+            player.hand = list(hand)
+            player.pile = list(pile)
+        self.cur_state = self.get_state(self.round.current_player)
+        self.history = []
+
+    def clone(self):
+        ''' Copy the game so that the copy can be played independently
+
+        Returns:
+            (object): The copy of the game, without the history for stepping back
+        '''
+        game = copy(self)
+        game.dealer = copy(self.dealer)
+        game.players = [copy(player) for player in self.players]
+        game.round = copy(self.round)
+        game.round.dealer = game.dealer
+        game.restore(self.get_snapshot())
+        return game
+
     def get_state(self, player_id):
         ''' Return player's state
 
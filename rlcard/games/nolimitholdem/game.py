@@ -1,5 +1,4 @@
 import numpy as np
-from copy import deepcopy
 from rlcard.games.limitholdem.game import LimitholdemGame
 
 from rlcard.games.nolimitholdem.dealer import NolimitholdemDealer as Dealer
@@ -95,14 +94,8 @@ class NolimitholdemGame(LimitholdemGame):
                 (int): next plater's id
         '''
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            self.history.append((r, b, r_c, d, p, ps))
+            # First record what this step can change
+            self.history.append(self._record_step())
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -147,10 +140,31 @@ class NolimitholdemGame(LimitholdemGame):
             (bool): True if the game steps back successfully
         '''
         if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, self.players = self.history.pop()
+            self._undo_step(self.history.pop())
             return True
         return False
 
+    def get_snapshot(self):
+        ''' Take a compact snapshot of the game. The snapshot shares the cards
+        with the game and can be restored any number of times.
+
+        Returns:
+            (dict): The snapshot to pass to `restore`
+        '''
+        snapshot = self._get_table_snapshot()
+        snapshot['public_cards'] = tuple(self.public_cards)
+        return snapshot
+
+    def restore(self, snapshot):
+        ''' Restore the game from a snapshot. The history for stepping back
+        is cleared.
+
+        Args:
+            snapshot (dict): A snapshot taken by `get_snapshot`
+        '''
+        self._restore_table(snapshot)
+        self.public_cards = list(snapshot['public_cards'])
+
     def get_action_num(self):
         ''' Return the number of applicable actions
 
@@ -1,4 +1,4 @@
-from copy import deepcopy
+from copy import copy
 
 from rlcard.games.uno.dealer import UnoDealer as Dealer
 from rlcard.games.uno.player import UnoPlayer as Player
@@ -62,11 +62,8 @@ class UnoGame(object):
         '''
 
         if self.allow_step_back:
-            # First snapshot the current state
-            his_dealer = deepcopy(self.dealer)
-            his_round = deepcopy(self.round)
-            his_players = deepcopy(self.players)
-            self.history.append((his_dealer, his_players, his_round))
+            # First record what this step can change
+            self.history.append(self._record_step())
 
         self.round.proceed_round(self.players, action)
         player_id = self.round.current_player
@@ -81,9 +78,125 @@ class UnoGame(object):
         '''
         if not self.history:
             return False
-        self.dealer, self.players, self.round = self.history.pop()
+        self._undo_step(self.history.pop())
         return True
 
+    def _record_step(self):
+        ''' Record the part of the game that a step can change. A step draws
+        at most 4 cards from the top of the deck, removes at most one card from
+        the hand of the current player and appends cards to the other piles.
+        Only when the deck runs low, the played cards may be shuffled back
+        into the deck, so that the whole deck is recorded.
+
+        Returns:
+            (tuple): The record to pass to `_undo_step`
+        '''
+        deck = self.dealer.deck
+        played_cards = self.round.played_cards
+        round_state = dict(self.round.__dict__)
+        hand_nums = [len(player.hand) for player in self.players]
+        current_hand = list(self.players[self.round.current_player].hand)
+        if len(deck) < 4:
+            cards = deck + played_cards
+            full_piles = (list(deck), list(played_cards))
+        else:
+            cards = deck[-4:]
+            full_piles = None
+        # The colors of drawn wild cards are changed in place
+        colors = [(card, card.color) for card in cards]
+        return (round_state, hand_nums, current_hand, len(deck), len(played_cards), colors, full_piles)
+
+    def _undo_step(self, record):
+        ''' Restore the game from a record of `_record_step`
+
+        Args:
+            record (tuple): The record taken before the step
+        '''
+        round_state, hand_nums, current_hand, deck_num, played_num, colors, full_piles = record
+        self.round.__dict__ = round_state
+        for player, hand_num in zip(self.players, hand_nums):
+            del player.hand[hand_num:]
+        self.players[self.round.current_player].hand[:] = current_hand
+        if full_piles is None:
+            del self.dealer.deck[deck_num - len(colors):]
+            self.dealer.deck.extend(card for card, _ in colors)
+            del self.round.played_cards[played_num:]
+        else:
+            self.dealer.deck[:], self.round.played_cards[:] = full_piles
+        for card, color in colors:
+            card.color = color
+
+    def get_snapshot(self):
+        ''' Take a compact snapshot of the game. The snapshot shares the cards
+        with the game and can be restored any number of times.
+
+        Returns:
+            (tuple): The snapshot to pass to `restore`
+        '''
+        round_state = dict(self.round.__dict__)
+        del round_state['dealer']
+        round_state['played_cards'] = tuple(self.round.played_cards)
+        deck = tuple(self.dealer.deck)
+        hands = tuple(tuple(player.hand) for player in self.players)
+        # The colors of the wild cards are changed in place when they are drawn
+        wild_colors = tuple((card, card.color) for card in self._iter_cards() if card.type == 'wild')
+        return round_state, deck, hands, wild_colors
+
+    def restore(self, snapshot):
+        ''' Restore the game from a snapshot. The history for stepping back
+        is cleared.
+
+        Args:
+            snapshot (tuple): A snapshot taken by `get_snapshot`
+        '''
+        round_state, deck, hands, wild_colors = snapshot
+        # Give the game its own wild cards, so that coloring them does not
+        # change the other games restored from the same snapshot
+        wild_cards = {}
+        for card, color in wild_colors:
+            wild_cards[card] = copy(card)
+            wild_cards[card].color = color
+
+        def restore_cards(cards):
+            return [wild_cards.get(card, card) for card in cards]
+
+        dealer = self.round.dealer
+        self.round.__dict__ = dict(round_state)
+        self.round.dealer = dealer
+        self.round.target = wild_cards.get(self.round.target, self.round.target)
+        self.round.played_cards = restore_cards(self.round.played_cards)
+        self.dealer.deck = restore_cards(deck)
+        for player, hand in zip(self.players, hands):
+            player.hand = restore_cards(hand)
+        self.history = []
+
+    def clone(self):
+        ''' Copy the game so that the copy can be played independently
+
+        Returns:
+            (object): The copy of the game, without the history for stepping back
+        '''
+        game = copy(self)
+        game.dealer = copy(self.dealer)
+        game.players = [copy(player) for player in self.players]
+        game.round = copy(self.round)
+        game.round.dealer = game.dealer
+        game.payoffs = list(self.payoffs)
+        game.restore(self.get_snapshot())
+        return game
+
+    def _iter_cards(self):
+        ''' Iterate over all the cards in the game
+
+        Returns:
+            (iterator): The cards in the deck, the played cards, the hands and the target
+        '''
+        yield self.round.target
+        yield from self.dealer.deck
+        yield from self.round.played_cards
+        for player in self.players:
+            yield from player.hand
+
     def get_state(self, player_id):
         ''' Return player's state
 
@@ -0,0 +1,286 @@
+''' Compute exact best responses, exploitability and expected payoffs on public trees
+'''
+
+import numpy as np
+
+
+class PolicyCache(object):
+    ''' The action probabilities of the policies of the players on a public
+    tree. A policy can be:
+
+        - a function that takes an extracted state and returns the
+          probabilities of all the actions of the env
+        - an agent. The probabilities of `batch_eval_probs` are used if the
+          agent has it, else `eval_step` is taken as a deterministic policy
+        - a solver of the tree with `get_node_probs`, e.g. PublicTreeCFR,
+          which gives the probabilities of all the hands at a node
+        - a list of the above, one per player, or a model with `agents`
+
+    The policies are queried once per information set, and the states of many
+    decision nodes are sent to an agent in one batch. An information set is
+    given by the observation and the legal actions, and also by the betting
+    history for the agents with `perfect_recall`, see CFRAgent.get_key.
+    '''
+
+    def __init__(self, tree, policy, batch_size=4096):
+        ''' Initialize the cache
+
+        Args:
+            tree (PublicTree): The public tree
+            policy (object): The policy used by both players, or the list of the policies of the players
+            batch_size (int): The number of states sent to a policy at once
+        '''
+        if hasattr(policy, 'agents'):
+            policy = policy.agents
+        policies = list(policy) if isinstance(policy, (list, tuple)) else [policy] * tree.player_num
+        if len(policies) != tree.player_num:
+            raise ValueError('Expected {} policies, got {}'.format(tree.player_num, len(policies)))
+        self.tree = tree
+        self.node_policies = [policy if hasattr(policy, 'get_node_probs') else None for policy in policies]
+        self.batch_policies = [None if node_policy is not None else _get_batch_policy(policy, tree.env.action_num)
+                               for policy, node_policy in zip(policies, self.node_policies)]
+        self.perfect_recall = [getattr(policy, 'perfect_recall', False) for policy in policies]
+        self.batch_size = batch_size
+
+        # The probabilities of all the actions by information set, and the
+        # probabilities of the legal actions of all the hands by node
+        self.infoset_probs = [{} for _ in range(tree.player_num)]
+        self.node_probs = {}
+
+    def get_probs(self, node):
+        ''' Get the action probabilities of all the hands at a decision node
+
+        Args:
+            node (PublicNode): A decision node
+
+        Returns:
+            (numpy.array): The probabilities of the legal actions with shape [num_hands, num_actions]
+        '''
+        if node not in self.node_probs:
+            self.prefetch([node])
+        return self.node_probs[node]
+
+    def prefetch(self, nodes):
+        ''' Compute the action probabilities at some decision nodes in batches
+
+        Args:
+            nodes (iterable): The decision nodes
+        '''
+        batch = []
+        for node in nodes:
+            if node in self.node_probs:
+                continue
+            batch.append(node)
+            if len(batch) * self.tree.num_hands >= self.batch_size:
+                self._fetch(batch)
+                batch = []
+        if batch:
+            self._fetch(batch)
+
+    def _fetch(self, nodes):
+        ''' Query the policies for the new information sets of some nodes
+
+        Args:
+            nodes (list): The decision nodes
+        '''
+        state_nodes = [node for node in nodes if self.node_policies[node.player] is None]
+        node_states = [self.tree.get_states(node) for node in state_nodes]
+        node_keys = {node: [(state['obs'].tobytes(), tuple(state['legal_actions']),
+                             state['action_history'] if self.perfect_recall[node.player] else None)
+                            for state in states]
+                     for node, states in zip(state_nodes, node_states)}
+        for player in set(node.player for node in state_nodes):
+            cache = self.infoset_probs[player]
+            new_states = {}
+            for node, states in zip(state_nodes, node_states):
+                if node.player != player:
+                    continue
+                for state, key in zip(states, node_keys[node]):
+                    if key not in cache:
+                        new_states[key] = state
+            if new_states:
+                states = list(new_states.values())
+                batch = {'obs': np.array([state['obs'] for state in states]),
+                         'legal_actions': [state['legal_actions'] for state in states]}
+                if self.perfect_recall[player]:
+                    batch['action_history'] = [state['action_history'] for state in states]
+                probs = self.batch_policies[player](batch)
+                cache.update(zip(new_states, probs))
+
+        for node in nodes:
+            if node in node_keys:
+                cache = self.infoset_probs[node.player]
+                probs = np.array([cache[key] for key in node_keys[node]])[:, node.actions]
+            else:
+                probs = self.node_policies[node.player].get_node_probs(node)
+            sums = probs.sum(axis=1, keepdims=True)
+            # Fall back to uniform where a policy gives no mass to the legal actions
+            self.node_probs[node] = np.where(sums > 0, probs / np.where(sums > 0, sums, 1), 1.0 / len(node.actions))
+
+def get_policy_probs(tree, policy, node, cache=None):
+    ''' Get the action probabilities of all the hands at a decision node
+
+    Args:
+        tree (PublicTree): The public tree
+        policy (object): The policies of the players, see PolicyCache
+        node (PublicNode): A decision node
+        cache (PolicyCache): Optional, the probabilities already computed
+
+    Returns:
+        (numpy.array): The probabilities of the legal actions with shape [num_hands, num_actions]
+    '''
+    if cache is None:
+        cache = PolicyCache(tree, policy)
+    return cache.get_probs(node)
+
+def best_response_value(tree, policy, player, cache=None):
+    ''' Compute the expected payoff of the best response of a player against
+    the policy of the other player
+
+    Args:
+        tree (PublicTree): The public tree
+        policy (object): The policies of the players, see PolicyCache
+        player (int): The id of the best responding player
+        cache (PolicyCache): Optional, the probabilities already computed
+
+    Returns:
+        (float): The expected payoff of the best response
+    '''
+    if cache is None:
+        cache = PolicyCache(tree, policy)
+    cache.prefetch(node for node in tree.iter_nodes('decision') if node.player != player)
+    value = 0.0
+    for root in tree.roots:
+        values = _best_response_values(tree, player, root, np.ones(tree.num_hands), cache)
+        value += values.sum() * tree.deal_prob / len(tree.roots)
+    return value
+
+def exploitability(tree, policy):
+    ''' Compute the exploitability of the policies of the players, the mean
+    of the values of the best responses of the players. It is zero for a Nash
+    equilibrium of a two-player zero-sum game.
+
+    Args:
+        tree (PublicTree): The public tree
+        policy (object): The policy used by both players, or the list of the
+          policies of the players, see PolicyCache
+
+    Returns:
+        (float): The exploitability in chips per game
+    '''
+    cache = PolicyCache(tree, policy)
+    return np.mean([best_response_value(tree, policy, player, cache) for player in range(tree.player_num)])
+
+def expected_payoffs(tree, policy):
+    ''' Compute the exact expected payoffs of the players by enumerating the
+    deals, as the average payoffs of `Env.run` over infinitely many games
+
+    Args:
+        tree (PublicTree): The public tree
+        policy (object): The list of the policies of the players, or the
+          policy used by both players, see PolicyCache
+
+    Returns:
+        (numpy.array): The expected payoff of each player
+    '''
+    cache = PolicyCache(tree, policy)
+    cache.prefetch(tree.iter_nodes('decision'))
+    value = 0.0
+    for root in tree.roots:
+        reaches = np.ones((tree.player_num, tree.num_hands))
+        value += _expected_value(tree, root, reaches, cache) * tree.deal_prob / len(tree.roots)
+    return np.array([value, -value])
+
+def _best_response_values(tree, player, node, opponent_reach, cache):
+    ''' Compute the values of the best response for each hand of the player
+
+    Args:
+        tree (PublicTree): The public tree
+        player (int): The id of the best responding player
+        node (PublicNode): The current node
+        opponent_reach (numpy.array): The reach probabilities of the hands of the opponent
+        cache (PolicyCache): The action probabilities of the policy of the opponent
+
+    Returns:
+        (numpy.array): The values weighted by the opponent reach, with shape [num_hands]
+    '''
+    if node.kind == 'terminal':
+        payoffs = node.payoffs if player == 0 else -node.payoffs.T
+        return payoffs.dot(opponent_reach)
+
+    if node.kind == 'chance':
+        # The payoffs are weighted by the probability of the public cards
+        values = np.zeros(tree.num_hands)
+        for child in node.children:
+            values += _best_response_values(tree, player, child, opponent_reach, cache)
+        return values
+
+    if node.player == player:
+        return np.max([_best_response_values(tree, player, child, opponent_reach, cache)
+                       for child in node.children], axis=0)
+
+    probs = cache.get_probs(node)
+    values = np.zeros(tree.num_hands)
+    for i, child in enumerate(node.children):
+        values += _best_response_values(tree, player, child, opponent_reach * probs[:, i], cache)
+    return values
+
+def _expected_value(tree, node, reaches, cache):
+    ''' Compute the expected payoff of player 0 in a subtree
+
+    Args:
+        tree (PublicTree): The public tree
+        node (PublicNode): The current node
+        reaches (numpy.array): The reach probabilities of the hands of each player
+        cache (PolicyCache): The action probabilities of the policies
+
+    Returns:
+        (float): The payoff weighted by the reach probabilities of the hands
+    '''
+    if node.kind == 'terminal':
+        return reaches[0].dot(node.payoffs).dot(reaches[1])
+
+    if node.kind == 'chance':
+        # The payoffs are weighted by the probability of the public cards
+        return sum(_expected_value(tree, child, reaches, cache) for child in node.children)
+
+    probs = cache.get_probs(node)
+    value = 0.0
+    for i, child in enumerate(node.children):
+        child_reaches = reaches.copy()
+        child_reaches[node.player] *= probs[:, i]
+        value += _expected_value(tree, child, child_reaches, cache)
+    return value
+
+def _get_batch_policy(policy, action_num):
+    ''' Convert a policy to a function of a batch of states
+
+    Args:
+        policy (object): An agent or a function of an extracted state
+        action_num (int): The number of actions of the env
+
+    Returns:
+        (callable): A function that takes the batched states, with `obs` of shape
+          [batch, *state_shape], `legal_actions` and optionally `action_history`,
+          and returns the probabilities of all the actions with shape [batch, action_num]
+    '''
+    if hasattr(policy, 'batch_eval_probs'):
+        return policy.batch_eval_probs
+    if hasattr(policy, 'eval_step'):
+        function = lambda state: np.eye(action_num)[policy.eval_step(state)]
+    elif callable(policy):
+        function = policy
+    else:
+        raise ValueError('A policy should be a function of a state or an agent')
+    return lambda states: np.array([function(state) for state in _split_batch(states)])
+
+def _split_batch(states):
+    ''' Split batched states into extracted states
+
+    Args:
+        states (dict): The batched states, see `_get_batch_policy`
+
+    Returns:
+        (list): The extracted states
+    '''
+    return [dict(zip(states, values)) for values in zip(*states.values())]
@@ -0,0 +1,364 @@
+''' Build the public tree of small poker games by driving the game engine.
+In the public tree a node only holds what all the players see: the betting
+history and the public cards. The private hands are handled as vectors over
+all the possible hands of a player.
+'''
+
+import itertools
+
+import numpy as np
+
+from rlcard.core import Card
+from rlcard.games.leducholdem.game import LeducholdemGame
+from rlcard.games.limitholdem.game import LimitholdemGame
+from rlcard.games.limitholdem.utils import CARD_STRINGS, evaluate_hands, split_pot
+
+# The private hands of Leduc Hold'em, in the order of the card indices of the env
+LEDUC_HANDS = ['SJ', 'SQ', 'SK', 'HJ', 'HQ', 'HK']
+
+# The default cards of the small Limit Hold'em games. The hands are dealt
+# from the hand cards and the public cards from the board cards.
+LIMIT_HOLDEM_HAND_CARDS = ['SA', 'HA', 'SK', 'HK', 'SQ', 'HQ']
+LIMIT_HOLDEM_BOARD_CARDS = ['DA', 'DK', 'DQ', 'CA', 'CK', 'CJ']
+
+
+class PublicNode(object):
+    ''' A node of the public tree. A node is either a decision node of a
+    player, a chance node that deals a public card, or a terminal node.
+    '''
+
+    def __init__(self, kind):
+        ''' Initialize the node
+
+        Args:
+            kind (str): 'decision', 'chance' or 'terminal'
+        '''
+        self.kind = kind
+
+        # The public card dealt so far, as the index of the hand with the same card
+        self.public_card = None
+
+        # Decision nodes: the acting player, the game state of the player
+        # with the hand left to fill in, and the legal action ids of the env
+        self.player = None
+        self.state = None
+        self.actions = []
+
+        # Decision nodes: one child per action. Chance nodes: one child per card
+        self.children = []
+
+        # Chance nodes: the cards dealt for each child, the probability of
+        # each child given the hands, and the hands that hold a dealt card
+        self.cards = []
+        self.probs = []
+        self.blocked_hands = []
+
+        # Terminal nodes: the payoffs of player 0 with shape [num_hands, num_hands],
+        # indexed by the hands of player 0 and 1, and weighted by the probability
+        # of the public cards given the hands. The impossible deals are zeros.
+        self.payoffs = None
+
+
+class PublicTree(object):
+    ''' The public tree of a two-player game in which every player holds a
+    private hand. The first player is chosen at random, so there is one root
+    per first player.
+    '''
+
+    def __init__(self, env, roots, hands, conflicts=None):
+        ''' Initialize the tree
+
+        Args:
+            env (Env): The env that encodes the states for the policies
+            roots (list): The root of each first player
+            hands (list): Each private hand, in the format of the game states
+            conflicts (numpy.array): Optional, True for the pairs of hands that
+              share cards, with shape [num_hands, num_hands]. Only the same hands
+              conflict by default
+        '''
+        self.env = env
+        self.roots = roots
+        self.hands = hands
+        self.num_hands = len(hands)
+        self.player_num = 2
+        self.conflicts = np.eye(self.num_hands, dtype=bool) if conflicts is None else conflicts
+
+        # The probability of each pair of hands that can be dealt together
+        self.deal_prob = 1.0 / np.sum(~self.conflicts)
+
+    def iter_nodes(self, kind=None):
+        ''' Iterate over the nodes in depth-first order
+
+        Args:
+            kind (str): Only iterate over the nodes of this kind if given
+
+        Returns:
+            (iterator): The nodes of the tree
+        '''
+        stack = list(reversed(self.roots))
+        while stack:
+            node = stack.pop()
+            if kind is None or node.kind == kind:
+                yield node
+            stack.extend(reversed(node.children))
+
+    def get_states(self, node):
+        ''' Encode the states of all the hands of the acting player at a node
+
+        Args:
+            node (PublicNode): A decision node
+
+        Returns:
+            (list): The extracted state of each hand, in the format of `Env.extract_state`
+        '''
+        return [self.env.extract_state(dict(node.state, hand=hand)) for hand in self.hands]
+
+    def get_node_num(self, kind=None):
+        ''' Count the nodes of the tree
+
+        Args:
+            kind (str): Only count the nodes of this kind if given
+
+        Returns:
+            (int): The number of nodes
+        '''
+        return sum(1 for _ in self.iter_nodes(kind))
+
+
+def build_leduc_tree(env):
+    ''' Build the public tree of Leduc Hold'em
+
+    Args:
+        env (LeducholdemEnv): A Leduc Hold'em env, used to encode the actions and the states
+
+    Returns:
+        (PublicTree): The public tree
+    '''
+    game = LeducholdemGame()
+    roots = []
+    for start_player in range(game.get_player_num()):
+        game.init_game()
+        game.game_pointer = game.round.game_pointer = start_player
+        roots.append(_build_leduc_node(env, game, None))
+    return PublicTree(env, roots, LEDUC_HANDS)
+
+def _build_leduc_node(env, game, public_card):
+    ''' Build the subtree of a Leduc Hold'em game in progress
+
+    Args:
+        env (LeducholdemEnv): The env that encodes the actions
+        game (LeducholdemGame): The game at the node. The hands are ignored
+        public_card (int): The index of the public card, None if it is not dealt
+
+    Returns:
+        (PublicNode): The root of the subtree
+    '''
+    if game.is_over():
+        node = PublicNode('terminal')
+        node.public_card = public_card
+        node.payoffs = _get_leduc_payoffs(game, public_card)
+        return node
+
+    node = PublicNode('decision')
+    node.public_card = public_card
+    node.player = game.get_player_id()
+    node.state = game.get_state(node.player)
+    for action in node.state['legal_actions']:
+        node.actions.append(env.actions.index(action))
+        child_game = game.clone()
+        child_game.step(action)
+        if public_card is None and child_game.round_counter > game.round_counter and not child_game.is_over():
+            node.children.append(_build_leduc_chance_node(env, game, action))
+        else:
+            node.children.append(_build_leduc_node(env, child_game, public_card))
+    return node
+
+def _build_leduc_chance_node(env, game, action):
+    ''' Build the chance node after the action that ends the first round
+
+    Args:
+        env (LeducholdemEnv): The env that encodes the actions
+        game (LeducholdemGame): The game before the action
+        action (str): The action that ends the first round
+
+    Returns:
+        (PublicNode): The chance node
+    '''
+    node = PublicNode('chance')
+    for card, hand in enumerate(LEDUC_HANDS):
+        child_game = game.clone()
+        # The public card is dealt from the top of the deck
+        child_game.dealer.deck = [Card(hand[0], hand[1])]
+        child_game.step(action)
+        node.cards.append(card)
+        # The public card is one of the cards not held by the players
+        node.probs.append(1.0 / (len(LEDUC_HANDS) - 2))
+        node.blocked_hands.append([card])
+        node.children.append(_build_leduc_node(env, child_game, card))
+    return node
+
+def _get_leduc_payoffs(game, public_card):
+    ''' Compute the payoffs of player 0 of a finished game for all the deals
+
+    Args:
+        game (LeducholdemGame): The finished game
+        public_card (int): The index of the public card, None if it is not dealt
+
+    Returns:
+        (numpy.array): The payoffs with shape [num_hands, num_hands]
+    '''
+    cards = [Card(hand[0], hand[1]) for hand in LEDUC_HANDS]
+    game = game.clone()
+    game.public_card = None if public_card is None else cards[public_card]
+    payoffs = np.zeros((len(cards), len(cards)))
+    for i in range(len(cards)):
+        for j in range(len(cards)):
+            if i == j or public_card in (i, j):
+                continue
+            game.players[0].hand = cards[i]
+            game.players[1].hand = cards[j]
+            payoffs[i, j] = game.get_payoffs()[0]
+    if public_card is not None:
+        # The public card is one of the cards not held by the players
+        payoffs /= len(cards) - 2
+    return payoffs
+
+def build_limit_holdem_tree(env, hand_cards=None, board_cards=None, allowed_raise_num=1):
+    ''' Build the public tree of a small Limit Hold'em game. The hands are
+    dealt from a few hand cards and the public cards from a few other board
+    cards, and the number of raises in a round is limited. The game is an
+    abstraction of Limit Hold'em that is small enough to be solved exactly,
+    and its states are encoded as the states of the full game. With the
+    default cards and one raise per round, the tree has about 85,000 nodes.
+
+    Args:
+        env (LimitholdemEnv): A Limit Hold'em env, used to encode the actions and the states
+        hand_cards (list): The strings of the cards of the hands, LIMIT_HOLDEM_HAND_CARDS by default
+        board_cards (list): The strings of the public cards, LIMIT_HOLDEM_BOARD_CARDS by default
+        allowed_raise_num (int): The number of raises allowed in a round
+
+    Returns:
+        (PublicTree): The public tree
+    '''
+    hand_cards = [CARD_STRINGS.index(card) for card in (hand_cards or LIMIT_HOLDEM_HAND_CARDS)]
+    board_cards = [CARD_STRINGS.index(card) for card in (board_cards or LIMIT_HOLDEM_BOARD_CARDS)]
+    if set(hand_cards) & set(board_cards):
+        raise ValueError('The hand cards and the board cards should be different')
+    if len(board_cards) < 5:
+        raise ValueError('At least 5 board cards are needed')
+    hands = [list(hand) for hand in itertools.combinations(sorted(hand_cards), 2)]
+    conflicts = np.array([[bool(set(hand) & set(other)) for other in hands] for hand in hands])
+
+    game = LimitholdemGame()
+    game.allowed_raise_num = allowed_raise_num
+    # The strengths of the hands by board
+    strengths = {}
+    roots = []
+    for small_blind in range(game.get_player_num()):
+        game.init_game()
+        big_blind = (small_blind + 1) % game.num_players
+        game.players[small_blind].in_chips = game.small_blind
+        game.players[big_blind].in_chips = game.big_blind
+        game.game_pointer = (big_blind + 1) % game.num_players
+        game.round.start_new_round(game_pointer=game.game_pointer, raised=[p.in_chips for p in game.players])
+        roots.append(_build_limit_holdem_node(env, game, hands, conflicts, board_cards, 1.0, strengths))
+    return PublicTree(env, roots, hands, conflicts)
+
+def _build_limit_holdem_node(env, game, hands, conflicts, board_cards, chance_prob, strengths):
+    ''' Build the subtree of a small Limit Hold'em game in progress
+
+    Args:
+        env (LimitholdemEnv): The env that encodes the actions
+        game (LimitholdemGame): The game at the node. The hands are ignored
+        hands (list): The cards of each hand
+        conflicts (numpy.array): True for the pairs of hands that share cards
+        board_cards (list): The cards of the public cards
+        chance_prob (float): The probability of the public cards dealt so far
+        strengths (dict): The strengths of the hands by board, filled when needed
+
+    Returns:
+        (PublicNode): The root of the subtree
+    '''
+    if game.is_over():
+        node = PublicNode('terminal')
+        node.payoffs = chance_prob * _get_limit_holdem_payoffs(game, hands, conflicts, strengths)
+        return node
+
+    node = PublicNode('decision')
+    node.player = game.get_player_id()
+    node.state = game.get_state(node.player)
+    node.state['raise_nums'] = list(node.state['raise_nums'])
+    for action in node.state['legal_actions']:
+        node.actions.append(env.actions.index(action))
+        child_game = game.clone()
+        # The cards dealt at the end of a round are replaced in the chance node
+        child_game.dealer.deck = list(board_cards)
+        child_game.step(action)
+        if child_game.round_counter > game.round_counter and not child_game.is_over():
+            node.children.append(_build_limit_holdem_chance_node(env, game, action, hands, conflicts,
+                                                                 board_cards, chance_prob, strengths))
+        else:
+            node.children.append(_build_limit_holdem_node(env, child_game, hands, conflicts,
+                                                          board_cards, chance_prob, strengths))
+    return node
+
+def _build_limit_holdem_chance_node(env, game, action, hands, conflicts, board_cards, chance_prob, strengths):
+    ''' Build the chance node after the action that ends a round
+
+    Args:
+        env (LimitholdemEnv): The env that encodes the actions
+        game (LimitholdemGame): The game before the action
+        action (str): The action that ends the round
+        hands (list): The cards of each hand
+        conflicts (numpy.array): True for the pairs of hands that share cards
+        board_cards (list): The cards of the public cards
+        chance_prob (float): The probability of the public cards dealt so far
+        strengths (dict): The strengths of the hands by board, filled when needed
+
+    Returns:
+        (PublicNode): The chance node
+    '''
+    node = PublicNode('chance')
+    remaining = [card for card in board_cards if card not in game.public_cards]
+    # Three cards are dealt after the first round, then one card
+    deals = list(itertools.combinations(remaining, 3 if game.round_counter == 0 else 1))
+    for cards in deals:
+        child_game = game.clone()
+        child_game.dealer.deck = list(cards)
+        child_game.step(action)
+        node.cards.append(cards)
+        # The board cards are never in the hands
+        node.probs.append(1.0 / len(deals))
+        node.blocked_hands.append([])
+        node.children.append(_build_limit_holdem_node(env, child_game, hands, conflicts,
+                                                      board_cards, chance_prob / len(deals), strengths))
+    return node
+
+def _get_limit_holdem_payoffs(game, hands, conflicts, strengths):
+    ''' Compute the payoffs of player 0 of a finished game for all the deals
+
+    Args:
+        game (LimitholdemGame): The finished game
+        hands (list): The cards of each hand
+        conflicts (numpy.array): True for the pairs of hands that share cards
+        strengths (dict): The strengths of the hands by board, filled when needed
+
+    Returns:
+        (numpy.array): The payoffs with shape [num_hands, num_hands]
+    '''
+    in_chips = [p.in_chips for p in game.players]
+    folded = [p.status == 'folded' for p in game.players]
+    if any(folded):
+        payoff = split_pot(np.logical_not(folded), in_chips)[0] / game.big_blind
+        return np.where(conflicts, 0.0, payoff)
+
+    board = tuple(sorted(game.public_cards))
+    if board not in strengths:
+        strengths[board] = evaluate_hands([hand + list(board) for hand in hands])
+    hand_strengths = strengths[board]
+    # The payoffs when player 0 wins, ties and loses
+    win, tie, lose = [split_pot(winners, in_chips)[0] / game.big_blind
+                      for winners in ([True, False], [True, True], [False, True])]
+    payoffs = np.select([hand_strengths[:, None] > hand_strengths[None, :],
+                         hand_strengths[:, None] == hand_strengths[None, :]], [win, tie], lose)
+    return np.where(conflicts, 0.0, payoffs)
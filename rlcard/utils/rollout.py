@@ -0,0 +1,498 @@
+''' Run games in persistent worker processes and stream the results back
+'''
+
+import time
+import multiprocessing
+from queue import Empty
+
+import numpy as np
+
+import rlcard
+from rlcard.utils.utils import set_global_seed
+
+
+class ParallelRunner(object):
+    ''' A runner that keeps a pool of worker processes alive. Each worker has
+        its own environment and its own copy of the agents. The policy weights
+        are only sent to the workers when they change, and the results are
+        sent back in batches of episodes.
+    '''
+
+    def __init__(self, env_id, agent_fn, process_num, weights_fn=None, seed=None, batch_size=16,
+                 transport='queue', memory_size=10000, obs_dtype=np.float32):
+        ''' Initialize and start the worker processes
+
+        Args:
+            env_id (string): The name of the environment
+            agent_fn (callable): A picklable function that takes an Env object and
+              returns the list of agents of the worker. It is called once in each worker
+            process_num (int): The number of worker processes
+            weights_fn (callable): Optional, a picklable function that takes the list
+              of agents and the weights passed to `set_weights`, and loads the weights
+            seed (int): Optional, the seed to generate the seeds of the episodes.
+              Episode i is always run with the same seed, no matter how many workers are used
+            batch_size (int): The number of episodes in a batch sent back by a worker
+            transport (string): 'queue' to send the trajectories through a queue, or
+              'shared_memory' to copy the transitions of the trajectories into a shared
+              memory ring per worker, which is read with `iter_transitions`. The
+              transitions are copied once instead of being pickled through a queue
+            memory_size (int): The number of transitions in the ring of a worker.
+              Only used by the 'shared_memory' transport
+            obs_dtype (numpy.dtype): The dtype of the observations in the ring.
+              Only used by the 'shared_memory' transport
+        '''
+        if process_num < 1:
+            raise ValueError('process_num should be a positive integer')
+        if transport not in ('queue', 'shared_memory'):
+            raise ValueError('Unknown transport: {}'.format(transport))
+        self.process_num = process_num
+        self.batch_size = batch_size
+        self.weights_fn = weights_fn
+        self.transport = transport
+        self.rng = np.random.RandomState(seed)
+
+        # The results are tagged with the ID of their run, so that the results
+        # left by an interrupted run are discarded
+        self.run_id = 0
+        # The error of a worker that failed to start
+        self.error = None
+
+        self.buffers = [None for _ in range(process_num)]
+        if transport == 'shared_memory':
+            env = rlcard.make(env_id)
+            self.buffers = [SharedTransitionBuffer(memory_size, env.state_shape, env.action_num, obs_dtype)
+                            for _ in range(process_num)]
+
+        self.input_queues = [multiprocessing.Queue() for _ in range(process_num)]
+        self.output_queue = multiprocessing.Queue()
+        self.processes = []
+        for index in range(process_num):
+            worker_seed = None if seed is None else seed + index
+            process = multiprocessing.Process(target=_worker,
+                                              args=(index, worker_seed, env_id, agent_fn, weights_fn,
+                                                    self.input_queues[index], self.output_queue, batch_size,
+                                                    self.buffers[index]))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+
+    def set_weights(self, weights):
+        ''' Broadcast new policy weights to all the workers
+
+        Args:
+            weights (object): Picklable weights, passed to `weights_fn` in each worker
+
+        Note: Call this function only when the weights change. The workers keep
+              the last weights they received.
+        '''
+        if self.weights_fn is None:
+            raise ValueError('weights_fn should be provided to set the weights of the workers')
+        self._check_workers()
+        for queue in self.input_queues:
+            queue.put(('weights', weights))
+
+    def run(self, episode_num, is_training=False):
+        ''' Run a number of complete games in the workers
+
+        Args:
+            episode_num (int): The number of games to run
+            is_training (boolean): True if for training purpose.
+
+        Returns:
+            (tuple) Tuple containing:
+
+                (list): A list of trajectories, one per game, in the same format as `Env.run`
+                (list): A list of payoffs, one per game
+        '''
+        trajectories = [None for _ in range(episode_num)]
+        payoffs = [None for _ in range(episode_num)]
+        for index, episode_trajectories, episode_payoffs in self.iter_run(episode_num, is_training):
+            trajectories[index] = episode_trajectories
+            payoffs[index] = episode_payoffs
+        return trajectories, payoffs
+
+    def iter_run(self, episode_num, is_training=False):
+        ''' Run a number of complete games in the workers and yield the results
+            as soon as the batches arrive
+
+        Args:
+            episode_num (int): The number of games to run
+            is_training (boolean): True if for training purpose.
+
+        Yields:
+            (tuple) Tuple containing the index of the game, the trajectories and the payoffs
+        '''
+        if self.transport != 'queue':
+            raise ValueError('Trajectories are only sent back by the queue transport, use iter_transitions')
+        self._assign(episode_num, is_training)
+
+        received = 0
+        while received < episode_num:
+            results = self._get()
+            for result in results:
+                received += 1
+                yield result
+
+    def iter_transitions(self, episode_num, is_training=False):
+        ''' Run a number of complete games in the workers and yield the
+            transitions from the shared memory rings without copying them
+
+        Args:
+            episode_num (int): The number of games to run
+            is_training (boolean): True if for training purpose.
+
+        Yields:
+            (tuple) Tuple containing:
+
+                (dict): A batch of transitions with keys `obs`, `action`, `reward`,
+                        `next_obs`, `done`, `legal_mask` and `player_id`. The arrays are views
+                        of the ring and are only valid until the next batch is requested
+                (list): The payoffs of the games finished in this batch
+
+        Note: The transitions of all the players are mixed. Use `player_id` to split them.
+        '''
+        if self.transport != 'shared_memory':
+            raise ValueError('Transitions are only sent back by the shared_memory transport, use iter_run')
+        self._assign(episode_num, is_training)
+
+        received = 0
+        message = None
+        try:
+            while received < episode_num:
+                message = self._get()
+                worker_id, start, end, payoffs = message
+                buffer = self.buffers[worker_id]
+                chunks = buffer.chunks(start, end)
+                for i, chunk in enumerate(chunks):
+                    yield chunk, payoffs if i == len(chunks) - 1 else []
+                buffer.release(end)
+                message = None
+                received += len(payoffs)
+        finally:
+            # The slots of a batch are given back even if the iteration is abandoned
+            if message is not None:
+                self.buffers[message[0]].release(message[2])
+
+    def _assign(self, episode_num, is_training):
+        ''' Start a new run and split its games between the workers. Game i is
+            run with the i-th seed
+
+        Args:
+            episode_num (int): The number of games to run
+            is_training (boolean): True if for training purpose.
+        '''
+        self._check_workers()
+        self.run_id += 1
+        seeds = self.rng.randint(0, 2**31-1, size=episode_num)
+        indices = np.arange(episode_num)
+        for worker_id, worker_indices in enumerate(np.array_split(indices, self.process_num)):
+            tasks = [(int(index), int(seeds[index])) for index in worker_indices]
+            self.input_queues[worker_id].put(('run', self.run_id, tasks, is_training))
+
+    def _get(self):
+        ''' Get the next result of the current run. The results of the former
+            runs are discarded, and the errors of the workers are raised
+
+        Returns:
+            (object): The result sent by a worker
+        '''
+        while True:
+            run_id, result = self.output_queue.get()
+            if run_id is None:
+                # A worker failed to start, so no later run can finish
+                self.error = result
+                raise result
+            if run_id != self.run_id:
+                if self.transport == 'shared_memory' and not isinstance(result, Exception):
+                    # Give the slots of the discarded transitions back to the worker
+                    self.buffers[result[0]].release(result[2])
+                continue
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+    def _drain(self):
+        ''' Discard the results waiting in the output queue
+        '''
+        try:
+            while True:
+                self.output_queue.get_nowait()
+        except Empty:
+            pass
+
+    def _check_workers(self):
+        ''' Raise the error of a worker that failed to start
+        '''
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        ''' Stop the worker processes and free the shared memory
+        '''
+        # Wake up the workers waiting for free slots
+        for buffer in self.buffers:
+            if buffer is not None:
+                buffer.stop()
+        for queue in self.input_queues:
+            queue.put(None)
+        for process in self.processes:
+            # A worker can not exit before the results it sent are read
+            while process.is_alive():
+                self._drain()
+                process.join(0.01)
+        self._drain()
+        self.processes = []
+        for buffer in self.buffers:
+            if buffer is not None:
+                buffer.close()
+                buffer.unlink()
+        self.buffers = [None for _ in range(self.process_num)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _worker(index, seed, env_id, agent_fn, weights_fn, input_queue, output_queue, batch_size, buffer):
+    ''' The loop of a worker process
+
+    Args:
+        index (int): The index of the worker
+        seed (int): The seed used when creating the agents of the worker
+        env_id (string): The name of the environment
+        agent_fn (callable): The function to create the agents of the worker
+        weights_fn (callable): The function to load the weights into the agents
+        input_queue (multiprocessing.Queue): The queue of instructions
+        output_queue (multiprocessing.Queue): The queue of results
+        batch_size (int): The number of episodes in a batch of results
+        buffer (SharedTransitionBuffer): The ring to write the transitions, None for the queue transport
+    '''
+    try:
+        set_global_seed(seed)
+        env = rlcard.make(env_id)
+        agents = agent_fn(env)
+        env.set_agents(agents)
+    except Exception as e:
+        output_queue.put((None, e))
+        return
+
+    # The error of the last weights, raised by the next run
+    weights_error = None
+    while True:
+        instruction = input_queue.get()
+        if instruction is None:
+            break
+        if instruction[0] == 'weights':
+            try:
+                weights_fn(agents, instruction[1])
+            except Exception as e:
+                weights_error = e
+            continue
+
+        _, run_id, tasks, is_training = instruction
+        if weights_error is not None:
+            output_queue.put((run_id, weights_error))
+            weights_error = None
+            continue
+        try:
+            if buffer is not None:
+                for _, seed in tasks:
+                    trajectories, payoffs = env.run(is_training=is_training, seed=seed)
+                    start = buffer.write_pos
+                    for player_id, trajectory in enumerate(trajectories):
+                        for transition in trajectory:
+                            if buffer.is_full():
+                                # Hand over what is written so far and wait for the learner
+                                if start < buffer.write_pos:
+                                    output_queue.put((run_id, (index, start, buffer.write_pos, [])))
+                                    start = buffer.write_pos
+                                if not buffer.wait():
+                                    break
+                            buffer.write(player_id, transition)
+                        if buffer.stopped:
+                            break
+                    if buffer.stopped:
+                        break
+                    output_queue.put((run_id, (index, start, buffer.write_pos, [payoffs])))
+            else:
+                batch = []
+                for episode_index, seed in tasks:
+                    trajectories, payoffs = env.run(is_training=is_training, seed=seed)
+                    batch.append((episode_index, trajectories, payoffs))
+                    if len(batch) == batch_size:
+                        output_queue.put((run_id, batch))
+                        batch = []
+                if batch:
+                    output_queue.put((run_id, batch))
+        except Exception as e:
+            output_queue.put((run_id, e))
+    if buffer is not None:
+        buffer.close()
+
+
+class SharedTransitionBuffer(object):
+    ''' A ring of transitions in shared memory with one writer and one reader.
+        The writer is a worker process and the reader is the learner. It is a
+        single-copy transport: the worker copies each transition of the
+        trajectories of `Env.run` into the ring, and the learner reads views
+        of the ring.
+    '''
+
+    def __init__(self, capacity, state_shape, action_num, obs_dtype=np.float32, names=None):
+        ''' Allocate the ring, or attach to an existing one if the names are given
+
+        Args:
+            capacity (int): The number of transitions in the ring
+            state_shape (list): The shape of the observations
+            action_num (int): The size of the action space
+            obs_dtype (numpy.dtype): The dtype of the observations
+            names (dict): Optional, the names of the shared memory blocks to attach
+        '''
+        from multiprocessing import shared_memory
+
+        if capacity < 1:
+            raise ValueError('capacity should be a positive integer')
+        self.capacity = capacity
+        self.state_shape = list(state_shape)
+        self.action_num = action_num
+        self.obs_dtype = np.dtype(obs_dtype)
+
+        specs = {'obs': ([capacity] + self.state_shape, self.obs_dtype),
+                 'action': ([capacity], np.int32),
+                 'reward': ([capacity], np.float32),
+                 'next_obs': ([capacity] + self.state_shape, self.obs_dtype),
+                 'done': ([capacity], np.bool_),
+                 'legal_mask': ([capacity, action_num], np.bool_),
+                 'player_id': ([capacity], np.int32),
+                 # The number of transitions written and released so far,
+                 # and 1 when the writer should stop
+                 'cursor': ([3], np.int64)}
+        self.blocks = {}
+        self.arrays = {}
+        for field, (shape, dtype) in specs.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            if names is None:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=names[field])
+            self.blocks[field] = block
+            self.arrays[field] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        if names is None:
+            self.arrays['cursor'][:] = 0
+
+    def __getstate__(self):
+        return {'capacity': self.capacity,
+                'state_shape': self.state_shape,
+                'action_num': self.action_num,
+                'obs_dtype': self.obs_dtype.str,
+                'names': {field: block.name for field, block in self.blocks.items()}}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def write_pos(self):
+        return int(self.arrays['cursor'][0])
+
+    @property
+    def read_pos(self):
+        return int(self.arrays['cursor'][1])
+
+    @property
+    def stopped(self):
+        return bool(self.arrays['cursor'][2])
+
+    def stop(self):
+        ''' Tell the writer to stop waiting for free slots
+        '''
+        self.arrays['cursor'][2] = 1
+
+    def is_full(self):
+        ''' Check whether the writer has to wait for the reader
+
+        Returns:
+            (boolean): True if all the slots hold unreleased transitions
+        '''
+        return self.write_pos - self.read_pos >= self.capacity
+
+    def wait(self, interval=0.0005):
+        ''' Block the writer until a slot is released or the ring is stopped
+
+        Args:
+            interval (float): The polling interval in seconds
+
+        Returns:
+            (boolean): False if the ring is stopped
+        '''
+        while self.is_full() and not self.stopped:
+            time.sleep(interval)
+        return not self.stopped
+
+    def write(self, player_id, transition):
+        ''' Write a transition to the next slot
+
+        Args:
+            player_id (int): The player of the transition
+            transition (list): A list of state, action, reward, next_state and done
+        '''
+        state, action, reward, next_state, done = transition
+        slot = self.write_pos % self.capacity
+        self.arrays['obs'][slot] = state['obs']
+        self.arrays['action'][slot] = action
+        self.arrays['reward'][slot] = reward
+        self.arrays['next_obs'][slot] = next_state['obs']
+        self.arrays['done'][slot] = done
+        self.arrays['legal_mask'][slot] = False
+        self.arrays['legal_mask'][slot, state['legal_actions']] = True
+        self.arrays['player_id'][slot] = player_id
+        self.arrays['cursor'][0] += 1
+
+    def chunks(self, start, end):
+        ''' Get the transitions in [start, end) as views of the ring
+
+        Args:
+            start (int): The position of the first transition
+            end (int): The position after the last transition
+
+        Returns:
+            (list): One batch, or two if the range wraps around the ring
+        '''
+        if start == end:
+            slot = start % self.capacity
+            return [{field: array[slot:slot] for field, array in self.arrays.items() if field != 'cursor'}]
+        chunks = []
+        while start < end:
+            slot = start % self.capacity
+            stop = min(slot + end - start, self.capacity)
+            chunks.append({field: array[slot:stop] for field, array in self.arrays.items() if field != 'cursor'})
+            start += stop - slot
+        return chunks
+
+    def release(self, end):
+        ''' Give the slots before a position back to the writer
+
+        Args:
+            end (int): The position after the last consumed transition
+        '''
+        self.arrays['cursor'][1] = end
+
+    def close(self):
+        ''' Detach from the shared memory
+        '''
+        self.arrays = {}
+        for block in self.blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                # Some views of the ring are still alive. The memory is
+                # unmapped when they are garbage collected
+                pass
+
+    def unlink(self):
+        ''' Free the shared memory. Only called by the creator
+        '''
+        for block in self.blocks.values():
+            block.unlink()
+        self.blocks = {}
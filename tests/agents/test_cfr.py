@@ -1,8 +1,11 @@
 import unittest
+import os
+import pickle
+import tempfile
 import numpy as np
 
 import rlcard
-from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.cfr_agent import CFRAgent, InfosetTable, CompactInfosetTable
 
 class TestNFSP(unittest.TestCase):
 
@@ -19,19 +22,138 @@ class TestNFSP(unittest.TestCase):
 
         self.assertIn(action, [0, 2])
 
+    def test_perfect_recall(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        agent = CFRAgent(env, perfect_recall=True)
+        obs = np.zeros(env.state_shape)
+        # The same cards with different betting histories are different information sets
+        state = {'obs': obs, 'legal_actions': [0, 1, 2], 'action_history': ((False, 3, ()),)}
+        other = {'obs': obs, 'legal_actions': [0, 1, 2], 'action_history': ((False, 1, ()), (True, 1, ()), (False, 1, ()))}
+        self.assertNotEqual(agent.get_key(state), agent.get_key(other))
+        self.assertEqual(CFRAgent(env).get_key(state), CFRAgent(env).get_key(other))
+
+        for _ in range(10):
+            agent.train()
+        # There are more information sets than observations
+        self.assertGreater(len(agent.table), len(set(key[:obs.nbytes] for key in agent.table.index)))
+        state, player_id = env.init_game()
+        self.assertIn(agent.get_key(state), agent.table.index)
+        self.assertIn(agent.eval_step(state), state['legal_actions'])
+
     def test_save_and_load(self):
         env = rlcard.make('leduc-holdem', allow_step_back=True)
-        agent = CFRAgent(env)
+        agent = CFRAgent(env, model_path=tempfile.mkdtemp())
 
         for _ in range(100):
             agent.train()
 
         agent.save()
 
-        new_agent = CFRAgent(env)
+        new_agent = CFRAgent(env, model_path=agent.model_path)
         new_agent.load()
         self.assertEqual(len(agent.policy), len(new_agent.policy))
         self.assertEqual(len(agent.average_policy), len(new_agent.average_policy))
         self.assertEqual(len(agent.regrets), len(new_agent.regrets))
         self.assertEqual(agent.iteration, new_agent.iteration)
 
+    def test_compact_checkpoint(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        agent = CFRAgent(env, model_path=tempfile.mkdtemp())
+        for _ in range(10):
+            agent.train()
+        agent.save(compact=True)
+
+        new_agent = CFRAgent(env, model_path=agent.model_path)
+        new_agent.load(compact=True)
+        table = new_agent.table
+        self.assertIsInstance(table, CompactInfosetTable)
+        self.assertIsInstance(table.average_policy, np.memmap)
+        self.assertEqual(table.policy.dtype, np.float32)
+        self.assertEqual(len(table), len(agent.table))
+        self.assertEqual(new_agent.iteration, agent.iteration)
+        for key, infoset_id in agent.table.index.items():
+            new_id = table.index.get(key)
+            self.assertTrue(np.allclose(table.average_policy[new_id], agent.average_policy[infoset_id]))
+            self.assertTrue(np.allclose(table.regrets[new_id], agent.regrets[infoset_id]))
+            self.assertEqual(table.owners[new_id], agent.table.owners[infoset_id])
+
+        state = {'obs': np.array([1., 1., 0., 0., 0., 0.]), 'legal_actions': [0, 2]}
+        self.assertIn(new_agent.eval_step(state), [0, 2])
+        self.assertTrue(np.allclose(new_agent.get_average_probs(state), agent.get_average_probs(state)))
+        unknown = np.ones(6).tobytes()
+        self.assertNotIn(unknown, table.index)
+        with self.assertRaises(ValueError):
+            table.get_id(unknown)
+
+        # A compact checkpoint can not be trained, even when loaded by default
+        default_agent = CFRAgent(env, model_path=agent.model_path)
+        default_agent.load()
+        self.assertIsInstance(default_agent.table, CompactInfosetTable)
+        with self.assertRaises(ValueError):
+            default_agent.train()
+        self.assertEqual(default_agent.iteration, agent.iteration)
+
+    def test_infoset_table(self):
+        table = InfosetTable(3, capacity=1)
+        self.assertEqual(table.get_id(b'a'), 0)
+        self.assertEqual(table.get_id(b'b'), 1)
+        self.assertEqual(table.get_id(b'c'), 2)
+        self.assertEqual(table.get_id(b'a'), 0)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.regrets.shape, (3, 3))
+
+        table.regrets[0] = [1, -1, 3]
+        table.regrets[1] = [-1, -2, 0]
+        table.regrets[2] = [2, 2, 0]
+        table.regret_matching()
+        self.assertTrue(np.allclose(table.policy, [[0.25, 0, 0.75], [1/3, 1/3, 1/3], [0.5, 0.5, 0]]))
+
+        # New information sets start with a uniform policy
+        table.get_id(b'd')
+        self.assertTrue(np.allclose(table.policy[3], 1/3))
+
+    def test_load_dict_model(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        model_path = tempfile.mkdtemp()
+        obs = np.array([1., 1., 0., 0., 0., 0.]).tobytes()
+        arrays = {'policy': np.array([0.5, 0., 0.5, 0.]),
+                  'average_policy': np.array([1., 0., 3., 0.]),
+                  'regrets': np.array([1., -1., 1., 0.]),
+                  'iteration': 7}
+        for name, value in arrays.items():
+            with open(os.path.join(model_path, name + '.pkl'), 'wb') as f:
+                pickle.dump(value if name == 'iteration' else {obs: value}, f)
+
+        agent = CFRAgent(env, model_path=model_path)
+        agent.load()
+        self.assertEqual(agent.iteration, 7)
+        infoset_id = agent.table.index[obs]
+        self.assertEqual(agent.average_policy[infoset_id].tolist(), [1., 0., 3., 0.])
+        self.assertEqual(agent.regrets[infoset_id].tolist(), [1., -1., 1., 0.])
+
+    def test_discount(self):
+        table = InfosetTable(2)
+        table.get_id(b'a')
+        table.get_id(b'b')
+        table.regrets[:] = [[2., -4.], [1., -1.]]
+        table.average_policy[:] = [[1., 3.], [2., 2.]]
+        table.discount(0.5, 0.25, 0.1, rows=np.array([True, False]))
+        self.assertEqual(table.regrets.tolist(), [[1., -1.], [1., -1.]])
+        self.assertTrue(np.allclose(table.average_policy, [[0.1, 0.3], [2., 2.]]))
+
+    def test_variants(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        for variant in ['vanilla', 'cfr+', 'linear', 'dcfr']:
+            for alternating in [False, True]:
+                agent = CFRAgent(env, variant=variant, alternating=alternating)
+                for _ in range(10):
+                    agent.train()
+                if variant == 'cfr+':
+                    self.assertTrue((agent.regrets >= 0).all())
+                self.assertTrue(set(agent.table.owners.tolist()) <= {-1, 0, 1})
+                probs = agent.get_average_probs({'obs': np.array([1., 1., 0., 0., 0., 0.]), 'legal_actions': [0, 2]})
+                self.assertAlmostEqual(probs.sum(), 1)
+                self.assertEqual(probs[1], 0)
+
+        with self.assertRaises(ValueError):
+            CFRAgent(env, variant='unknown')
@@ -67,6 +67,39 @@ class TestUtilsMethos(unittest.TestCase):
         sess.close()
         tf.reset_default_graph()
 
+    def test_train_batched(self):
+
+        sess = tf.InteractiveSession()
+        env = rlcard.make('leduc-holdem')
+        agent = DeepCFR(session=sess,
+                        env=env,
+                        policy_network_layers=(16,16),
+                        advantage_network_layers=(16,16),
+                        num_traversals=8,
+                        num_step=1,
+                        learning_rate=1e-4,
+                        batch_size_advantage=16,
+                        batch_size_strategy=16,
+                        memory_capacity=int(1e5),
+                        traversal_batch_size=3)
+
+        for _ in range(2):
+            agent.train()
+
+        # Every traversal explores all the actions of the traversing player
+        for p in range(env.player_num):
+            self.assertGreater(len(agent._advantage_memories[p]), 0)
+            for memory in agent._advantage_memories[p]:
+                self.assertEqual(memory.info_state.shape, (6,))
+        for memory in agent._strategy_memories:
+            self.assertAlmostEqual(memory.strategy_action_probs.sum(), 1.)
+
+        state = {'obs': np.random.random_sample(env.state_shape), 'legal_actions': [0, 2]}
+        self.assertIn(agent.eval_step(state), [0, 2])
+
+        sess.close()
+        tf.reset_default_graph()
+
     def test_fixed_size_ring_buffer(self):
         buf = FixedSizeRingBuffer(10)
 
@@ -1,8 +1,10 @@
+import os
+import tempfile
 import unittest
 import tensorflow as tf
 import numpy as np
 
-from rlcard.agents.dqn_agent import DQNAgent
+from rlcard.agents.dqn_agent import DQNAgent, Memory, PrioritizedMemory, SumTree, Normalizer
 
 class TestDQN(unittest.TestCase):
 
@@ -71,3 +73,86 @@ class TestDQN(unittest.TestCase):
 
         sess.close()
         tf.reset_default_graph()
+
+    def test_memory(self):
+        memory = Memory(memory_size=3, batch_size=2)
+        for i in range(5):
+            memory.save(np.full(2, i), i, float(i), np.full(2, i+1), i == 4)
+        self.assertEqual(len(memory), 3)
+        self.assertEqual(memory.states.shape, (3, 2))
+        self.assertEqual(sorted(memory.actions), [2, 3, 4])
+
+        state_batch, action_batch, reward_batch, next_state_batch, done_batch = memory.sample()
+        self.assertEqual(state_batch.shape, (2, 2))
+        self.assertEqual(action_batch.dtype, np.int32)
+        self.assertEqual(reward_batch.dtype, np.float32)
+        self.assertEqual(done_batch.dtype, bool)
+        for state, action, next_state, done in zip(state_batch, action_batch, next_state_batch, done_batch):
+            self.assertTrue(np.array_equal(state, np.full(2, action)))
+            self.assertTrue(np.array_equal(next_state, np.full(2, action+1)))
+            self.assertEqual(done, action == 4)
+
+        memory = Memory(memory_size=0, batch_size=0, state_shape=[1])
+        memory.save(np.zeros(1), 0, 0., np.zeros(1), True)
+        self.assertEqual(len(memory), 0)
+
+    def test_sum_tree(self):
+        tree = SumTree(5)
+        tree.update(np.arange(5), np.array([1., 2., 3., 4., 0.]))
+        self.assertEqual(tree.total(), 10.)
+        self.assertEqual(list(tree.find(np.array([0.5, 1.5, 3.5, 9.5]))), [0, 1, 2, 3])
+        tree.update(np.array([0, 3]), np.array([5., 0.]))
+        self.assertEqual(tree.total(), 10.)
+        self.assertEqual(list(tree.get(np.array([0, 3]))), [5., 0.])
+        self.assertEqual(list(tree.find(np.array([4.5, 9.5]))), [0, 2])
+
+    def test_prioritized_memory(self):
+        memory = PrioritizedMemory(memory_size=4, batch_size=2)
+        for i in range(4):
+            memory.save(np.full(2, i), i, float(i), np.full(2, i+1), False)
+        state_batch, action_batch, _, _, _, indices, weights = memory.sample()
+        self.assertEqual(state_batch.shape, (2, 2))
+        self.assertEqual(list(action_batch), list(indices))
+        self.assertTrue(np.allclose(weights, 1.))
+
+        memory.update_priorities(np.arange(4), np.array([0., 0., 0., 100.]))
+        for _ in range(10):
+            _, action_batch, _, _, _, _, weights = memory.sample()
+            self.assertEqual(list(action_batch), [3, 3])
+
+    def test_normalizer(self):
+        states = np.random.random_sample((50, 3))
+        normalizer = Normalizer()
+        self.assertTrue(np.array_equal(normalizer.normalize(states[0]), states[0]))
+        for state in states[:20]:
+            normalizer.append(state)
+        normalizer.append_many(states[20:])
+        self.assertEqual(normalizer.length, 50)
+        self.assertTrue(np.allclose(normalizer.mean, np.mean(states, axis=0)))
+        self.assertTrue(np.allclose(normalizer.std, np.std(states, axis=0)))
+
+        ew_normalizer = Normalizer(decay=0.9)
+        for state in states:
+            ew_normalizer.append(state)
+        self.assertEqual(ew_normalizer.mean.shape, (3,))
+
+        path = os.path.join(tempfile.mkdtemp(), 'normalizer.npz')
+        ew_normalizer.save(path)
+        loaded = Normalizer()
+        loaded.load(path)
+        self.assertEqual(loaded.decay, 0.9)
+        self.assertEqual(loaded.length, 50)
+        self.assertTrue(np.allclose(loaded.normalize(states[0]), ew_normalizer.normalize(states[0])))
+
+        Normalizer().save(path)
+        loaded.load(path)
+        self.assertIsNone(loaded.decay)
+        self.assertEqual(loaded.length, 0)
+
+    def test_normalizer_constant_feature(self):
+        states = np.random.random_sample((10, 2))
+        states[:, 1] = 3
+        normalizer = Normalizer()
+        normalizer.append_many(states)
+        self.assertEqual(normalizer.std[1], 1)
+        self.assertEqual(normalizer.normalize(states[0])[1], 0)
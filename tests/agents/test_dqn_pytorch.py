@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import torch
 import numpy as np
@@ -60,3 +62,64 @@ class TestDQN(unittest.TestCase):
         predicted_action = agent.step({'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]})
         self.assertGreaterEqual(predicted_action, 0)
         self.assertLessEqual(predicted_action, 1)
+
+    def test_batch_eval_probs(self):
+        agent = DQNAgent(scope='dqn',
+                         state_shape=[2],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'))
+        states = {'obs': np.random.random_sample((5, 2)), 'legal_actions': [[0, 1], [0], [1], [0, 1], [1]]}
+        probs = agent.batch_eval_probs(states)
+        self.assertEqual(probs.shape, (5, 2))
+        self.assertTrue(np.array_equal(np.argmax(probs, axis=1), agent.batch_eval_step(states)))
+        self.assertTrue(np.allclose(probs.sum(axis=1), 1))
+
+    def test_prioritized_train(self):
+
+        agent = DQNAgent(scope='dqn',
+                         replay_memory_size=100,
+                         replay_memory_init_size=10,
+                         norm_step=10,
+                         state_shape=[2],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'),
+                         prioritized_replay=True)
+
+        for step in range(50):
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]}, \
+                np.random.randint(2), np.random.randint(2), {'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]}, True]
+            agent.feed(ts)
+            if step > 20:
+                agent.train()
+        self.assertGreater(agent.memory.max_priority, 0)
+        self.assertAlmostEqual(agent.memory.tree.total(), np.sum(agent.memory.tree.get(np.arange(len(agent.memory)))))
+
+    def test_save_and_load(self):
+        agent = DQNAgent(scope='dqn',
+                         replay_memory_size=100,
+                         replay_memory_init_size=10,
+                         batch_size=4,
+                         norm_step=10,
+                         state_shape=[2],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'))
+        for step in range(30):
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]}, \
+                np.random.randint(2), np.random.randint(2), {'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]}, True]
+            agent.feed(ts)
+            if step > 20:
+                agent.train()
+
+        path = os.path.join(tempfile.mkdtemp(), 'dqn.pth')
+        agent.save(path)
+        loaded = DQNAgent(scope='dqn',
+                          state_shape=[2],
+                          mlp_layers=[10,10],
+                          device=torch.device('cpu'))
+        loaded.load(path)
+        self.assertEqual(loaded.total_t, agent.total_t)
+        self.assertEqual(loaded.train_t, agent.train_t)
+        self.assertEqual(loaded.normalizer.length, 10)
+        self.assertTrue(np.allclose(loaded.normalizer.mean, agent.normalizer.mean))
+        states = {'obs': np.random.random_sample((5, 2)), 'legal_actions': [[0, 1]] * 5}
+        self.assertTrue(np.allclose(loaded.batch_eval_probs(states), agent.batch_eval_probs(states)))
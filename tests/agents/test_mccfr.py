@@ -0,0 +1,81 @@
+import unittest
+import tempfile
+import numpy as np
+
+import rlcard
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.mccfr_agent import MCCFRAgent
+from rlcard.utils.utils import set_global_seed
+from rlcard.utils.public_tree import build_leduc_tree
+from rlcard.utils.exploitability import exploitability
+
+class TestMCCFR(unittest.TestCase):
+
+    def test_train(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        for sampling in ['external', 'outcome']:
+            for baseline in [False, True]:
+                agent = MCCFRAgent(env, sampling=sampling, baseline=baseline)
+                for _ in range(100):
+                    agent.train()
+                self.assertGreater(len(agent.table), 0)
+                self.assertTrue(np.isfinite(agent.regrets).all())
+
+                state = {'obs': np.array([1., 1., 0., 0., 0., 0.]), 'legal_actions': [0, 2]}
+                action = agent.eval_step(state)
+                self.assertIn(action, [0, 2])
+
+        with self.assertRaises(ValueError):
+            MCCFRAgent(env, sampling='unknown')
+
+    def test_convergence(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        tree = build_leduc_tree(env)
+        # Outcome sampling updates one trajectory per traversal, so it needs more iterations
+        for sampling, iterations in [('external', 500), ('outcome', 2000)]:
+            for baseline in [False, True]:
+                set_global_seed(0)
+                agent = MCCFRAgent(env, sampling=sampling, baseline=baseline, perfect_recall=True)
+                values = []
+                for _ in range(3):
+                    for _ in range(iterations):
+                        agent.train()
+                    values.append(exploitability(tree, agent))
+                self.assertGreater(values[0], values[1])
+                self.assertGreater(values[1], values[2])
+
+    def test_large_games(self):
+        for name in ['limit-holdem', 'uno', 'doudizhu']:
+            env = rlcard.make(name, allow_step_back=True)
+            agent = MCCFRAgent(env, sampling='outcome', baseline=True)
+            for _ in range(2):
+                agent.train()
+            self.assertGreater(len(agent.table), 0)
+            # The game is back at the root after the traversal
+            self.assertFalse(env.game.step_back())
+
+    def test_regret_matching(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        agent = MCCFRAgent(env)
+        infoset_id = agent.table.get_id(b'a')
+        agent.table.regrets[infoset_id] = [3., -1., 1., 5.]
+        probs = agent.regret_matching(infoset_id, [0, 1, 2])
+        self.assertTrue(np.allclose(probs, [0.75, 0., 0.25, 0.]))
+        agent.table.regrets[infoset_id] = -1
+        probs = agent.regret_matching(infoset_id, [1, 3])
+        self.assertTrue(np.allclose(probs, [0., 0.5, 0., 0.5]))
+
+    def test_interchangeable_with_cfr(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        agent = MCCFRAgent(env, model_path=tempfile.mkdtemp())
+        for _ in range(20):
+            agent.train()
+        agent.save()
+
+        cfr_agent = CFRAgent(env, model_path=agent.model_path)
+        cfr_agent.load()
+        self.assertEqual(cfr_agent.iteration, agent.iteration)
+        self.assertTrue(np.array_equal(cfr_agent.average_policy, agent.average_policy))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -100,6 +100,9 @@ class TestNFSP(unittest.TestCase):
         predicted_action = agent.eval_step({'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]})
         self.assertGreaterEqual(predicted_action, 0)
         self.assertLessEqual(predicted_action, 1)
+        probs = agent.batch_eval_probs({'obs': np.random.random_sample((3, 2)), 'legal_actions': [[0, 1], [0], [1]]})
+        self.assertTrue(np.allclose(probs.sum(axis=1), 1))
+        self.assertTrue(np.allclose(probs[1:], [[1, 0], [0, 1]]))
 
         sess.close()
         tf.reset_default_graph()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import torch
 import numpy as np
@@ -54,3 +56,32 @@ class TestNFSP(unittest.TestCase):
                 agent.train_rl()
 
             agent.train_sl()
+
+    def test_save_and_load(self):
+        agent = NFSPAgent(scope='nfsp',
+                          action_num=2,
+                          state_shape=[2],
+                          hidden_layers_sizes=[10,10],
+                          q_norm_step=10,
+                          q_mlp_layers=[10,10],
+                          device=torch.device('cpu'))
+        for _ in range(20):
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]}, \
+                np.random.randint(2), 0, {'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]}, True]
+            agent.feed(ts)
+
+        path = os.path.join(tempfile.mkdtemp(), 'nfsp.pth')
+        agent.save(path)
+        loaded = NFSPAgent(scope='nfsp',
+                           action_num=2,
+                           state_shape=[2],
+                           hidden_layers_sizes=[10,10],
+                           q_mlp_layers=[10,10],
+                           device=torch.device('cpu'))
+        loaded.load(path)
+        self.assertEqual(loaded._rl_agent.normalizer.length, 10)
+        self.assertTrue(np.allclose(loaded._rl_agent.normalizer.std, agent._rl_agent.normalizer.std))
+        states = {'obs': np.random.random_sample((5, 2)), 'legal_actions': [[0, 1]] * 5}
+        for original, restored in zip(agent.policy_network.parameters(), loaded.policy_network.parameters()):
+            self.assertTrue(torch.equal(original, restored))
+        self.assertTrue(np.allclose(loaded._rl_agent.batch_eval_probs(states), agent._rl_agent.batch_eval_probs(states)))
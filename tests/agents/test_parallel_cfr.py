@@ -0,0 +1,86 @@
+import unittest
+import random
+import numpy as np
+
+import rlcard
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.mccfr_agent import MCCFRAgent
+from rlcard.agents.parallel_cfr import ParallelCFRTrainer
+
+def get_table(agent):
+    return {key: (agent.regrets[i].copy(), agent.average_policy[i].copy(), agent.policy[i].copy())
+            for key, i in agent.table.index.items()}
+
+class TestParallelCFR(unittest.TestCase):
+
+    def assertTablesClose(self, table_1, table_2, action_num=4):
+        # An information set that is only visited by the other player keeps the initial values
+        default = (np.zeros(action_num), np.zeros(action_num), np.full(action_num, 1.0 / action_num))
+        for key in set(table_1) | set(table_2):
+            for array_1, array_2 in zip(table_1.get(key, default), table_2.get(key, default)):
+                self.assertTrue(np.allclose(array_1, array_2))
+
+    def test_same_as_serial(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        # The workers key the information sets like the agent
+        for perfect_recall in [False, True]:
+            agent = CFRAgent(env, perfect_recall=perfect_recall)
+            with ParallelCFRTrainer(agent, 'leduc-holdem', 2, deals_per_iteration=1, seed=0) as trainer:
+                for _ in range(5):
+                    trainer.train()
+
+            # Replay the same deals in a single process
+            serial_agent = CFRAgent(env, perfect_recall=perfect_recall)
+            rng = np.random.RandomState(0)
+            for _ in range(5):
+                serial_agent.iteration += 1
+                for player_id in range(env.player_num):
+                    seed = int(rng.randint(0, 2**31-1, size=1)[0])
+                    np.random.seed(seed)
+                    random.seed(seed)
+                    state, _ = env.init_game()
+                    serial_agent.traverse_tree(np.ones(env.player_num), player_id, state)
+                serial_agent.update_policy()
+            self.assertEqual(agent.iteration, 5)
+            self.assertTablesClose(get_table(agent), get_table(serial_agent))
+
+    def test_process_num(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        tables = []
+        for process_num in [1, 3]:
+            agent = CFRAgent(env, variant='dcfr', alternating=True)
+            with ParallelCFRTrainer(agent, 'leduc-holdem', process_num, deals_per_iteration=3, seed=1) as trainer:
+                for _ in range(3):
+                    trainer.train()
+            tables.append(get_table(agent))
+        self.assertTablesClose(tables[0], tables[1])
+
+    def test_invalid_arguments(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        with self.assertRaises(ValueError):
+            ParallelCFRTrainer(CFRAgent(env), 'leduc-holdem', 0)
+        with self.assertRaises(ValueError):
+            ParallelCFRTrainer(MCCFRAgent(env), 'leduc-holdem', 1)
+
+    def test_task_error(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        agent = CFRAgent(env)
+        with ParallelCFRTrainer(agent, 'leduc-holdem', 2, seed=0) as trainer:
+            # A row of the wrong size fails in every worker
+            trainer.policy_update = ([b'x'], np.zeros((1, 10)))
+            with self.assertRaises(ValueError):
+                trainer.train()
+            # The errors of the other workers are not read by the next run
+            trainer.policy_update = ([], np.zeros((0, env.action_num)))
+            trainer.train()
+        self.assertGreater(len(agent.table), 0)
+
+    def test_worker_init_failure(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        with ParallelCFRTrainer(CFRAgent(env), 'no-such-env', 2) as trainer:
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    trainer.train()
+
+if __name__ == '__main__':
+    unittest.main()
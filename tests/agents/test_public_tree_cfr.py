@@ -0,0 +1,95 @@
+import unittest
+import tempfile
+import numpy as np
+
+import rlcard
+from rlcard.core import Card
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.public_tree_cfr import PublicTreeCFR
+from rlcard.utils.public_tree import LEDUC_HANDS, build_limit_holdem_tree
+from rlcard.utils.exploitability import exploitability
+
+class TestPublicTreeCFR(unittest.TestCase):
+
+    def test_expected_cfr_update(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        solver = PublicTreeCFR(env)
+        solver.train()
+
+        # Sum the updates of CFRAgent over all the deals
+        agent = CFRAgent(env, perfect_recall=True)
+        agent.iteration = 1
+        cards = [Card(hand[0], hand[1]) for hand in LEDUC_HANDS]
+        deal_num = 0
+        for start_player in range(2):
+            for i in range(6):
+                for j in range(6):
+                    for public_card in range(6):
+                        if len(set([i, j, public_card])) < 3:
+                            continue
+                        deal_num += 1
+                        for player_id in range(2):
+                            env.init_game()
+                            game = env.game
+                            game.game_pointer = game.round.game_pointer = start_player
+                            game.players[0].hand, game.players[1].hand = cards[i], cards[j]
+                            game.dealer.deck = [cards[public_card]]
+                            agent.traverse_tree(np.ones(2), player_id, env.get_state(start_player))
+
+        # The projection of the solver adds the information sets of the two seats
+        projected = solver.get_agent()
+        self.assertEqual(len(agent.table), len(projected.table))
+        for key, infoset_id in agent.table.index.items():
+            projected_id = projected.table.index[key]
+            self.assertTrue(np.allclose(agent.regrets[infoset_id] / deal_num, projected.regrets[projected_id]))
+            self.assertTrue(np.allclose(agent.average_policy[infoset_id] / deal_num, projected.average_policy[projected_id]))
+
+    def test_train(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        model_path = tempfile.mkdtemp()
+        solver = PublicTreeCFR(env, model_path=model_path, variant='cfr+', alternating=True)
+        values = [exploitability(solver.tree, solver)]
+        for _ in range(4):
+            for _ in range(50):
+                solver.train()
+            values.append(exploitability(solver.tree, solver))
+        # The information sets have perfect recall, so the average policy converges to a Nash equilibrium
+        self.assertTrue(all(value > next_value for value, next_value in zip(values, values[1:])))
+        self.assertLess(values[-1], 0.01)
+
+        # The projected agent is a CFRAgent with perfect recall
+        solver.get_agent().save()
+        agent = CFRAgent(env, model_path=model_path, perfect_recall=True)
+        agent.load()
+        self.assertEqual(agent.iteration, 200)
+        state = solver.tree.get_states(solver.tree.roots[0])[0]
+        self.assertIn(agent.get_key(state), agent.table.index)
+        self.assertIn(agent.eval_step(state), state['legal_actions'])
+
+    def test_get_agent(self):
+        env = rlcard.make('leduc-holdem', allow_step_back=True)
+        solver = PublicTreeCFR(env, variant='dcfr')
+        for _ in range(50):
+            solver.train()
+        # The keys of the agent only merge the two seats, so the agent mixes
+        # equivalent solutions
+        agent = solver.get_agent()
+        self.assertTrue(agent.perfect_recall)
+        self.assertLessEqual(exploitability(solver.tree, agent), exploitability(solver.tree, solver) + 1e-9)
+
+    def test_limit_holdem_tree(self):
+        env = rlcard.make('limit-holdem', allow_step_back=True)
+        tree = build_limit_holdem_tree(env, hand_cards=['SA', 'HA', 'SK', 'HK'],
+                                       board_cards=['DA', 'DK', 'DQ', 'CA', 'CK'])
+        solver = PublicTreeCFR(env, tree=tree, variant='cfr+', alternating=True)
+        values = [exploitability(tree, solver)]
+        for _ in range(2):
+            for _ in range(20):
+                solver.train()
+            values.append(exploitability(tree, solver))
+        self.assertGreater(values[0], values[1])
+        self.assertGreater(values[1], values[2])
+        self.assertLess(values[-1], 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import numpy as np
+
 from rlcard.envs.doudizhu import DoudizhuEnv as Env
 from rlcard.utils.utils import get_downstream_player_id
 from rlcard.agents.random_agent import RandomAgent
@@ -11,6 +13,19 @@ class TestDoudizhuEnv(unittest.TestCase):
         state, _ = env.init_game()
         self.assertEqual(state['obs'].size, 450)
 
+    def test_extract_state_dtype_and_out(self):
+        env = Env(obs_dtype=np.int8)
+        state, _ = env.init_game()
+        self.assertEqual(state['obs'].dtype, np.int8)
+        np.testing.assert_array_equal(state['obs'].sum(axis=1), np.ones((6, 15)))
+        hand_size = np.sum(np.arange(5)[:, None] * state['obs'][0])
+        self.assertEqual(hand_size, len(env.game.state['current_hand']))
+        batch = np.zeros((2, 6, 5, 15), dtype=bool)
+        extracted = env.extract_state(env.game.state, out=batch[1])
+        self.assertTrue(np.shares_memory(extracted['obs'], batch))
+        np.testing.assert_array_equal(batch[1], state['obs'])
+        self.assertFalse(batch[0].any())
+
     def test_get_legal_actions(self):
         env = Env()
         env.set_agents([RandomAgent(309), RandomAgent(309), RandomAgent(309)])
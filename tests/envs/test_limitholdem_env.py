@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 
 from rlcard.envs.limitholdem import LimitholdemEnv as Env
 from rlcard.agents.random_agent import RandomAgent
@@ -54,6 +55,18 @@ class TestLimitholdemEnv(unittest.TestCase):
         with self.assertRaises(Exception):
             env.step_back()
 
+    def test_clone_and_restore(self):
+        env = Env()
+        state, _ = env.init_game()
+        snapshot = env.get_snapshot()
+        clone = env.clone()
+        while not env.is_over():
+            env.step(np.random.choice(env.get_state(env.get_player_id())['legal_actions']))
+        self.assertFalse(clone.is_over())
+        restored_state, _ = env.restore(snapshot)
+        self.assertEqual(restored_state['obs'].tolist(), state['obs'].tolist())
+        self.assertEqual(clone.get_state(clone.get_player_id())['obs'].tolist(), state['obs'].tolist())
+
     def test_run(self):
         env = Env()
         agents = [RandomAgent(env.action_num) for _ in range(env.player_num)]
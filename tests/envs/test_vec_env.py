@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.random_agent import RandomAgent
+
+
+class TestVectorEnv(unittest.TestCase):
+
+    def test_make_vec(self):
+        env = rlcard.make_vec('leduc-holdem', 4)
+        self.assertEqual(env.num_envs, 4)
+        self.assertEqual(env.action_num, 4)
+        with self.assertRaises(ValueError):
+            rlcard.make_vec('leduc-holdem', 0)
+
+    def test_init_game(self):
+        env = rlcard.make_vec('doudizhu', 3)
+        states, player_ids = env.init_game()
+        self.assertEqual(states['obs'].shape, (3, 6, 5, 15))
+        self.assertEqual(states['legal_mask'].shape, (3, env.action_num))
+        self.assertEqual(len(player_ids), 3)
+        for i in range(3):
+            self.assertEqual(sorted(np.flatnonzero(states['legal_mask'][i])), sorted(states['legal_actions'][i]))
+
+    def test_step_auto_reset(self):
+        env = rlcard.make_vec('leduc-holdem', 5)
+        states, _ = env.init_game()
+        finished = 0
+        for _ in range(100):
+            actions = [np.random.choice(legal_actions) for legal_actions in states['legal_actions']]
+            states, player_ids, dones, payoffs = env.step(actions)
+            self.assertEqual(states['obs'].shape, (5, 6))
+            for i in np.flatnonzero(dones):
+                self.assertEqual(np.sum(payoffs[i]), 0)
+            finished += np.sum(dones)
+            for i, player_id in enumerate(player_ids):
+                self.assertEqual(player_id, env.envs[i].get_player_id())
+        self.assertGreater(finished, 0)
+        with self.assertRaises(ValueError):
+            env.step([0])
+
+    def test_run(self):
+        env = rlcard.make_vec('leduc-holdem', 4)
+        env.set_agents([RandomAgent(env.action_num) for _ in range(env.player_num)])
+        trajectories, payoffs = env.run(is_training=False)
+        self.assertEqual(len(trajectories), 4)
+        self.assertEqual(len(payoffs), 4)
+        for trajectory, payoff in zip(trajectories, payoffs):
+            self.assertEqual(len(trajectory), env.player_num)
+            self.assertEqual(sum(payoff), 0)
+            for player_trajectory in trajectory:
+                if player_trajectory:
+                    self.assertTrue(player_trajectory[-1][4])
+
+if __name__ == '__main__':
+    unittest.main()
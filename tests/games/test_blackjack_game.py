@@ -57,6 +57,22 @@ class TestBlackjackGame(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_clone_and_restore(self):
+        game = Game()
+        for _ in range(10):
+            game.init_game()
+            snapshot = game.get_snapshot()
+            clone = game.clone()
+            actions, states = [], []
+            while not game.is_over():
+                actions.append(np.random.choice(['hit', 'stand']))
+                states.append(game.step(actions[-1])[0])
+            game.restore(snapshot)
+            for copied_game in (clone, game):
+                for action, state in zip(actions, states):
+                    self.assertEqual(copied_game.step(action)[0], state)
+                self.assertTrue(copied_game.is_over())
+
     def test_get_state(self):
         game = Game()
         game.init_game()
@@ -1,11 +1,17 @@
+import os
 import unittest
 import numpy as np
 import functools
+import tempfile
 
 from rlcard.utils.utils import get_downstream_player_id, get_upstream_player_id
 from rlcard.games.doudizhu.game import DoudizhuGame as Game
-from rlcard.games.doudizhu.utils import get_landlord_score, encode_cards
+from rlcard.games.doudizhu.utils import get_landlord_score, encode_cards, cards2str
 from rlcard.games.doudizhu.utils import get_optimal_action, doudizhu_sort_str
+from rlcard.games.doudizhu.utils import get_action_tables, load_action_tables, get_tables_version, TABLE_NAMES
+from rlcard.games.doudizhu.utils import cards2counts, contains_cards, get_gt_cards
+from rlcard.games.doudizhu.utils import cards_list2counts, encode_counts
+from rlcard.games.doudizhu import utils
 from rlcard.games.doudizhu.judger import DoudizhuJudger as Judger
 
 
@@ -149,6 +155,128 @@ class TestDoudizhuGame(unittest.TestCase):
         self.assertEqual(plane[1][13], 1)
         self.assertEqual(plane[1][14], 1)
 
+    def test_action_tables(self):
+        tables = get_action_tables()
+        self.assertEqual(len(tables.actions), len(utils.CARD_TYPE[0]) + 1)
+        self.assertEqual(tables.action_list[tables.pass_id], 'pass')
+        for action in ['33344', 'BR', '3', '345678', 'pass']:
+            index = tables.action_ids[action]
+            abstracts = [utils.ACTION_LIST[i] for i in tables.get_abstract_ids(action)]
+            self.assertEqual(abstracts, utils.SPECIFIC_MAP[action])
+            if action != 'pass':
+                card_type, weight = utils.CARD_TYPE[0][action][0]
+                self.assertEqual(tables.type_names[tables.action_types[index]], card_type)
+                self.assertEqual(tables.action_weights[index], int(weight))
+
+    def test_load_action_tables(self):
+        with tempfile.TemporaryDirectory() as path:
+            tables = load_action_tables(path)
+            for name in TABLE_NAMES:
+                self.assertIsInstance(getattr(tables, name), np.memmap)
+            self.assertEqual(tables.action_list, get_action_tables().action_list)
+            del tables
+
+    def test_load_stale_action_tables(self):
+        with tempfile.TemporaryDirectory() as path:
+            load_action_tables(path)
+            with open(os.path.join(path, 'version'), 'r') as file:
+                self.assertEqual(file.read(), get_tables_version())
+            # Tables compiled from other data are replaced
+            np.save(os.path.join(path, 'type_starts.npy'), np.zeros(2))
+            with open(os.path.join(path, 'version'), 'w') as file:
+                file.write('stale')
+            tables = load_action_tables(path)
+            self.assertEqual(tables.type_starts.tolist(), get_action_tables().type_starts.tolist())
+            with open(os.path.join(path, 'version'), 'r') as file:
+                self.assertEqual(file.read(), get_tables_version())
+            del tables
+
+    def test_cards2counts(self):
+        counts = cards2counts('3334TT2BR')
+        self.assertEqual(counts.tolist(), [3, 1, 0, 0, 0, 0, 0, 2, 0, 0, 0, 0, 1, 1, 1])
+        self.assertEqual(cards2counts('').sum(), 0)
+
+    def test_get_playable_ids(self):
+        tables = get_action_tables()
+        hand = '33445566778899TTJQKA2BR'
+        playable_ids = tables.get_playable_ids(cards2counts(hand))
+        playable_cards = set(tables.action_list[index] for index in playable_ids)
+        expected = set(action for action in tables.action_list[:tables.pass_id] if contains_cards(hand, action))
+        self.assertEqual(playable_cards, expected)
+        candidates = playable_ids[::2]
+        subset = tables.get_playable_ids(cards2counts('3456789'), candidates)
+        expected = [index for index in candidates if contains_cards('3456789', tables.action_list[index])]
+        self.assertEqual(subset.tolist(), expected)
+
+    def test_get_beating_ranges(self):
+        tables = get_action_tables()
+        def beating(action):
+            ranges = tables.get_beating_ranges(tables.action_ids[action])
+            return set(tables.action_list[index] for start, end in ranges for index in range(start, end))
+        self.assertEqual(beating('BR'), set())
+        self.assertEqual(beating('2222'), {'BR'})
+        beaters = beating('KK')
+        self.assertTrue({'AA', '22', '3333', 'BR'}.issubset(beaters))
+        self.assertFalse({'KK', 'QQ', '33', 'A'} & beaters)
+        self.assertEqual(len(beating('34567')), 7 + 13 + 1)
+
+    def test_get_gt_cards(self):
+        game = Game()
+        game.init_game()
+        player, greater_player = game.players[0], game.players[1]
+        greater_player.played_cards = '3'
+        hand = cards2str(player.current_hand)
+        gt_cards = get_gt_cards(player, greater_player)
+        self.assertEqual(gt_cards[0], 'pass')
+        for cards in gt_cards[1:]:
+            self.assertTrue(contains_cards(hand, cards))
+        self.assertEqual(gt_cards, get_gt_cards(player, greater_player, game.judger.playable_ids[0]))
+
+    def test_encode_counts(self):
+        counts = cards_list2counts(['333BR', '', list('4455')])
+        self.assertEqual(counts.shape, (3, 15))
+        self.assertEqual(counts[0].tolist(), cards2counts('333BR').tolist())
+        self.assertEqual(counts[2].tolist(), cards2counts('4455').tolist())
+        planes = encode_counts(counts)
+        self.assertEqual(planes.shape, (3, 5, 15))
+        self.assertEqual(planes.dtype, np.int8)
+        plane = np.zeros((5, 15), dtype=int)
+        plane[0] = np.ones(15, dtype=int)
+        encode_cards(plane, '333BR')
+        np.testing.assert_array_equal(planes[0], plane)
+        self.assertTrue(np.all(planes[1][0] == 1))
+        out = np.zeros((3, 5, 15), dtype=bool)
+        encode_counts(counts, out=out)
+        np.testing.assert_array_equal(out, planes)
+
+    def test_clone_and_restore(self):
+        def describe(state):
+            # The order of the actions depends on the order of a set
+            return dict(state, actions=sorted(state['actions'] or []))
+        game = Game()
+        for _ in range(3):
+            state, _ = game.init_game()
+            state, _ = game.step(np.random.choice(state['actions']))
+            snapshot = game.get_snapshot()
+            clone = game.clone()
+            # The clone cannot step back, like the clones of the other games
+            self.assertIsNot(clone.history, game.history)
+            self.assertFalse(clone.step_back())
+            actions, states = [], []
+            while not game.is_over():
+                actions.append(np.random.choice(state['actions']))
+                state, _ = game.step(actions[-1])
+                states.append(describe(state))
+            game.restore(snapshot)
+            for copied_game in (clone, game):
+                for action, state in zip(actions, states):
+                    self.assertEqual(describe(copied_game.step(action)[0]), state)
+                self.assertTrue(copied_game.is_over())
+            # The steps played after the copy can be undone
+            self.assertTrue(clone.step_back())
+            game.restore(snapshot)
+            self.assertFalse(game.step_back())
+
     def test_judge_payoffs(self):
         payoffs = Judger.judge_payoffs(0, 0)
         self.assertEqual(payoffs[0], 1)
@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 
 from rlcard.games.leducholdem.game import LeducholdemGame as Game
 from rlcard.games.leducholdem.player import LeducholdemPlayer as Player
@@ -58,6 +59,24 @@ class TestLeducholdemMethods(unittest.TestCase):
         self.assertEqual(game.game_pointer, player_id)
         self.assertEqual(game.step_back(), False)
 
+    def test_action_history(self):
+        game = Game(allow_step_back=True)
+        state, player_id = game.init_game()
+        self.assertEqual(state['action_history'], ())
+        game.step('raise')
+        # The history is seen by each player
+        self.assertEqual(game.get_state(player_id)['action_history'], ((True, 'raise', ()),))
+        self.assertEqual(game.get_state(1 - player_id)['action_history'], ((False, 'raise', ()),))
+        clone = game.clone()
+        game.step('call')
+        # The public card is dealt after the call
+        public_card = game.public_card.get_index()
+        self.assertEqual(game.get_state(player_id)['action_history'],
+                         ((True, 'raise', ()), (False, 'call', (public_card,))))
+        self.assertEqual(clone.get_state(player_id)['action_history'], ((True, 'raise', ()),))
+        game.step_back()
+        self.assertEqual(game.get_state(player_id)['action_history'], ((True, 'raise', ()),))
+
     def test_judge_game(self):
         players = [Player(0), Player(1)]
         players[0].in_chips = 10
@@ -88,6 +107,23 @@ class TestLeducholdemMethods(unittest.TestCase):
         self.assertEqual(payoffs[0], -10.0)
         self.assertEqual(payoffs[1], 10.0)
 
+    def test_clone_and_restore(self):
+        game = Game()
+        for _ in range(10):
+            game.init_game()
+            snapshot = game.get_snapshot()
+            clone = game.clone()
+            actions, states = [], []
+            while not game.is_over():
+                actions.append(np.random.choice(game.get_legal_actions()))
+                states.append(game.step(actions[-1])[0])
+            payoffs = list(game.get_payoffs())
+            game.restore(snapshot)
+            for copied_game in (clone, game):
+                for action, state in zip(actions, states):
+                    self.assertEqual(copied_game.step(action)[0], state)
+                self.assertEqual(list(copied_game.get_payoffs()), payoffs)
+
     def test_player_get_player_id(self):
         player = Player(0)
         self.assertEqual(0, player.get_player_id())
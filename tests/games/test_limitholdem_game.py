@@ -1,10 +1,23 @@
 import unittest
+from copy import deepcopy
 import numpy as np
 
 from rlcard.games.limitholdem.game import LimitholdemGame as Game
 from rlcard.games.limitholdem.player import LimitholdemPlayer as Player
 
 
+def get_game_snapshot(game):
+    ''' Copy everything that a step of the game can change
+    '''
+    return deepcopy({'round': game.round.__dict__,
+                     'players': [player.__dict__ for player in game.players],
+                     'deck': game.dealer.deck,
+                     'public_cards': game.public_cards,
+                     'game_pointer': game.game_pointer,
+                     'round_counter': game.round_counter,
+                     'raise_nums': getattr(game, 'history_raise_nums', None)})
+
+
 class TestLimitholdemMethods(unittest.TestCase):
 
     def test_get_player_num(self):
@@ -100,6 +113,24 @@ class TestLimitholdemMethods(unittest.TestCase):
             action = np.random.choice(legal_actions)
             game.step(action)
 
+    def test_step_back_restores_state(self):
+        game = Game(allow_step_back=True)
+        np.random.seed(1)
+        for _ in range(20):
+            game.init_game()
+            snapshots = []
+            states = []
+            while not game.is_over():
+                snapshots.append(get_game_snapshot(game))
+                states.append(deepcopy(game.get_state(game.get_player_id())))
+                game.step(np.random.choice(game.get_legal_actions()).item())
+            # Undo the whole game, checking every state on the way back
+            while snapshots:
+                self.assertTrue(game.step_back())
+                self.assertEqual(get_game_snapshot(game), snapshots.pop())
+                self.assertEqual(game.get_state(game.get_player_id()), states.pop())
+            self.assertFalse(game.step_back())
+
     def test_payoffs(self):
         game = Game()
         np.random.seed(0)
@@ -115,6 +146,36 @@ class TestLimitholdemMethods(unittest.TestCase):
                 total += payoff
             self.assertEqual(total, 0)
 
+    def test_clone_and_restore(self):
+        game = Game()
+        for _ in range(10):
+            game.init_game()
+            snapshot = game.get_snapshot()
+            clone = game.clone()
+            actions, states = [], []
+            while not game.is_over():
+                actions.append(np.random.choice(game.get_legal_actions()))
+                states.append(deepcopy(game.step(actions[-1])[0]))
+            payoffs = list(game.get_payoffs())
+            game.restore(snapshot)
+            for copied_game in (clone, game):
+                for action, state in zip(actions, states):
+                    self.assertEqual(copied_game.step(action)[0], state)
+                self.assertEqual(list(copied_game.get_payoffs()), payoffs)
+
+    def test_integer_cards(self):
+        game = Game()
+        state, _ = game.init_game()
+        while not game.is_over():
+            game.step('call' if 'call' in game.get_legal_actions() else 'check')
+        state = game.get_state(0)
+        cards = state['hand'] + state['public_cards']
+        self.assertEqual(len(cards), 7)
+        self.assertEqual(len(set(cards)), 7)
+        for card in cards:
+            self.assertIsInstance(card, int)
+            self.assertIn(card, range(52))
+
     def test_get_player_id(self):
         player = Player(3)
         self.assertEqual(player.get_player_id(), 3)
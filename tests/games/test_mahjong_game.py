@@ -4,6 +4,20 @@ import numpy as np
 from rlcard.games.mahjong.game import MahjongGame as Game
 from rlcard.games.mahjong.player import MahjongPlayer as Player
 
+
+def get_game_snapshot(game):
+    ''' Describe everything that a step of the game can change
+    '''
+    def describe(cards):
+        return [card.get_str() for card in cards]
+    snapshot = {key: value for key, value in game.round.__dict__.items() if key not in ('judger', 'dealer', 'last_cards')}
+    snapshot['last_cards'] = describe(game.round.last_cards or [])
+    snapshot['deck'] = describe(game.dealer.deck)
+    snapshot['table'] = describe(game.dealer.table)
+    snapshot['hands'] = [describe(player.hand) for player in game.players]
+    snapshot['piles'] = [[describe(pile) for pile in player.pile] for player in game.players]
+    return snapshot
+
 class TestMahjongMethods(unittest.TestCase):
 
     def test_get_player_num(self):
@@ -68,6 +82,37 @@ class TestMahjongMethods(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_step_back_restores_state(self):
+        game = Game(allow_step_back=True)
+        np.random.seed(0)
+        for _ in range(3):
+            state, _ = game.init_game()
+            snapshots = []
+            while not game.is_over():
+                snapshots.append(get_game_snapshot(game))
+                state, _ = game.step(np.random.choice(game.get_legal_actions(state)))
+            while snapshots:
+                self.assertTrue(game.step_back())
+                self.assertEqual(get_game_snapshot(game), snapshots.pop())
+            self.assertFalse(game.step_back())
+
+    def test_clone_and_restore(self):
+        def play(game, state):
+            np.random.seed(0)
+            states = []
+            while not game.is_over():
+                state, _ = game.step(np.random.choice(game.get_legal_actions(state)))
+                states.append((state['player'], [card.get_str() for card in state['current_hand']]))
+            return states
+        game = Game()
+        state, _ = game.init_game()
+        snapshot = game.get_snapshot()
+        clone = game.clone()
+        states = play(game, state)
+        self.assertEqual(play(clone, clone.get_state(clone.get_player_id())), states)
+        game.restore(snapshot)
+        self.assertEqual(play(game, game.cur_state), states)
+
     def test_player_get_player_id(self):
         player = Player(0)
         self.assertEqual(0, player.get_player_id())
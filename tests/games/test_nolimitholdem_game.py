@@ -1,7 +1,22 @@
 import unittest
+from copy import deepcopy
+import numpy as np
 
 from rlcard.games.nolimitholdem.game import NolimitholdemGame as Game
 
+
+def get_game_snapshot(game):
+    ''' Copy everything that a step of the game can change
+    '''
+    return deepcopy({'round': game.round.__dict__,
+                     'players': [player.__dict__ for player in game.players],
+                     'deck': game.dealer.deck,
+                     'public_cards': game.public_cards,
+                     'game_pointer': game.game_pointer,
+                     'round_counter': game.round_counter,
+                     'raise_nums': getattr(game, 'history_raise_nums', None)})
+
+
 class TestNolimitholdemMethods(unittest.TestCase):
 
     def test_get_action_num(self):
@@ -20,6 +35,42 @@ class TestNolimitholdemMethods(unittest.TestCase):
         for i in range(3,100):
             self.assertIn(i , state['legal_actions'])
 
+    def test_step_back_restores_state(self):
+        game = Game(allow_step_back=True)
+        np.random.seed(1)
+        for _ in range(20):
+            game.init_game()
+            snapshots = []
+            states = []
+            while not game.is_over():
+                snapshots.append(get_game_snapshot(game))
+                states.append(deepcopy(game.get_state(game.get_player_id())))
+                game.step(np.random.choice(game.get_legal_actions()).item())
+            # Undo the whole game, checking every state on the way back
+            while snapshots:
+                self.assertTrue(game.step_back())
+                self.assertEqual(get_game_snapshot(game), snapshots.pop())
+                self.assertEqual(game.get_state(game.get_player_id()), states.pop())
+            self.assertFalse(game.step_back())
+
+    def test_clone_and_restore(self):
+        game = Game()
+        for _ in range(10):
+            game.init_game()
+            snapshot = game.get_snapshot()
+            clone = game.clone()
+            actions, states = [], []
+            while not game.is_over():
+                legal_actions = game.get_legal_actions()
+                actions.append(legal_actions[np.random.randint(len(legal_actions))])
+                states.append(game.step(actions[-1])[0])
+            payoffs = list(game.get_payoffs())
+            game.restore(snapshot)
+            for copied_game in (clone, game):
+                for action, state in zip(actions, states):
+                    self.assertEqual(copied_game.step(action)[0], state)
+                self.assertEqual(list(copied_game.get_payoffs()), payoffs)
+
     def test_step(self):
         game = Game()
 
@@ -1,4 +1,5 @@
 import unittest
+import random
 import numpy as np
 
 from rlcard.games.uno.game import UnoGame as Game
@@ -6,6 +7,19 @@ from rlcard.games.uno.player import UnoPlayer as Player
 from rlcard.games.uno.utils import ACTION_LIST
 from rlcard.games.uno.utils import hand2dict, encode_hand, encode_target
 
+
+def get_game_snapshot(game):
+    ''' Describe everything that a step of the game can change
+    '''
+    def describe(cards):
+        return [(card.str, card.color) for card in cards]
+    snapshot = {key: value for key, value in game.round.__dict__.items() if key not in ('dealer', 'played_cards', 'target')}
+    snapshot['target'] = describe([game.round.target])
+    snapshot['played_cards'] = describe(game.round.played_cards)
+    snapshot['deck'] = describe(game.dealer.deck)
+    snapshot['hands'] = [describe(player.hand) for player in game.players]
+    return snapshot
+
 class TestUnoMethods(unittest.TestCase):
 
     def test_get_player_num(self):
@@ -73,6 +87,43 @@ class TestUnoMethods(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_step_back_restores_state(self):
+        game = Game(allow_step_back=True)
+        np.random.seed(0)
+        for i in range(10):
+            game.init_game()
+            if i % 2:
+                # Leave few cards in the deck so that the played cards are shuffled back
+                while len(game.dealer.deck) > 6:
+                    game.round.played_cards.insert(0, game.dealer.deck.pop(0))
+            snapshots = []
+            while not game.is_over():
+                snapshots.append(get_game_snapshot(game))
+                game.step(np.random.choice(game.get_legal_actions()))
+            while snapshots:
+                self.assertTrue(game.step_back())
+                self.assertEqual(get_game_snapshot(game), snapshots.pop())
+            self.assertFalse(game.step_back())
+
+    def test_clone_and_restore(self):
+        def play(game, seed):
+            # The draws depend on the random generators
+            random.seed(seed)
+            np.random.seed(seed)
+            states = []
+            while not game.is_over():
+                states.append(game.step(np.random.choice(game.get_legal_actions()))[0])
+            return states
+        game = Game()
+        for seed in range(5):
+            game.init_game()
+            snapshot = game.get_snapshot()
+            clone = game.clone()
+            states = play(game, seed)
+            self.assertEqual(play(clone, seed), states)
+            game.restore(snapshot)
+            self.assertEqual(play(game, seed), states)
+
     def test_hand2dict(self):
         hand_1 = ['y-1', 'r-8', 'b-9', 'y-reverse', 'r-skip']
         hand1_dict = hand2dict(hand_1)
@@ -0,0 +1,122 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.random_agent import RandomAgent
+from rlcard.utils.public_tree import build_leduc_tree, build_limit_holdem_tree
+from rlcard.utils.exploitability import PolicyCache, best_response_value, exploitability, expected_payoffs
+
+class CheckAgent(object):
+    ''' An agent with only eval_step, that checks or calls
+    '''
+
+    def eval_step(self, state):
+        return 3 if 3 in state['legal_actions'] else 0
+
+class TestExploitability(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.env = rlcard.make('leduc-holdem')
+        cls.tree = build_leduc_tree(cls.env)
+
+    def test_leduc_tree(self):
+        tree = self.tree
+        self.assertEqual(len(tree.roots), 2)
+        self.assertEqual(len(list(tree.iter_nodes('decision'))), 372)
+        self.assertEqual(len(list(tree.iter_nodes('terminal'))), 672)
+        for node in tree.iter_nodes('chance'):
+            self.assertEqual(len(node.children), 6)
+        for node in tree.iter_nodes('terminal'):
+            # Zero-sum payoffs are antisymmetric between the hands
+            if node.public_card is None:
+                self.assertTrue(np.allclose(np.diag(node.payoffs), 0))
+
+    def test_uniform_policy(self):
+        uniform = lambda state: np.ones(self.env.action_num)
+        values = [best_response_value(self.tree, uniform, player) for player in range(2)]
+        # The game is symmetric since the first player is random
+        self.assertAlmostEqual(values[0], values[1])
+        self.assertAlmostEqual(exploitability(self.tree, uniform), 2.341049, places=5)
+
+    def test_best_response_to_always_call(self):
+        # Calling is never legal at the first action, so checking is used instead
+        call = lambda state: np.array([1., 0., 0., 1.])
+        self.assertGreater(exploitability(self.tree, call), 0)
+        fold = lambda state: np.array([0., 0., 1., 0.])
+        # The best response to folding wins the ante of the opponent
+        self.assertAlmostEqual(best_response_value(self.tree, fold, 0), 1.0)
+
+    def test_policy_types(self):
+        uniform = exploitability(self.tree, lambda state: np.ones(self.env.action_num))
+        self.assertAlmostEqual(exploitability(self.tree, RandomAgent(self.env.action_num)), uniform)
+
+        agent = CFRAgent(rlcard.make('leduc-holdem', allow_step_back=True))
+        for _ in range(3):
+            agent.train()
+        self.assertAlmostEqual(exploitability(self.tree, agent), exploitability(self.tree, agent.get_average_probs))
+
+        check = lambda state: np.array([1., 0., 0., 1.])
+        self.assertAlmostEqual(exploitability(self.tree, CheckAgent()), exploitability(self.tree, check))
+        # The players can use different policies
+        value = best_response_value(self.tree, [agent, RandomAgent(self.env.action_num)], 0)
+        self.assertAlmostEqual(value, best_response_value(self.tree, RandomAgent(self.env.action_num), 0))
+        with self.assertRaises(ValueError):
+            PolicyCache(self.tree, [agent])
+
+    def test_policy_cache(self):
+        calls = []
+        def uniform(state):
+            calls.append(state)
+            return np.ones(self.env.action_num)
+        cache = PolicyCache(self.tree, uniform, batch_size=10)
+        cache.prefetch(self.tree.iter_nodes('decision'))
+        # Each information set is queried once
+        infosets = set((node.player, state['obs'].tobytes(), tuple(state['legal_actions']))
+                       for node in self.tree.iter_nodes('decision') for state in self.tree.get_states(node))
+        self.assertEqual(len(calls), len(infosets))
+        best_response_value(self.tree, uniform, 0, cache)
+        self.assertEqual(len(calls), len(infosets))
+        for node in self.tree.iter_nodes('decision'):
+            self.assertTrue(np.allclose(cache.get_probs(node), 1.0 / len(node.actions)))
+
+    def test_limit_holdem(self):
+        env = rlcard.make('limit-holdem')
+        tree = build_limit_holdem_tree(env, hand_cards=['SA', 'HA', 'SK', 'HK'],
+                                       board_cards=['DA', 'DK', 'DQ', 'CA', 'CJ'])
+        self.assertEqual(tree.num_hands, 6)
+        for node in tree.iter_nodes('terminal'):
+            self.assertTrue(np.all(node.payoffs[tree.conflicts] == 0))
+        for node in tree.iter_nodes('chance'):
+            self.assertIn(len(node.children), (10, 2, 1))
+        values = [best_response_value(tree, RandomAgent(env.action_num), player) for player in range(2)]
+        self.assertAlmostEqual(values[0], values[1])
+        self.assertGreater(values[0], 0)
+
+        with self.assertRaises(ValueError):
+            build_limit_holdem_tree(env, hand_cards=['SA', 'HA'], board_cards=['SA', 'DK', 'DQ', 'CA', 'CJ'])
+        with self.assertRaises(ValueError):
+            build_limit_holdem_tree(env, board_cards=['DA', 'DK', 'DQ', 'CA'])
+
+    def test_expected_payoffs(self):
+        random_agent = RandomAgent(self.env.action_num)
+        self.assertTrue(np.allclose(expected_payoffs(self.tree, random_agent), 0))
+        # Folding loses the ante whoever acts first
+        fold = lambda state: np.array([0., 0., 1., 0.])
+        self.assertTrue(np.allclose(expected_payoffs(self.tree, [fold, CheckAgent()]), [-1, 1]))
+
+        payoffs = expected_payoffs(self.tree, [CheckAgent(), random_agent])
+        self.assertAlmostEqual(payoffs.sum(), 0)
+        self.assertTrue(np.allclose(expected_payoffs(self.tree, [random_agent, CheckAgent()]), payoffs[::-1]))
+
+        # The sampled games agree
+        np.random.seed(0)
+        env = rlcard.make('leduc-holdem')
+        env.set_agents([CheckAgent(), random_agent])
+        game_num = 2000
+        reward = sum(env.run(is_training=False)[1][0] for _ in range(game_num)) / game_num
+        self.assertLess(abs(reward - payoffs[0]), 0.3)
+
+if __name__ == '__main__':
+    unittest.main()
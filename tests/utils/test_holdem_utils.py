@@ -1,6 +1,15 @@
+import os
+import json
 import unittest
+import numpy as np
+
+import rlcard
 from rlcard.games.limitholdem.utils import compare_hands
 from rlcard.games.limitholdem.utils import Hand as Hand
+from rlcard.games.limitholdem.utils import evaluate_hand, CATEGORY_SHIFT
+from rlcard.games.limitholdem.utils import evaluate_hands, judge_showdowns, estimate_equity, split_pot
+from rlcard.games.limitholdem.utils import index2str
+from rlcard.games.limitholdem.utils import STRAIGHT, FLUSH, STRAIGHT_FLUSH, FULL_HOUSE, TWO_PAIR
 ''' Combinations selected for testing compare_hands function
 Royal straight flush ['CJ', 'CT', 'CQ', 'CK', 'C9', 'C8', 'CA']
 Straight flush ['CJ', 'CT', 'CQ', 'CK', 'C9', 'C8', 'C7']
@@ -243,5 +252,67 @@ class TestHoldemUtils(unittest.TestCase):
         winner = compare_hands( [['CK', 'SJ', 'H9', 'C7', 'C6', 'B3', 'C2'], ['CK', 'SJ', 'H9', 'C7', 'C6', 'B3', 'C2']])
         self.assertEqual(winner, [1, 1])
 
+    def test_evaluate_hand(self):
+        # the wheel is the lowest straight
+        wheel = evaluate_hand(['SA', 'H2', 'D3', 'C4', 'S5', 'HJ', 'DK'])
+        six_high = evaluate_hand(['S6', 'H2', 'D3', 'C4', 'S5', 'HJ', 'DK'])
+        self.assertEqual(wheel >> CATEGORY_SHIFT, STRAIGHT)
+        self.assertLess(wheel, six_high)
+        self.assertEqual(evaluate_hand(['SA', 'S2', 'S3', 'S4', 'S5']) >> CATEGORY_SHIFT, STRAIGHT_FLUSH)
+        self.assertEqual(evaluate_hand(['SA', 'S2', 'S3', 'S4', 'S9', 'HA']) >> CATEGORY_SHIFT, FLUSH)
+        self.assertEqual(evaluate_hand(['SA', 'HA', 'DA', 'S4', 'H4', 'D4']) >> CATEGORY_SHIFT, FULL_HOUSE)
+        # the kicker of two pair can be from a third pair
+        self.assertGreater(evaluate_hand(['SA', 'HA', 'SK', 'HK', 'SQ', 'HQ', 'D2']),
+                           evaluate_hand(['SA', 'HA', 'SK', 'HK', 'SJ', 'HJ', 'DT']))
+        self.assertEqual(evaluate_hand(['SA', 'HA', 'SK', 'HK', 'D2']) >> CATEGORY_SHIFT, TWO_PAIR)
+        # the card indices of card2index.json give the same strengths
+        self.assertEqual(evaluate_hand(['SA', 'HA', 'D3', 'CK', 'S5']), evaluate_hand([0, 13, 28, 51, 4]))
+        # only the best five cards count
+        self.assertEqual(evaluate_hand(['SA', 'HA', 'DK', 'CQ', 'SJ', 'H2', 'D3']),
+                         evaluate_hand(['SA', 'HA', 'DK', 'CQ', 'SJ']))
+
+    def test_evaluate_hands(self):
+        np_random = np.random.RandomState(0)
+        for num_cards in [5, 6, 7]:
+            hands = np.array([np_random.choice(52, num_cards, replace=False) for _ in range(500)])
+            strengths = evaluate_hands(hands.reshape(5, 100, num_cards))
+            self.assertEqual(strengths.shape, (5, 100))
+            self.assertEqual(strengths.reshape(-1).tolist(), [evaluate_hand(hand.tolist()) for hand in hands])
+
+    def test_split_pot(self):
+        payoffs = split_pot([[1, 0, 1], [0, 1, 0]], [[2, 4, 2], [1, 1, 2]])
+        np.testing.assert_array_equal(payoffs, [[2, -4, 2], [-1, 3, -2]])
+
+    def test_judge_showdowns(self):
+        # SA SK against HA HK on a board of spades, then on a neutral board
+        hole_cards = np.array([[[0, 12], [13, 25]], [[0, 12], [13, 25]]])
+        boards = np.array([[1, 2, 3, 9, 45], [27, 41, 31, 46, 35]])
+        winners, payoffs = judge_showdowns(hole_cards, boards, in_chips=[[2, 2], [3, 3]])
+        np.testing.assert_array_equal(winners, [[True, False], [True, True]])
+        np.testing.assert_array_equal(payoffs, [[2, -2], [0, 0]])
+        winners, payoffs = judge_showdowns(hole_cards, boards, folded=[[True, False], [False, False]])
+        np.testing.assert_array_equal(winners, [[False, True], [True, True]])
+        np.testing.assert_array_equal(payoffs, [[-1, 1], [0, 0]])
+
+    def test_estimate_equity(self):
+        np_random = np.random.RandomState(0)
+        # AA against KK before the flop
+        equities = estimate_equity(np.array([[[0, 13], [12, 25]]]), num_samples=4000, np_random=np_random)
+        self.assertAlmostEqual(equities[0][0], 0.82, delta=0.03)
+        self.assertAlmostEqual(equities.sum(), 1)
+        # the river is known
+        equities = estimate_equity(np.array([[[0, 12], [13, 25]]]), np.array([[1, 2, 3, 9, 45]]))
+        np.testing.assert_array_equal(equities, [[1, 0]])
+        # KK mostly wins with one of the two K left on the turn or the river
+        equities = estimate_equity(np.array([[[0, 13], [12, 25]]]), np.array([[27, 41, 31]]),
+                                   num_samples=2000, np_random=np_random, chunk_size=100)
+        self.assertAlmostEqual(equities[0][1], 1 - (43 / 45) * (42 / 44), delta=0.02)
+
+    def test_index2str(self):
+        with open(os.path.join(rlcard.__path__[0], 'games/limitholdem/card2index.json'), 'r') as file:
+            card2index = json.load(file)
+        cards = index2str(range(52))
+        self.assertEqual([card2index[card] for card in cards], list(range(52)))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.random_agent import RandomAgent
+from rlcard.utils.rollout import ParallelRunner, SharedTransitionBuffer
+
+
+def make_random_agents(env):
+    return [RandomAgent(env.action_num) for _ in range(env.player_num)]
+
+def set_agents_action_num(agents, action_num):
+    for agent in agents:
+        agent.action_num = action_num
+
+def raise_on_weights(agents, _):
+    raise ValueError('weights can not be loaded')
+
+def raise_on_init(env):
+    raise ValueError('agents can not be created')
+
+
+class TestRollout(unittest.TestCase):
+
+    def test_run(self):
+        with ParallelRunner('leduc-holdem', make_random_agents, 2, seed=0, batch_size=3) as runner:
+            trajectories, payoffs = runner.run(10)
+        self.assertEqual(len(trajectories), 10)
+        self.assertEqual(len(payoffs), 10)
+        for payoff in payoffs:
+            self.assertEqual(sum(payoff), 0)
+
+    def test_reproducible_across_process_num(self):
+        with ParallelRunner('doudizhu', make_random_agents, 1, seed=1) as runner:
+            _, payoffs_1 = runner.run(6)
+        with ParallelRunner('doudizhu', make_random_agents, 3, seed=1) as runner:
+            _, payoffs_3 = runner.run(6)
+        self.assertEqual([list(p) for p in payoffs_1], [list(p) for p in payoffs_3])
+
+    def test_set_weights(self):
+        with ParallelRunner('leduc-holdem', make_random_agents, 2) as runner:
+            with self.assertRaises(ValueError):
+                runner.set_weights(None)
+        with ParallelRunner('leduc-holdem', make_random_agents, 2, weights_fn=set_agents_action_num) as runner:
+            runner.set_weights(4)
+            _, payoffs = runner.run(4)
+            self.assertEqual(len(payoffs), 4)
+        with ParallelRunner('leduc-holdem', make_random_agents, 1, weights_fn=raise_on_weights) as runner:
+            runner.set_weights(4)
+            with self.assertRaises(ValueError):
+                runner.run(1)
+
+    def test_interrupted_run(self):
+        with ParallelRunner('leduc-holdem', make_random_agents, 2, seed=0, batch_size=1) as runner:
+            for _ in runner.iter_run(20):
+                break
+            # The results left by the interrupted run are discarded
+            indices = [index for index, _, _ in runner.iter_run(5)]
+            self.assertEqual(sorted(indices), list(range(5)))
+
+    def test_worker_init_failure(self):
+        with ParallelRunner('leduc-holdem', raise_on_init, 2) as runner:
+            with self.assertRaises(ValueError):
+                runner.run(4)
+            # The next runs fail instead of waiting for the dead workers
+            with self.assertRaises(ValueError):
+                runner.run(4)
+            with self.assertRaises(ValueError):
+                next(runner.iter_run(4))
+
+    def test_shared_memory_transport(self):
+        with ParallelRunner('leduc-holdem', make_random_agents, 2, seed=0, transport='shared_memory', memory_size=8) as runner:
+            with self.assertRaises(ValueError):
+                next(runner.iter_run(1))
+            transition_num = 0
+            payoffs = []
+            for batch, batch_payoffs in runner.iter_transitions(20):
+                self.assertEqual(batch['obs'].shape[1:], (6,))
+                self.assertLessEqual(len(batch['obs']), 8)
+                for i in range(len(batch['action'])):
+                    self.assertTrue(batch['legal_mask'][i, batch['action'][i]])
+                transition_num += len(batch['action'])
+                payoffs.extend(batch_payoffs)
+            self.assertEqual(len(payoffs), 20)
+            self.assertGreater(transition_num, 20)
+        with self.assertRaises(ValueError):
+            ParallelRunner('leduc-holdem', make_random_agents, 1, transport='pipe')
+
+    def test_shared_memory_interrupted(self):
+        runner = ParallelRunner('leduc-holdem', make_random_agents, 2, seed=0,
+                                transport='shared_memory', memory_size=4)
+        for _ in runner.iter_transitions(50):
+            break
+        # The next run gets the slots of the abandoned transitions back
+        payoffs = []
+        for _, batch_payoffs in runner.iter_transitions(10):
+            payoffs.extend(batch_payoffs)
+        self.assertEqual(len(payoffs), 10)
+        for _ in runner.iter_transitions(50):
+            break
+        # The workers waiting for free slots are stopped
+        runner.close()
+        self.assertEqual(runner.processes, [])
+
+    def test_shared_transition_buffer(self):
+        env = rlcard.make('leduc-holdem')
+        buffer = SharedTransitionBuffer(3, env.state_shape, env.action_num)
+        state, _ = env.init_game()
+        for i in range(3):
+            buffer.write(i % 2, [state, state['legal_actions'][0], float(i), state, i == 2])
+        self.assertTrue(buffer.is_full())
+        chunks = buffer.chunks(0, 3)
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(list(chunks[0]['reward']), [0., 1., 2.])
+        self.assertTrue(np.array_equal(chunks[0]['obs'][0], state['obs']))
+        buffer.release(2)
+        self.assertFalse(buffer.is_full())
+        self.assertTrue(buffer.wait())
+        buffer.write(0, [state, 0, 3., state, True])
+        chunks = buffer.chunks(2, 4)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[1]['reward'][0], 3.)
+        del chunks
+        buffer.write(1, [state, 0, 4., state, True])
+        self.assertTrue(buffer.is_full())
+        buffer.stop()
+        self.assertFalse(buffer.wait())
+        buffer.close()
+        buffer.unlink()
+
+if __name__ == '__main__':
+    unittest.main()